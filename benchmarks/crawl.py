@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    benchmarks/crawl.py: Crawling python.org for builds, pooled vs. fresh connections
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import os
+import tempfile
+import time
+from urllib.request import Request, urlopen
+
+from wenv._core import source
+
+from .server import make_python_listing, serve
+from .stats import report, summarize
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class _UnpooledClient:
+    "what wenv did before pooling: one connection per request"
+
+    @staticmethod
+    def open(url, headers=None):
+
+        return urlopen(Request(url, headers={} if headers is None else headers))
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _crawl(server, client, runs):
+
+    pool = source.POOL
+    source.POOL = client
+    cache = os.environ.get("XDG_CACHE_HOME")
+
+    timings = []
+    try:
+        for _ in range(runs):
+            if hasattr(client, "clear"):
+                client.clear()  # every run starts cold, like a new process
+            with tempfile.TemporaryDirectory() as tmp:
+                os.environ["XDG_CACHE_HOME"] = tmp  # without a persistent build index
+                start = time.perf_counter()
+                builds = source.get_available_python_builds(url=server.url + "/ftp/python/")
+                timings.append(time.perf_counter() - start)
+    finally:
+        source.POOL = pool
+        if cache is None:
+            os.environ.pop("XDG_CACHE_HOME", None)
+        else:
+            os.environ["XDG_CACHE_HOME"] = cache
+
+    assert len(builds) > 0
+
+    return timings
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Crawls a local stand-in of python.org's download area.")
+    parser.add_argument("--runs", type=int, default=5, help="crawls per client")
+    parser.add_argument("--versions", type=int, default=300, help="number of version directories")
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds per response")
+    parser.add_argument("--handshake", type=float, default=0.03, help="seconds per new connection, i.e. TLS")
+    args = parser.parse_args()
+
+    results, stats = {}, {}
+    with serve(make_python_listing(args.versions), args.latency, args.handshake) as server:
+        for name, client in (("urlopen", _UnpooledClient()), ("pooled", source.ConnectionPool())):
+            server.stats.update(requests=0, connections=0)
+            timings = _crawl(server, client, args.runs)
+            results[name] = summarize(timings)
+            stats[name] = (server.stats["requests"], server.stats["connections"], sum(timings))
+
+    report(results)
+
+    print()
+    print("%-22s %9s %11s %9s" % ("client", "requests", "connections", "req/s"))
+    for name, (requests, connections, seconds) in stats.items():
+        print("%-22s %9d %11d %9.0f" % (name, requests, connections, requests / seconds))
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ENTRY POINT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+if __name__ == "__main__":
+
+    main()
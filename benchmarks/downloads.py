@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    benchmarks/downloads.py: Download pipeline benchmark against a local stand-in
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from .server import make_installers, make_pypi, make_python_listing, serve
+from .stats import load_baseline, report, save_baseline, summarize
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline_downloads.json")
+
+SCENARIOS = ("get_available_python_builds", "Env.cache", "Env.cache_package", "Env.setup_pythonprefix")
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _child(scenario, url, root):
+    "runs one scenario in a fresh process, so peak RSS belongs to it alone"
+
+    from wenv import Env, get_available_python_builds
+    from wenv._core.const import SOURCES
+
+    SOURCES.update(  # redirects all origins to the stand-in
+        python=url + "/ftp/python/",
+        getpip=url + "/getpip/",
+        cpython=url + "/cpython/",
+        pypi=url + "/",
+    )
+
+    env = Env(
+        arch="win64",
+        pythonversion="3.10.4",
+        prefix=os.path.join(root, "prefix"),
+        wineprefix=os.path.join(root, "wineprefix"),
+    )
+
+    start = time.perf_counter()
+    if scenario == "get_available_python_builds":
+        get_available_python_builds(url=url + "/ftp/python/", ttl=0)
+    elif scenario == "Env.cache":
+        env.cache()
+    elif scenario == "Env.cache_package":
+        env.cache_package("pkg")
+    elif scenario == "Env.setup_pythonprefix":
+        env.setup_pythonprefix()
+    seconds = time.perf_counter() - start
+
+    json.dump({
+        "seconds": seconds,
+        "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,  # KiB on Linux
+    }, sys.stdout)
+
+
+def _run(server, scenario, runs):
+
+    timings, rss, requests, connections, transferred = [], [], [], [], []
+
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as root:  # cold: no cache, store or build index
+            env = {name: value for name, value in os.environ.items() if not name.startswith("WENV")}
+            env["XDG_CACHE_HOME"] = os.path.join(root, "xdg")
+            before = dict(server.stats)
+            outs = subprocess.run(
+                [sys.executable, "-m", "benchmarks.downloads", "--child", scenario, server.url, root],
+                env=env, check=True, stdout=subprocess.PIPE,
+            ).stdout
+        result = json.loads(outs.decode("utf-8"))
+        timings.append(result["seconds"])
+        rss.append(result["rss"])
+        requests.append(server.stats["requests"] - before["requests"])
+        connections.append(server.stats["connections"] - before["connections"])
+        transferred.append(server.stats["bytes"] - before["bytes"])
+
+    return timings, {
+        "peak_rss": max(rss),
+        "requests": max(requests),
+        "connections": max(connections),
+        "bytes": max(transferred),
+        "throughput": sum(transferred) / sum(timings),
+    }
+
+
+def main():
+
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        _child(*sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Measures wenv's download pipeline against a local stand-in of python.org and PyPI.")
+    parser.add_argument("--runs", type=int, default=5, help="cold runs per scenario")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only this scenario, repeatable")
+    parser.add_argument("--versions", type=int, default=100, help="number of version directories in listing")
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds per response")
+    parser.add_argument("--handshake", type=float, default=0.03, help="seconds per new connection, i.e. TLS")
+    parser.add_argument("--bandwidth", type=float, default=50.0, help="MiB/s per response, 0 for unlimited")
+    parser.add_argument("--wheel-size", type=int, default=2, help="MiB per wheel")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file, machine-local")
+    parser.add_argument("--save", action="store_true", help="store results as new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if a median regressed beyond threshold")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated relative regression of median")
+    args = parser.parse_args()
+
+    files = make_python_listing(args.versions)
+    files.update(make_installers())
+    bandwidth = None if args.bandwidth <= 0 else int(args.bandwidth * (1 << 20))
+
+    results, stats = {}, {}
+    with serve(files, args.latency, args.handshake, bandwidth) as server:
+        files.update(make_pypi(server.url, ("pip", "setuptools", "wheel", "pkg"), args.wheel_size << 20))
+        for scenario in SCENARIOS if args.scenario is None else args.scenario:
+            timings, stats[scenario] = _run(server, scenario, args.runs)
+            results[scenario] = summarize(timings)
+
+    regressions = report(results, load_baseline(args.baseline), args.threshold)
+
+    print()
+    print("%-28s %9s %11s %10s %10s %13s" % ("benchmark", "requests", "connections", "MiB", "MiB/s", "peak RSS MiB"))
+    for name, item in stats.items():
+        print("%-28s %9d %11d %10.1f %10.1f %13.1f" % (
+            name, item["requests"], item["connections"], item["bytes"] / (1 << 20),
+            item["throughput"] / (1 << 20), item["peak_rss"] / 1024,
+        ))
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print("baseline saved: %s" % args.baseline)
+
+    if args.check and len(regressions) > 0:
+        print("regressions: %s" % ", ".join(regressions))
+        sys.exit(1)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ENTRY POINT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    benchmarks/sandbox.py: Stand-in environment for measuring wenv's own overhead
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import os
+import shlex
+import sys
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def make_sandbox(root):
+    """
+    Stand-in ``wine`` which drops the Windows executable and execs the host Python with the remaining arguments, plus a Python prefix with a few fake executables. Works without Wine, so only wenv's own overhead on top of a host Python start is measured.
+
+    Returns environment variables activating the sandbox.
+    """
+
+    bin_dir = os.path.join(root, "bin")
+    os.makedirs(bin_dir)
+    wine = os.path.join(bin_dir, "wine")
+    with open(wine, "w") as f:
+        f.write(
+            '#!/bin/sh\nunset PYTHONHOME\nshift\nexec %s "$@"\n'  # PYTHONHOME is meant for Wine's Python
+            % shlex.quote(sys.executable)
+        )
+    os.chmod(wine, 0o755)
+
+    pythonprefix = os.path.join(root, "wineprefix", "drive_c", "python")
+    os.makedirs(os.path.join(pythonprefix, "Scripts"))
+    for path in ("python.exe", "pythonw.exe", "Scripts/pip.exe", "Scripts/wheel.exe"):
+        open(os.path.join(pythonprefix, path), "w").close()
+
+    with open(os.path.join(root, "script.py"), "w") as f:
+        f.write("pass\n")
+
+    return {
+        "PATH": bin_dir + ":" + os.environ.get("PATH", ""),
+        "XDG_CACHE_HOME": os.path.join(root, "cache"),
+        "WENV_WINEPREFIX": os.path.join(root, "wineprefix"),
+        "WENV_PYTHONPREFIX": pythonprefix,
+    }
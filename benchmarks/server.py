@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    benchmarks/server.py: Local stand-in HTTP server
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from contextlib import contextmanager
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # like production servers, avoids delayed ACK stalls on keep-alive
+
+    def setup(self):
+
+        super().setup()
+
+        with self.server.lock:
+            self.server.stats["connections"] += 1
+        time.sleep(self.server.handshake)  # stands in for TCP and TLS handshakes
+
+    def do_GET(self):
+
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        time.sleep(self.server.latency)
+
+        start, end = 0, len(data) - 1
+        requested = self.headers.get("Range")
+        if requested is not None:  # single ranges only, like wenv requests them
+            first, last = requested.split("=", 1)[1].split("-", 1)
+            start, end = int(first), min(int(last), end) if len(last) > 0 else end
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes %d-%d/%d" % (start, end, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "text/html" if self.path.endswith("/") else "application/octet-stream")
+        self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+
+        body = memoryview(data)[start : end + 1]
+        chunk = len(body) if self.server.bandwidth is None else max(1, self.server.bandwidth // 100)
+        for offset in range(0, len(body), chunk):
+            self.wfile.write(body[offset : offset + chunk])
+            if self.server.bandwidth is not None:
+                time.sleep(chunk / self.server.bandwidth)  # per connection, like a congested link
+
+        with self.server.lock:
+            self.server.stats["bytes"] += len(body)
+
+    def log_message(self, *args):
+
+        pass
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@contextmanager
+def serve(files, latency=0.0, handshake=0.0, bandwidth=None):
+    """
+    Serves ``files``, a dictionary of format ``{"/path": b"content"}``, on a free local port with HTTP/1.1 keep-alive and range requests. ``latency`` is added to every response, ``handshake`` to every new connection, both in seconds. ``bandwidth`` limits every response to that many bytes per second. Yields the server, its base URL is ``server.url``, request, connection and byte counts are in ``server.stats``.
+    """
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.request_queue_size = 128
+    server.files = files
+    server.latency = latency
+    server.handshake = handshake
+    server.bandwidth = bandwidth
+    server.lock = threading.Lock()
+    server.stats = {"requests": 0, "connections": 0, "bytes": 0}
+    server.url = "http://127.0.0.1:%d" % server.server_address[1]
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def make_python_listing(versions=300, arch_builds=("win32", "amd64", "arm64")):
+    """
+    Synthetic copy of ``python.org``'s download area with one embeddable build per architecture and version.
+    """
+
+    names = ["3.%d.%d" % (index // 20 + 5, index % 20) for index in range(versions)]
+
+    files = {
+        "/ftp/python/": "\n".join(
+            ['<a href="../">../</a>'] + ['<a href="%s/">%s/</a>' % (name, name) for name in names]
+        ).encode("utf-8")
+    }
+    for name in names:
+        files["/ftp/python/%s/" % name] = "\n".join(
+            ['<a href="../">../</a>']
+            + [
+                '<a href="python-%s-embed-%s.zip">python-%s-embed-%s.zip</a>' % (name, arch, name, arch)
+                for arch in arch_builds
+            ]
+            + ['<a href="python-%s.tgz">python-%s.tgz</a>' % (name, name)]
+        ).encode("utf-8")
+
+    return files
+
+
+def make_installers(version="3.10.4", arch="amd64", lib_size=8 << 20):
+    """
+    Synthetic installation files for one version of Python, i.e. its embeddable build with a library zip of roughly ``lib_size`` bytes of modules, ``get-pip.py`` and ``site.py``, at paths mirroring their origins.
+    """
+
+    block = "".join(version.split(".")[:2])
+
+    lib = io.BytesIO()
+    with zipfile.ZipFile(lib, "w", zipfile.ZIP_DEFLATED) as f:
+        for index in range(max(1, lib_size // (64 << 10))):
+            # half random, half repetitive, compresses like source code
+            f.writestr("module%04d.py" % index, os.urandom(32 << 10).hex()[: 32 << 10] + "pass\n" * (6 << 10))
+
+    embed = io.BytesIO()
+    with zipfile.ZipFile(embed, "w", zipfile.ZIP_STORED) as f:  # like python.org, only the library is compressed
+        f.writestr("python.exe", os.urandom(100 << 10))
+        f.writestr("python%s.dll" % block, os.urandom(4 << 20))
+        f.writestr("python%s.zip" % block, lib.getvalue())
+        f.writestr("python%s._pth" % block, "python%s.zip\n.\n" % block)
+
+    return {
+        "/ftp/python/%s/python-%s-embed-%s.zip" % (version, version, arch): embed.getvalue(),
+        "/getpip/get-pip.py": b"# get-pip.py\n" + os.urandom(1 << 20).hex().encode("utf-8"),
+        "/cpython/v%s/Lib/site.py" % version: b"def main():\n    pass\n\nif True:\n    main()\n",
+    }
+
+
+def make_pypi(url, packages=("pip", "setuptools", "wheel"), wheel_size=2 << 20):
+    """
+    Synthetic PyPI JSON metadata and one wheel of ``wheel_size`` bytes per package, with absolute file URLs below ``url``.
+    """
+
+    files = {}
+
+    for name in packages:
+        fn = "%s-1.0-py3-none-any.whl" % name
+        data = os.urandom(wheel_size)
+        files["/packages/" + fn] = data
+        files["/pypi/%s/json" % name] = json.dumps({
+            "info": {"name": name, "version": "1.0"},
+            "urls": [{
+                "filename": fn,
+                "url": "%s/packages/%s" % (url, fn),
+                "digests": {"sha256": hashlib.sha256(data).hexdigest()},
+                "size": len(data),
+                "packagetype": "bdist_wheel",
+            }],
+        }).encode("utf-8")
+
+    return files
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    benchmarks/startup.py: Startup overhead of wenv
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .sandbox import make_sandbox
+from .stats import load_baseline, report, save_baseline, summarize
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+CLI = "from wenv._core.launch import cli; cli()"  # equivalent to the `wenv` console script
+SHEBANG = "from wenv._core.launch import shebang; shebang()"  # equivalent to `_wenv_python`
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _measure_process(cmd, env, runs):
+
+    for _ in range(3):  # warm up, writes caches and manifests
+        subprocess.run(cmd, env=env, check=True)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True)
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def _measure_call(func, runs):
+
+    for _ in range(3):
+        func()
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def _run_processes(root, env, runs):
+
+    script = os.path.join(root, "script.py")
+
+    results = {
+        "host_python": _measure_process([sys.executable, "-c", "pass"], env, runs),
+    }  # what the stand-in costs without wenv
+
+    for manifest in ("false", "true"):
+        env["WENV_LAUNCH_MANIFEST"] = manifest
+        suffix = "manifest" if manifest == "true" else "full"
+        results["cli[%s]" % suffix] = _measure_process(
+            [sys.executable, "-c", CLI, "python", "-c", "pass"], env, runs
+        )
+        results["shebang[%s]" % suffix] = _measure_process(
+            [sys.executable, "-c", SHEBANG, script], env, runs
+        )
+
+    return results
+
+
+def _run_calls(env, runs):
+
+    environ = os.environ.copy()
+    os.environ.update(env)
+
+    try:
+        from wenv import Env, EnvConfig
+
+        return {
+            "EnvConfig": _measure_call(lambda: EnvConfig().snapshot(), runs),
+            "Env.__init__": _measure_call(Env, runs),
+            "Env.__init__+cmds": _measure_call(lambda: Env()._cmd_dict, runs),
+        }
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Measures the startup overhead of wenv.")
+    parser.add_argument("--runs", type=int, default=50, help="runs per benchmark")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file, machine-local")
+    parser.add_argument("--save", action="store_true", help="store results as new baseline")
+    parser.add_argument("--check", action="store_true", help="fail if a median regressed beyond threshold")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated relative regression of median")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+
+        env = os.environ.copy()
+        env.update(make_sandbox(root))
+        for name in ("WENV_SPEC", "WENV_TRACE"):
+            env.pop(name, None)
+
+        timings = _run_processes(root, env, args.runs)
+        timings.update(_run_calls(env, args.runs * 10))
+
+    results = {name: summarize(values) for name, values in timings.items()}
+    regressions = report(results, load_baseline(args.baseline), args.threshold)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print("baseline saved: %s" % args.baseline)
+
+    if args.check and len(regressions) > 0:
+        print("regressions: %s" % ", ".join(regressions))
+        sys.exit(1)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ENTRY POINT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    benchmarks/stats.py: Timing distributions and baselines
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+FIELDS = ("min", "median", "p90", "p99", "mean", "stdev")
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def percentile(timings, fraction):
+    "nearest-rank percentile"
+
+    ordered = sorted(timings)
+
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(timings):
+    "distribution of timings in milliseconds"
+
+    return {
+        "runs": len(timings),
+        "min": min(timings) * 1e3,
+        "median": statistics.median(timings) * 1e3,
+        "p90": percentile(timings, 0.9) * 1e3,
+        "p99": percentile(timings, 0.99) * 1e3,
+        "mean": statistics.mean(timings) * 1e3,
+        "stdev": (statistics.stdev(timings) if len(timings) > 1 else 0.0) * 1e3,
+    }
+
+
+def get_machine():
+    "identifies where a baseline was recorded, baselines are only comparable on the same machine"
+
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "python": sys.version.split()[0],
+    }
+
+
+def load_baseline(path):
+
+    if not os.path.isfile(path):
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"machine": get_machine(), "results": results}, f, indent=4, sort_keys=True)
+
+
+def report(results, baseline=None, threshold=0.1):
+    """
+    Prints distributions and, if a baseline is given, the change of the median per benchmark. Returns names of benchmarks whose median regressed by more than ``threshold``.
+    """
+
+    reference = {} if baseline is None else baseline["results"]
+
+    print(("%-22s" + " %9s" * len(FIELDS) + " %9s") % (("benchmark",) + tuple("%s [ms]" % field for field in FIELDS) + ("vs base",)))
+
+    regressions = []
+    for name, summary in results.items():
+        change = ""
+        if name in reference.keys():
+            ratio = summary["median"] / reference[name]["median"] - 1.0
+            change = "%+8.1f%%" % (ratio * 1e2)
+            if ratio > threshold:
+                regressions.append(name)
+        print(("%-22s" + " %9.2f" * len(FIELDS) + " %9s") % ((name,) + tuple(summary[field] for field in FIELDS) + (change,)))
+
+    if baseline is not None and baseline["machine"] != get_machine():
+        print("WARNING: baseline was recorded on a different machine or Python: %s" % json.dumps(baseline["machine"]))
+
+    return regressions
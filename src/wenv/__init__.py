@@ -28,23 +28,43 @@ specific language governing rights and limitations under the License.
 
 __version__ = '0.5.1'  # Bump version HERE!
 
-from ._core.env import (
-    cli,
-    Env,
-    shebang,
-)
-from ._core.config import (
-    EnvConfig,
-)
-from ._core.errors import (
-    EnvConfigParserError,
-)
-from ._core.pythonversion import (
-    PythonVersion,
-)
-from ._core.source import (
-    get_available_python_builds,
-    get_latest_python_build,
-)
-
-env = Env  # legacy
+# Attributes are imported on first access (PEP 562), keeping the entry points
+# `cli` and `shebang` clear of expensive imports such as `urllib.request`.
+_LAZY = {
+    "cli": "._core.launch",
+    "shebang": "._core.launch",
+    "Env": "._core.env",
+    "EnvConfig": "._core.config",
+    "EnvConfigParserError": "._core.errors",
+    "PythonBuilds": "._core.pythonversion",
+    "PythonVersion": "._core.pythonversion",
+    "Server": "._core.server",
+    "get_available_python_builds": "._core.source",
+    "get_latest_python_build": "._core.source",
+    "iter_available_python_builds": "._core.source",
+}
+_LEGACY = {
+    "env": "Env",
+}
+
+__all__ = list(_LAZY.keys())
+
+
+def __getattr__(name: str):
+
+    if name in _LEGACY.keys():
+        return __getattr__(_LEGACY[name])
+    if name not in _LAZY.keys():
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    from importlib import import_module
+
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+
+    return sorted(set(globals().keys()) | _LAZY.keys() | _LEGACY.keys())
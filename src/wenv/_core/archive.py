@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/archive.py: Streaming extraction of zip archives on disk
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import io
+import os
+import shutil
+import struct
+import tempfile
+from typing import Any, Dict, Optional
+import zipfile
+
+from .const import DOWNLOAD_CHUNK_SIZE
+from .typeguard import typechecked
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+_LOCAL_HEADER = struct.Struct("<4s22xHH")  # signature, ..., file name length, extra field length
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+def extract_zip(archive: str, directory: str, nested: Optional[Dict[str, str]] = None) -> int:
+    """
+    Extracts a zip archive on disk, e.g. a file in the cache or store, into a directory. The archive is read from disk member by member and each member is streamed to disk in fixed-size chunks, so the archive is never held in memory.
+
+    Args:
+        archive : Path to zip archive.
+        directory : Target directory, created if required.
+        nested : Maps names of members which are zip archives themselves to target directories. They are extracted straight from within ``archive`` instead of being written to disk first. Stored members are read in place, compressed ones are spooled through a temporary file.
+    Returns:
+        Number of bytes written.
+    """
+
+    if nested is None:
+        nested = {}
+
+    written = 0
+
+    with open(archive, "rb") as stream, zipfile.ZipFile(stream) as f:
+        for info in f.infolist():
+            if info.filename in nested.keys():
+                with _open_member(f, stream, info) as member, zipfile.ZipFile(member) as inner:
+                    for inner_info in inner.infolist():
+                        written += _extract_member(inner, inner_info, nested[info.filename])
+            else:
+                written += _extract_member(f, info, directory)
+
+    return written
+
+
+def _extract_member(f: zipfile.ZipFile, info: zipfile.ZipInfo, directory: str) -> int:
+
+    target = _get_target(info.filename, directory)
+
+    if info.is_dir():
+        os.makedirs(target, exist_ok=True)
+        return 0
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with f.open(info) as source, open(target, "wb") as destination:
+        shutil.copyfileobj(source, destination, DOWNLOAD_CHUNK_SIZE)
+
+    return info.file_size
+
+
+def _get_target(name: str, directory: str) -> str:
+    "path of a member below directory, sanitized like ZipFile.extractall"
+
+    name = name.replace("/", os.path.sep)
+    if os.path.altsep:
+        name = name.replace(os.path.altsep, os.path.sep)
+    name = os.path.splitdrive(name)[1]
+    parts = [part for part in name.split(os.path.sep) if part not in ("", os.path.curdir, os.path.pardir)]
+
+    return os.path.join(directory, *parts)
+
+
+def _open_member(f: zipfile.ZipFile, stream: Any, info: zipfile.ZipInfo) -> Any:
+    "seekable file object of a member, in place if stored"
+
+    if info.compress_type != zipfile.ZIP_STORED:
+        spool = tempfile.TemporaryFile()  # on disk, not in memory
+        with f.open(info) as source:
+            shutil.copyfileobj(source, spool, DOWNLOAD_CHUNK_SIZE)
+        spool.seek(0)
+        return spool
+
+    stream.seek(info.header_offset)
+    signature, name_length, extra_length = _LOCAL_HEADER.unpack(stream.read(_LOCAL_HEADER.size))
+    if signature != _LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile("bad local file header", info.filename)
+
+    return io.BufferedReader(_Window(
+        stream.fileno(), info.header_offset + _LOCAL_HEADER.size + name_length + extra_length, info.file_size
+    ), DOWNLOAD_CHUNK_SIZE)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class _Window(io.RawIOBase):
+    """
+    Read-only view of a byte range of a file descriptor, e.g. a stored member of a zip archive. Reads are positional, so the file descriptor may be shared.
+    """
+
+    def __init__(self, fd: int, offset: int, size: int):
+
+        super().__init__()
+        self._fd = fd
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+
+        return True
+
+    def seekable(self) -> bool:
+
+        return True
+
+    def tell(self) -> int:
+
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError("negative seek position", offset)
+        self._position = offset
+
+        return self._position
+
+    def readinto(self, buffer: Any) -> int:
+
+        length = max(0, min(len(buffer), self._size - self._position))
+        if length == 0:
+            return 0
+
+        data = os.pread(self._fd, length, self._offset + self._position)
+        buffer[: len(data)] = data
+        self._position += len(data)
+
+        return len(data)
@@ -30,12 +30,16 @@ import os
 import json
 import site
 import sys
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+import zlib
 
-from .const import CONFIG_FN
+from .const import CONFIG_CACHE_LIMIT, CONFIG_FN
 from .errors import EnvConfigParserError
 from .pythonversion import PythonVersion
+from .trace import get_trace_path, trace
 from .typeguard import typechecked
+from .usercache import get_user_cache_dir, prune_json, read_json, stat_stamp, write_json
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # CONFIGURATION CLASS
@@ -59,6 +63,8 @@ class EnvConfig(dict):
         "wine_bin_win32",
         "wine_bin_win64",
         "wine_bin_arm64",
+        "wineserver_bin",
+        "wineserver_keepalive",
         "winedebug",
         "wineinstallprefix",
         "prefix",
@@ -67,20 +73,45 @@ class EnvConfig(dict):
         "offline",
         "cache",
         "packages",
+        "mirror",
+        "pip_index_url",
+        "mirrors",
+        "download_segments",
+        "download_workers",
+        "store_size_limit",
+        "shims",
         "no_pth_file",
+        "launch_manifest",
     )
 
     def __init__(self, **override: Any):
 
+        # Resolved configuration, see snapshot
+        self._snapshot = None
+
         # Call parent constructur, just in case
         super().__init__()
 
-        # Get config from files
-        self.update(self._get_config_from_files())
+        with trace("config_files") as phase:
+
+            # Get config from files
+            self.update(self._get_config_from_files(phase))
+
+            # Add override parameters
+            if len(override) > 0:
+                self.update(override)
+
+            self._clean_pythonversion()
 
-        # Add override parameters
-        if len(override) > 0:
-            self.update(override)
+            # Identify the resulting environment like Env does, resolving values only if tracing
+            if get_trace_path() is not None:
+                phase.tags.update(
+                    arch=self["arch"],
+                    version=self["pythonversion"].as_config(),
+                    wineprefix=self["wineprefix"],
+                )
+
+    def _clean_pythonversion(self):
 
         # Version type cleanup
         if not isinstance(self['pythonversion'], PythonVersion):
@@ -89,6 +120,26 @@ class EnvConfig(dict):
                 version = self['pythonversion'],
             )
 
+    @classmethod
+    def from_resolved(cls, values: Dict[str, Any]):
+        """
+        Builds a configuration from previously resolved values, e.g. from :meth:`wenv.EnvConfig.export_dict`, without looking at configuration files. Environment variables still take precedence.
+
+        Args:
+            values : Configuration values. ``pythonversion`` may be a string.
+        Returns:
+            A :class:`wenv.EnvConfig` object.
+        """
+
+        config = cls.__new__(cls)
+        config._snapshot = None
+        dict.__init__(config)
+
+        config.update(values)
+        config._clean_pythonversion()
+
+        return config
+
     def __getitem__(self, key: str) -> Any:
         """
         Returns values from the following sources in the following order:
@@ -97,18 +148,102 @@ class EnvConfig(dict):
         - Internal storage, i.e. changed in the dictionary or read from configuration files.
         - Default values.
 
+        Values are served from the resolved snapshot, see :meth:`wenv.EnvConfig.snapshot`.
+
         Args:
             key : Name of configuration value.
         Returns:
             Arbitrary configuration value.
         """
 
+        snapshot = self.snapshot()
+
+        if key in snapshot.keys():
+            return snapshot[key]
+
+        return self._resolve(key, self.__getitem__, os.environ)  # e.g. unknown keys from environment variables
+
+    def __setitem__(self, key: str, value: Any):
+
+        self._snapshot = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str):
+
+        self._snapshot = None
+        super().__delitem__(key)
+
+    def clear(self):
+
+        self._snapshot = None
+        super().clear()
+
+    def pop(self, *args: Any) -> Any:
+
+        self._snapshot = None
+        return super().pop(*args)
+
+    def popitem(self) -> Any:
+
+        self._snapshot = None
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+
+        self._snapshot = None
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any):
+
+        self._snapshot = None
+        super().update(*args, **kwargs)
+
+    def invalidate(self):
+        """
+        Discards the resolved snapshot. Required after relevant environment variables, i.e. ``WENV_*``, have been changed within the current process. Changes to the configuration itself invalidate the snapshot automatically.
+        """
+
+        self._snapshot = None
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """
+        Resolves all configuration values at once, scanning environment variables a single time and deriving every default only once. The result is computed on first use and kept until the configuration is changed or :meth:`wenv.EnvConfig.invalidate` is called.
+
+        Returns:
+            Read-only mapping of all configuration values.
+        """
+
+        if getattr(self, "_snapshot", None) is not None:  # copies bypass __init__
+            return self._snapshot
+
+        environ = {
+            name: value
+            for name, value in os.environ.items()
+            if name.startswith("WENV_")
+        }
+        resolved = {}
+
+        def get(key: str) -> Any:
+            if key not in resolved.keys():
+                resolved[key] = self._resolve(key, get, environ)
+            return resolved[key]
+
+        for key in self._KEYS + tuple(self.keys()):
+            get(key)
+
+        self._snapshot = MappingProxyType(resolved)
+        return self._snapshot
+
+    def _resolve(self, key: str, get: Callable, environ: Mapping[str, str]) -> Any:
+
         env_var = "WENV_{NAME:s}".format(NAME=key.upper())
-        if env_var in os.environ.keys():
-            value = os.environ[env_var]
+        if env_var in environ.keys():
+            value = environ[env_var]
             if len(value) > 0:
                 if key == "pythonversion":
-                    return PythonVersion.from_config(self['arch'], value)
+                    return PythonVersion.from_config(get('arch'), value)
+                if key == "mirrors":
+                    return json.loads(value)
                 if value.isnumeric():
                     return int(value)
                 if value.strip().lower() in ("true", "false"):
@@ -121,13 +256,17 @@ class EnvConfig(dict):
         if key == "arch":
             return "win32"  # Define Wine & Wine-Python architecture
         if key == "pythonversion":
-            return PythonVersion(self['arch'], 3, 7, 4, 'stable')  # Define Wine-Python version
+            return PythonVersion(get("arch"), 3, 7, 4, 'stable')  # Define Wine-Python version
         if key == "wine_bin_win32":
             return "wine"
         if key == "wine_bin_win64":
             return "wine64"
         if key == "wine_bin_arm64":
             return "wine"
+        if key == "wineserver_bin":
+            return "wineserver"
+        if key == "wineserver_keepalive":
+            return None  # managed wineserver runs until stopped
         if key == "winedebug":
             return "-all"  # Wine debug output off
         if key == "wineinstallprefix":
@@ -140,19 +279,37 @@ class EnvConfig(dict):
                 return site.USER_BASE
             return sys.prefix
         if key == "wineprefix":
-            return os.path.join(self["prefix"], "share", "wenv", self["arch"])
+            return os.path.join(get("prefix"), "share", "wenv", get("arch"))
         if key == "pythonprefix":
             return os.path.join(
-                self["wineprefix"], "drive_c", "python-%s" % self["pythonversion"]
+                get("wineprefix"), "drive_c", "python-%s" % get("pythonversion")
             )
         if key == "offline":
             return False
         if key == "cache":
-            return os.path.join(self["prefix"], "share", "wenv", "cache")
+            return os.path.join(get("prefix"), "share", "wenv", "cache")
         if key == "packages":
-            return os.path.join(self["cache"], "packages")
+            return os.path.join(get("cache"), "packages")
+        if key == "mirror":
+            return os.path.join(get("cache"), "mirror")
+        if key == "pip_index_url":
+            return None  # pip uses its own configuration, i.e. PyPI by default
+        if key == "mirrors":
+            return {}  # downloads from origins only
+        if key == "download_segments":
+            return 1  # no parallel range requests
+        if key == "download_workers":
+            return 8  # parallel downloads of wenv cache
+        if key == "store_size_limit":
+            return None  # artifact store is not limited
+        if key == "shims":
+            return os.path.join(
+                get("prefix"), "share", "wenv", "bin", "%s-python-%s" % (get("arch"), get("pythonversion"))
+            )
         if key == "no_pth_file":
             return False
+        if key == "launch_manifest":
+            return True
 
         raise KeyError("not a valid configuration key", key)
 
@@ -161,10 +318,7 @@ class EnvConfig(dict):
         Exports a dictionary.
         """
 
-        return {
-            field: self[field]
-            for field in set(self._KEYS) | self.keys()
-        }
+        return dict(self.snapshot())
 
     def export_envvar_dict(self) -> Dict[str, str]:
         """
@@ -172,32 +326,63 @@ class EnvConfig(dict):
         """
 
         return {
-            "WENV_" + field.upper(): "" if field is None else str(self[field])
-            for field in set(self._KEYS) | self.keys()
+            "WENV_" + field.upper(): "" if value is None else json.dumps(value) if isinstance(value, dict) else str(value)
+            for field, value in self.snapshot().items()
         }
 
-    def _get_config_from_files(self) -> Dict:
+    @staticmethod
+    def get_config_files() -> List[str]:
+        """
+        Lists all candidate locations of configuration files in the order they are applied, whether they exist or not.
+        """
+
+        return [
+            fn
+            for fn in [
+                "/etc/wenv",
+                os.path.join("/etc", CONFIG_FN), # TODO deprecated
+                os.path.join("/etc", CONFIG_FN[1:]),
+                os.path.join(os.path.expanduser("~"), CONFIG_FN),
+                os.environ.get("WENV"),
+                os.path.join(os.environ.get("WENV"), CONFIG_FN)
+                if os.environ.get("WENV") is not None
+                else None,
+                os.path.join(os.getcwd(), CONFIG_FN),
+            ]
+            if fn is not None
+        ]
+
+    def _get_config_from_files(self, phase: Any) -> Dict:
+
+        fns = self.get_config_files()
+
+        # One stat per candidate decides whether the merged result of a previous run is still valid
+        stamps = [[fn, stat_stamp(fn)] for fn in fns]
+        cache_path = get_user_cache_dir(
+            "config", "%08x.json" % zlib.crc32("\0".join(fns).encode("utf-8"))
+        )
+        cached = read_json(cache_path)
+        if isinstance(cached, dict) and cached.get("stamps") == stamps:
+            phase.tags["cached"] = True
+            return cached["config"]
+        phase.tags["cached"] = False
 
         base = {}
 
         # Look for config in the usual spots
-        for fn in [
-            "/etc/wenv",
-            os.path.join("/etc", CONFIG_FN), # TODO deprecated
-            os.path.join("/etc", CONFIG_FN[1:]),
-            os.path.join(os.path.expanduser("~"), CONFIG_FN),
-            os.environ.get("WENV"),
-            os.path.join(os.environ.get("WENV"), CONFIG_FN)
-            if os.environ.get("WENV") is not None
-            else None,
-            os.path.join(os.getcwd(), CONFIG_FN),
-        ]:
+        for fn in fns:
 
             cnt = self._load_config_from_file(fn)
 
             if cnt is not None:
                 base.update(cnt)
 
+        try:
+            write_json(cache_path, {"stamps": stamps, "config": base})
+            prune_json(os.path.dirname(cache_path), CONFIG_CACHE_LIMIT)  # one file per set of candidates, e.g. per cwd
+        except OSError:
+            pass  # configuration must not depend on a writable cache
+
         return base
 
     def _load_config_from_file(self, try_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -27,6 +27,7 @@ specific language governing rights and limitations under the License.
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 CONFIG_FN = ".wenv.json"
+CONFIG_CACHE_LIMIT = 64  # merged configurations kept per user, see EnvConfig
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # COVERAGE
@@ -50,6 +51,60 @@ The following interpreters, scripts and modules are installed and available:
 {SCRIPTS:s}
 """
 
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# DOWNLOADS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+PYTHON_FTP_URL = "https://www.python.org/ftp/python/"
+
+# Canonical base URLs of download sources, see configuration parameter mirrors
+SOURCES = {
+    "python": PYTHON_FTP_URL,
+    "getpip": "https://bootstrap.pypa.io/",
+    "cpython": "https://raw.githubusercontent.com/python/cpython/",
+    "pypi": "https://pypi.org/",
+}
+
+BUILD_INDEX_TTL = 3600.0  # seconds
+BUILD_INDEX_VERSION = 1
+
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+DOWNLOAD_HOST_CONNECTIONS = 8  # concurrent keep-alive connections per host
+DOWNLOAD_MAX_REDIRECTS = 5
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_RETRY_DELAY = 0.25  # seconds, doubled per retry
+DOWNLOAD_SEGMENT_MIN_SIZE = 1 << 20  # smaller segments are not worth a request
+DOWNLOAD_TIMEOUT = 60.0  # seconds without data until a connection is considered dropped
+
+MIRROR_PROBE_TIMEOUT = 2.0  # seconds, slower mirrors are tried last
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# MIRROR
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+MIRROR_HOST = "127.0.0.1"  # local workers only
+MIRROR_PORT = 8741
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ENVIRONMENT SPECIFICATION
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+SPEC_VERSION = 1
+
+SHARED_ENVS = 16  # environments kept by Env.shared, least recently used ones are dropped first
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# SHIMS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+SHIM_MARKER = "# generated by wenv - do not edit, regenerate with: wenv shims"
+
+SHIM_STR = """#!/bin/sh
+{MARKER:s}
+{EXPORTS:s}
+{LINK:s}exec {WINE:s} {EXE:s} {ARGS:s}
+"""
+
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # CLI COLORS
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -26,20 +26,37 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
 import json
-from io import BytesIO
 import os
+import shlex
 import shutil
 import subprocess
 import sys
-from typing import Any, Dict, Generator, List
-import zipfile
+import time
+from typing import Any, Callable, Dict, Generator, List, Optional
 
 from .config import EnvConfig
-from .const import c, COVERAGE_STARTUP, HELP_STR
+from .const import (
+    c,
+    COVERAGE_STARTUP,
+    HELP_STR,
+    MIRROR_PORT,
+    SHARED_ENVS,
+    SHIM_MARKER,
+    SHIM_STR,
+    SOURCES,
+    SPEC_VERSION,
+)
+from .launch import get_envvar_dict, LaunchManifest
 from .paths import Paths
-from .source import download
+from .pythonversion import PythonBuilds, PythonVersion
+from .server import Server
+from .trace import get_trace_path, mark, tagged, trace
 from .typeguard import typechecked
+from .usercache import get_user_cache_dir, stat_stamp
 
 import wenv # HACK für version
 
@@ -56,6 +73,8 @@ class Env:
         kwargs : An arbitrary number of keyword arguments matching valid configuration options. In previous releases, the constructor expected one optional argument, ``parameter``. It should either be ``None`` or a dictionary. In the latter case, the dictionary may contain all valid configuration options. ``parameter`` can still be used but is deprecated.
     """
 
+    _shared = OrderedDict()  # see Env.shared
+
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # INIT
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -80,89 +99,247 @@ class Env:
             kwargs = EnvConfig(**kwargs)
 
         self._p = kwargs
-        self._cmd_dict = None
-        self._cli_dict = None
-        self._envvar_dict = None
 
         self._init_dicts()
 
-        self.cpython_31542_pth_workaround()
+    @classmethod
+    def _from_config(cls, config: EnvConfig):
 
-    def _init_dicts(self):
+        env = cls.__new__(cls)
+        env._p = config
+        env._init_dicts()
+
+        return env
+
+    @classmethod
+    def from_spec(cls, spec: str):
         """
-        Initialize core dictionaries. Function can also be used for re-initialization.
+        Rebuilds an environment from a specification created by :meth:`wenv.Env.to_spec`, without reading configuration files or deriving defaults. ``wenv`` itself picks up a specification from the ``WENV_SPEC`` environment variable, see :meth:`wenv.Env.from_environ`.
+
+        Args:
+            spec : Specification as a JSON document, ``fd:{n}`` for reading it from an inherited file descriptor or a path to a file containing it.
+        Returns:
+            A :class:`wenv.Env` object.
         """
 
-        # Init Wine cmd names
-        self._wine_dict = {
-            "win32": self._p["wine_bin_win32"],
-            "win64": self._p["wine_bin_win64"],
-            "arm64": self._p["wine_bin_arm64"],
-        }
+        if spec.startswith("fd:"):
+            with os.fdopen(int(spec[3:]), "r", encoding="utf-8") as f:
+                spec = f.read()
+        elif not spec.lstrip().startswith("{"):
+            with open(spec, "r", encoding="utf-8") as f:
+                spec = f.read()
+
+        data = json.loads(spec)
+        if not isinstance(data, dict) or data.get("version") != SPEC_VERSION:
+            raise ValueError("unsupported environment specification, expected version %d" % SPEC_VERSION)
+
+        env = cls._from_config(EnvConfig.from_resolved(data["config"]))
+        env._dicts["path"] = Paths(data["paths"]["pythonprefix"], env._p["pythonversion"])
+        env._dicts["envvar"] = get_envvar_dict(
+            os.environ, data["envvar"], env._p["wineinstallprefix"]
+        )
 
-        # Init Python environment paths
-        self._path_dict = Paths(self._p["pythonprefix"], self._p["pythonversion"])
-        # Init Python commands and scripts
-        self._init_cmd_dict()
-        # Init internal CLI commands
-        self._init_cli_dict()
-        # Init environment variables
-        self._init_envvar_dict()
+        return env
 
-    def _init_cmd_dict(self):
+    @classmethod
+    def from_environ(cls):
+        """
+        Rebuilds an environment from the specification in the ``WENV_SPEC`` environment variable if present, see :meth:`wenv.Env.from_spec`. Otherwise, a new environment is configured as usual.
 
-        @typechecked
-        def ls_exe(directory: str) -> Generator:
-            if not os.path.isdir(directory):
-                return
-            for item in os.listdir(directory):
-                if not item.lower().endswith(".exe"):
-                    continue
-                yield item[:-4], os.path.join(directory, item)
+        Returns:
+            A :class:`wenv.Env` object.
+        """
 
-        self._cmd_dict = dict(ls_exe(self._path_dict["scripts"]))
-        self._cmd_dict.update(dict(ls_exe(self._path_dict["pythonprefix"])))
+        spec = os.environ.get("WENV_SPEC", "")
+        if len(spec) > 0:
+            return cls.from_spec(spec)
 
-    def _init_cli_dict(self):
+        return cls()
 
-        self._cli_dict = {
-            item[5:]: getattr(self, item)
-            for item in dir(self)
-            if item.startswith("_cli_") and hasattr(getattr(self, item), "__call__")
-        }
+    def to_spec(self) -> str:
+        """
+        Exports a compact, versioned specification of this environment, i.e. its resolved configuration, paths and launch environment variables. Hand it to child processes, e.g. through the ``WENV_SPEC`` environment variable or a file descriptor, so they can skip configuration discovery, see :meth:`wenv.Env.from_spec`.
 
-    def _init_envvar_dict(self):
-
-        self._envvar_dict = os.environ.copy()
-        self._envvar_dict.update(
-            dict(
-                WINEARCH=self._p["arch"],  # Architecture
-                WINEPREFIX=self._p["wineprefix"],  # Wine prefix / directory
-                WINEDLLOVERRIDES="mscoree=d",  # Disable MONO: https://unix.stackexchange.com/a/191609
-                WINEDEBUG=self._p["winedebug"],  # Wine debug level
-                PYTHONHOME=self._p[
-                    "pythonprefix"
-                ],  # Python home for Wine Python (can be a Unix path)
-                VIRTUAL_ENV="",  # Reset Unix virtual env variable - wenv is "independent"
-                PIP_NO_WARN_SCRIPT_LOCATION="0",  # pip will not warn that pythonprefix and scripts are not in PATH
-            )
+        Returns:
+            Specification as a JSON document.
+        """
+
+        config = self._p.export_dict()
+        config["pythonversion"] = config["pythonversion"].as_config()
+
+        return json.dumps(
+            {
+                "version": SPEC_VERSION,
+                "config": config,
+                "paths": {
+                    "pythonprefix": self._path_dict["pythonprefix"],  # all other paths derive from it
+                },
+                "envvar": self._get_envvar_overrides(),
+            },
+            separators=(",", ":"),
         )
-        if self._p["wineinstallprefix"] not in (
-            None,
-            "",
-        ):  # allow custom installations of Wine outside of PATH
-            path = self._envvar_dict.get("PATH", "")
-            self._envvar_dict["PATH"] = (
-                os.path.join(self._p["wineinstallprefix"], "bin") + ":" + path
-            )
-            ld_library_path = self._envvar_dict.get("LD_LIBRARY_PATH", "")
-            self._envvar_dict["LD_LIBRARY_PATH"] = ":".join(
-                (
-                    os.path.join(self._p["wineinstallprefix"], "lib"),
-                    os.path.join(self._p["wineinstallprefix"], "lib64"),
-                    ld_library_path,
+
+    @classmethod
+    def shared(cls, **kwargs: Any):
+        """
+        Factory for library consumers which need environments frequently. It returns the same :class:`wenv.Env` object for identical resolved configurations within one process. Because environments are mutable, changes made through one reference are visible through all others. Use the regular constructor for an independent object. Up to ``SHARED_ENVS`` environments are kept, the least recently used one is dropped first.
+
+        Args:
+            kwargs : An arbitrary number of keyword arguments matching valid configuration options.
+        Returns:
+            A :class:`wenv.Env` object.
+        """
+
+        config = EnvConfig(**kwargs)
+        key = tuple(sorted(config.export_envvar_dict().items()))
+
+        env = cls._shared.get(key, None)
+        if env is None:
+            env = cls._from_config(config)
+            cls._shared[key] = env
+            while len(cls._shared) > SHARED_ENVS:
+                cls._shared.popitem(last=False)
+        else:
+            cls._shared.move_to_end(key)
+
+        return env
+
+    def _init_dicts(self):
+        """
+        Initialize core dictionaries. Function can also be used for re-initialization. Dictionaries are (re-)built lazily on first use, so constructing an environment from a resolved configuration does not touch the file system.
+        """
+
+        self._dicts = {}
+
+    @property
+    def _wine_dict(self) -> Dict[str, str]:
+        "Wine cmd names"
+
+        if "wine" not in self._dicts.keys():
+            with self._trace("init_dicts", dict="wine"):
+                self._dicts["wine"] = {
+                    "win32": self._p["wine_bin_win32"],
+                    "win64": self._p["wine_bin_win64"],
+                    "arm64": self._p["wine_bin_arm64"],
+                }
+
+        return self._dicts["wine"]
+
+    @property
+    def _path_dict(self) -> Paths:
+        "Python environment paths"
+
+        if "path" not in self._dicts.keys():
+            with self._trace("init_dicts", dict="path"):
+                self._dicts["path"] = Paths(self._p["pythonprefix"], self._p["pythonversion"])
+
+        return self._dicts["path"]
+
+    @property
+    def _cmd_dict(self) -> Dict[str, str]:
+        "Python commands and scripts"
+
+        if "cmd" not in self._dicts.keys():
+
+            @typechecked
+            def ls_exe(directory: str) -> Generator:
+                if not os.path.isdir(directory):
+                    return
+                for item in os.listdir(directory):
+                    if not item.lower().endswith(".exe"):
+                        continue
+                    yield item[:-4], os.path.join(directory, item)
+
+            with self._trace("init_dicts", dict="cmd"):
+                cmd_dict = dict(ls_exe(self._path_dict["scripts"]))
+                cmd_dict.update(dict(ls_exe(self._path_dict["pythonprefix"])))
+            self._dicts["cmd"] = cmd_dict
+
+        return self._dicts["cmd"]
+
+    @property
+    def _cli_dict(self) -> Dict[str, Callable]:
+        "internal CLI commands"
+
+        if "cli" not in self._dicts.keys():
+            with self._trace("init_dicts", dict="cli"):
+                self._dicts["cli"] = {
+                    item[5:]: getattr(self, item)
+                    for item in dir(type(self))  # class attributes only, skips properties
+                    if item.startswith("_cli_") and callable(getattr(type(self), item))
+                }
+
+        return self._dicts["cli"]
+
+    @property
+    def _envvar_dict(self) -> Dict[str, str]:
+        "environment variables"
+
+        if "envvar" not in self._dicts.keys():
+            with self._trace("init_dicts", dict="envvar"):
+                self._dicts["envvar"] = get_envvar_dict(
+                    os.environ, self._get_envvar_overrides(), self._p["wineinstallprefix"]
                 )
-            )  # https://wiki.winehq.org/FAQ#Can_I_install_more_than_one_Wine_version_on_my_system.3F
+
+        return self._dicts["envvar"]
+
+    def _get_envvar_overrides(self) -> Dict[str, str]:
+
+        overrides = dict(
+            WINEARCH=self._p["arch"],  # Architecture
+            WINEPREFIX=self._p["wineprefix"],  # Wine prefix / directory
+            WINEDLLOVERRIDES="mscoree=d",  # Disable MONO: https://unix.stackexchange.com/a/191609
+            WINEDEBUG=self._p["winedebug"],  # Wine debug level
+            PYTHONHOME=self._p[
+                "pythonprefix"
+            ],  # Python home for Wine Python (can be a Unix path)
+            VIRTUAL_ENV="",  # Reset Unix virtual env variable - wenv is "independent"
+            PIP_NO_WARN_SCRIPT_LOCATION="0",  # pip will not warn that pythonprefix and scripts are not in PATH
+        )
+
+        if self._p["pip_index_url"] is not None:
+            overrides["PIP_INDEX_URL"] = self._p["pip_index_url"]  # e.g. a mirror, see wenv mirror
+
+        return overrides
+
+    def _get_subprocess_envvar_dict(self) -> Dict[str, str]:
+        """
+        Environment for ``wenv`` sub-processes, carrying the resolved configuration.
+        """
+
+        envvar_dict = os.environ.copy()
+        envvar_dict.update(self._p.export_envvar_dict())
+        envvar_dict["WENV_SPEC"] = self.to_spec()  # spares the child configuration discovery
+
+        return envvar_dict
+
+    def _get_trace_tags(self) -> Dict[str, str]:
+        """
+        Identifies this environment in trace records, see ``WENV_TRACE``.
+        """
+
+        return {
+            "arch": self._p["arch"],
+            "version": self._p["pythonversion"].as_config(),
+            "wineprefix": self._p["wineprefix"],
+        }
+
+    def _trace(self, phase: str, **tags: Any):
+        """
+        Times a phase of this environment if ``WENV_TRACE`` is set, see :func:`wenv._core.trace.trace`.
+        """
+
+        if get_trace_path() is not None:
+            tags.update(self._get_trace_tags())
+
+        return trace(phase, **tags)
+
+    def _tagged(self):
+        """
+        Tags all trace records within, e.g. of downloads, with this environment, see :func:`wenv._core.trace.tagged`.
+        """
+
+        return tagged(**(self._get_trace_tags() if get_trace_path() is not None else {}))
 
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # WINE BUG #47766 / ZUGBRUECKE BUG #49
@@ -177,6 +354,11 @@ class Env:
         .. _Wine bug #47766: https://bugs.winehq.org/show_bug.cgi?id=47766
         """
 
+        with self._trace("wine_47766_workaround"):
+            self._wine_47766_workaround()
+
+    def _wine_47766_workaround(self):
+
         is_clean = lambda path: not any(
             [seg.startswith(".") for seg in path.split(os.path.sep)]
         )
@@ -227,10 +409,16 @@ class Env:
         Deletes pth-file or reconstructs it from backup depending on ``no_pth_file`` configuration parameter.
         Relevant for prepending ``""`` to ``sys.path`` in CPython >= 3.11 thanks to `CPython PR #31542`_.
         This function works around "Modules/getpath.py sets safe_path to 1 if a "._pth" file is present".
+        It runs right before Wine is launched, see :meth:`wenv.Env.cli`, :meth:`wenv.Env.shebang` and :meth:`wenv.Env.setup_shims`.
 
         .. _CPython PR #31542: https://github.com/python/cpython/pull/31542
         """
 
+        with self._trace("cpython_31542_pth_workaround"):
+            self._cpython_31542_pth_workaround()
+
+    def _cpython_31542_pth_workaround(self):
+
         pth_backup = self._path_dict["pth"] + '.backup'
 
         if not os.path.exists(pth_backup):
@@ -258,10 +446,11 @@ class Env:
             - :meth:`wenv.Env.setup_pip`
         """
 
-        self.setup_wineprefix()
-        self.setup_pythonprefix()
-        self.wine_47766_workaround()  # must run after setup_pythonprefix and before setup_pip
-        self.setup_pip()
+        with self._trace("ensure"):
+            self.setup_wineprefix()
+            self.setup_pythonprefix()
+            self.wine_47766_workaround()  # must run after setup_pythonprefix and before setup_pip
+            self.setup_pip()
 
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # DESTROY / UNINSTALL ENVIRONMENT
@@ -272,6 +461,9 @@ class Env:
         Equivalent to ``wenv clean``. It removes the current Wine Python environment, i.e. Python interpreter, pip, setuptools, wheel and all installed packages.
         """
 
+        # Stop managed wineserver before its prefix vanishes
+        self.server.stop()
+
         # Does Wine prefix exist?
         if os.path.exists(self._p["wineprefix"]):
             # Delete tree
@@ -282,84 +474,426 @@ class Env:
             # Delete tree
             shutil.rmtree(self._p["pythonprefix"])
 
+        # Do shims exist?
+        if os.path.exists(self._p["shims"]):
+            # Delete tree
+            shutil.rmtree(self._p["shims"])
+
         self.wine_47766_workaround_uninstall()
 
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    # WINESERVER
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+    @property
+    def server(self) -> Server:
+        """
+        The wineserver of this environment's Wine prefix, see :class:`wenv.Server`. Equivalent to ``wenv server [start|stop|status]``. While it is running, all Wine processes launched by this environment, e.g. by ``wenv python`` or :meth:`wenv.Env.install_package`, attach to it instead of cold-starting their own.
+        """
+
+        return Server(
+            wineprefix=self._p["wineprefix"],
+            envvar_dict=self._envvar_dict,
+            binary=self._p["wineserver_bin"],
+            keepalive=self._p["wineserver_keepalive"],
+        )
+
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    # ARTIFACT STORE
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+    @property
+    def store(self):
+        """
+        Content-addressed store of downloaded artifacts in ``{cache}/store``, shared by all environments with the same ``cache``. See configuration parameter ``store_size_limit``.
+        """
+
+        from .store import Store  # sqlite3 and urllib are expensive to import
+
+        return Store(os.path.join(self._p["cache"], "store"), self._p["store_size_limit"])
+
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    # DOWNLOAD MIRRORS
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+    def _get_mirrors(self, source: str):
+        """
+        Mirrors of a source of downloads, see configuration parameter ``mirrors`` and :class:`wenv._core.source.Mirrors`.
+        """
+
+        from .source import get_mirrors  # urllib is expensive to import
+
+        return get_mirrors(SOURCES[source], list(self._p["mirrors"].get(source, [])))
+
+    def _get_mirrors_for(self, url: str):
+
+        for source, origin in SOURCES.items():
+            if url.startswith(origin):
+                return self._get_mirrors(source)
+
+        return self._get_mirrors("python")  # passes foreign URLs through
+
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    # PACKAGE MIRROR
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+    @property
+    def mirror(self):
+        """
+        Local `PEP 503`_ simple index of the files in ``packages``, see :class:`wenv._core.mirror.Mirror` and configuration parameter ``mirror``. Equivalent to ``wenv mirror``. Point ``pip`` at it via configuration parameter ``pip_index_url``.
+
+        .. _PEP 503: https://peps.python.org/pep-0503/
+        """
+
+        from .mirror import Mirror  # http.server is expensive to import
+
+        return Mirror(self._p["mirror"])
+
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # CACHE INSTALLATION FILES LOCALLY
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-    def cache(self):
+    def cache(self, progress: Optional[Callable] = None) -> Dict[str, Any]:
         """
-        Equivalent to ``wenv cache``. It fetches installation files and caches them for offline usage, including the Python interpreter, pip, setuptools and wheel.
+        Equivalent to ``wenv cache``. It fetches installation files and caches them for offline usage, including the Python interpreter, pip, setuptools and wheel. All files are fetched concurrently, at most ``download_workers`` at a time.
+
+        Args:
+            progress : Called once per cached file, from worker threads, with a dictionary of format ``{"name": str, "bytes": int, "seconds": float}``.
+        Returns:
+            A dictionary of format ``{"files": int, "bytes": int, "seconds": float}``.
         """
 
-        os.makedirs(self._p["cache"], exist_ok=True)
+        return self._cache(
+            [partial(self._get_package_files, name) for name in ("pip", "setuptools", "wheel")],
+            [self._p["pythonversion"]],
+            progress,
+        )
 
-        with open(os.path.join(self._p["cache"], self._p["pythonversion"].as_zipname()), "wb") as f:
-            f.write(self._get_python(offline=False))
-        with open(os.path.join(self._p["cache"], "get-pip.py"), "wb") as f:
-            f.write(self._get_pip(offline=False))
-        with open(os.path.join(self._p["cache"], "site.py"), "wb") as f:
-            f.write(self._get_sitepy(offline=False))
+    def cache_matrix(self, arches: List[str], versions: List[str], progress: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Equivalent to ``wenv cache --matrix {arches} {versions}``. Like :meth:`wenv.Env.cache`, but for every combination of architectures and Python versions at once, e.g. for preparing one shared cache for many ``offline`` environments. Files required by more than one combination, e.g. ``get-pip.py`` or pure-Python wheels, are fetched once. All files are fetched concurrently, at most ``download_workers`` at a time.
 
-        for package in ("pip", "setuptools", "wheel"):
-            self.cache_package(package)
+        Args:
+            arches : Build architectures, e.g. ``["win32", "win64"]``.
+            versions : Python versions, either full like ``3.10.4`` or as major and minor version like ``3.10``. The latter refer to the latest stable build of each architecture, see :func:`wenv.get_latest_python_build`.
+            progress : See :meth:`wenv.Env.cache`.
+        Returns:
+            See :meth:`wenv.Env.cache`.
+        """
 
-    def cache_package(self, name: str):
+        pythonversions = self._get_matrix(arches, versions)
+
+        return self._cache(
+            [partial(self._get_package_files, name, pythonversions) for name in ("pip", "setuptools", "wheel")],
+            pythonversions,
+            progress,
+        )
+
+    def cache_package(self, name: str, progress: Optional[Callable] = None) -> Dict[str, Any]:
         """
         Caches a specific package by nameself.
 
         Args:
             name : Name of PyPI package
+            progress : See :meth:`wenv.Env.cache`.
+        Returns:
+            See :meth:`wenv.Env.cache`.
+        """
+
+        return self._cache([partial(self._get_package_files, name)], [], progress)
+
+    def cache_requirements(self, requirements: str, progress: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Equivalent to ``wenv cache -r {requirements}``. Caches the full dependency closure of a requirements file in ``packages``, e.g. for ``offline`` environments or ``wenv mirror``. Requirements are resolved for this environment's architecture and Python version by ``pip`` on the *Unix* host, without starting *Wine*. This requires ``pip`` 22.2 or later on the host. As nothing can be built for the target platform, only wheels are considered. Files are fetched concurrently, at most ``download_workers`` at a time.
+
+        Args:
+            requirements : Path to a ``pip`` requirements file.
+            progress : See :meth:`wenv.Env.cache`.
+        Returns:
+            See :meth:`wenv.Env.cache`.
         """
 
+        return self._cache([partial(self._get_requirements_files, requirements)], [], progress)
+
+    def _cache(self, resolvers: List[Callable], installers: List[PythonVersion], progress: Optional[Callable]) -> Dict[str, Any]:
+        """
+        Fetches installation files for all Python versions in ``installers`` and the package files returned by ``resolvers``, callables which run in parallel to the downloads. Files are fetched once per file name.
+        """
+
+        from concurrent.futures import ThreadPoolExecutor  # expensive to import
+        from contextvars import copy_context
+
+        os.makedirs(self._p["cache"], exist_ok=True)
         os.makedirs(self._p["packages"], exist_ok=True)
 
-        meta = json.loads(
-            download("https://pypi.org/pypi/%s/json" % name, mode="binary").decode(
-                "utf-8"
+        start = time.monotonic()
+
+        # Worker threads run in copies of this context, so their trace records are tagged, too
+        with self._tagged(), ThreadPoolExecutor(max_workers=self._p["download_workers"]) as pool:
+
+            futures = []
+
+            fns = {}  # shared files, e.g. get-pip.py, once
+            for pythonversion in installers:
+                for fn in self._get_installer_urls(pythonversion).keys():
+                    fns.setdefault(fn, pythonversion)
+
+            for fn, pythonversion in fns.items():  # start right away, package metadata is resolved in parallel
+                futures.append(pool.submit(
+                    copy_context().run,
+                    self._cache_file,
+                    fn,
+                    lambda fn=fn, pythonversion=pythonversion: self._get_installer_file(
+                        fn, False, self._p["cache"], pythonversion
+                    ),
+                    progress,
+                ))
+
+            filenames = set()
+            for items in pool.map(
+                lambda resolve, context: context.run(resolve),
+                resolvers,
+                [copy_context() for _ in resolvers],
+            ):
+                for item in items:
+                    if item["filename"] in filenames:
+                        continue
+                    filenames.add(item["filename"])
+                    futures.append(pool.submit(
+                        copy_context().run,
+                        self._cache_file,
+                        item["filename"],
+                        lambda item=item: self._get_package_file(item),
+                        progress,
+                    ))
+
+            sizes = [future.result() for future in futures]
+
+        return {
+            "files": len(sizes),
+            "bytes": sum(sizes),
+            "seconds": time.monotonic() - start,
+        }
+
+    @staticmethod
+    def _cache_file(name: str, fetch: Callable, progress: Optional[Callable]) -> int:
+
+        start = time.monotonic()
+        size = os.path.getsize(fetch())
+
+        if progress is not None:
+            progress({"name": name, "bytes": size, "seconds": time.monotonic() - start})
+
+        return size
+
+    def _get_matrix(self, arches: List[str], versions: List[str]) -> List[PythonVersion]:
+        """
+        Python versions for all combinations of architectures and versions, resolving major and minor versions to their latest stable builds.
+        """
+
+        builds = None
+
+        pythonversions = []
+        for arch in arches:
+            for version in versions:
+                if len(version.split(".")) != 2:
+                    pythonversion = PythonVersion.from_config(arch, version)
+                else:
+                    if builds is None:
+                        from .source import get_available_python_builds  # urllib is expensive to import
+                        with self._tagged():
+                            builds = PythonBuilds(self._get_mirrors("python").fetch(
+                                SOURCES["python"], lambda base: get_available_python_builds(url=base)
+                            ))  # preferred mirror first
+                    major, minor = (int(segment) for segment in version.split("."))
+                    pythonversion = next(
+                        (build for build in reversed(builds.get(arch, major, minor)) if build.build == "stable"),
+                        None,
+                    )
+                    if pythonversion is None:
+                        raise ValueError("no stable build available", arch, version)
+                if (arch, str(pythonversion)) not in ((item.arch, str(item)) for item in pythonversions):
+                    pythonversions.append(pythonversion)
+
+        return pythonversions
+
+    def _get_package_files(self, name: str, pythonversions: Optional[List[PythonVersion]] = None) -> List[Dict[str, Any]]:
+        """
+        Files of the latest release of a PyPI package which fit this environment or, if given, any of ``pythonversions``, i.e. the most compatible wheel per version or, if there is none, the source distributions. PyPI's JSON metadata is cached per user and revalidated.
+        """
+
+        from http.client import HTTPException  # expensive to import
+        from zlib import crc32
+        from .source import download_cached, read_cached  # urllib is expensive to import
+        from .tags import select_files
+
+        url = SOURCES["pypi"] + "pypi/%s/json" % name
+        path = get_user_cache_dir("pypi", "%08x.json" % crc32(url.encode("utf-8")))  # shared by mirrors
+        try:
+            data = self._get_mirrors("pypi").fetch(
+                url,
+                lambda candidate: download_cached(candidate, path, key=url, stale=False),
+            )
+        except (HTTPException, OSError) as e:  # every mirror failed, includes URLError
+            data = read_cached(path, url)
+            if data is None:
+                raise e
+        meta = json.loads(data)
+
+        if pythonversions is None:
+            pythonversions = [self._p["pythonversion"]]
+
+        items = {}
+        for pythonversion in pythonversions:
+            for item in select_files(meta["urls"], pythonversion):
+                items.setdefault(item["filename"], item)
+
+        return list(items.values())
+
+    def _get_requirements_files(self, requirements: str) -> List[Dict[str, Any]]:
+        """
+        Files of the dependency closure of a requirements file, resolved by ``pip`` on the host for this environment's platform, Python tags and environment markers, in the format of PyPI's JSON metadata.
+        """
+
+        from tempfile import TemporaryDirectory  # expensive to import
+        from urllib.parse import unquote, urlsplit
+        from .tags import get_pip_target_args, get_pip_target_command
+
+        with self._trace("resolve", requirements=requirements), TemporaryDirectory() as tmp:
+            proc = subprocess.Popen(
+                [
+                    *get_pip_target_command(self._p["pythonversion"]), "install",
+                    "--dry-run",
+                    "--ignore-installed",
+                    "--quiet",
+                    "--report", "-",
+                    "--target", os.path.join(tmp, "target"),  # required by pip for foreign platforms, never written
+                    *get_pip_target_args(self._p["pythonversion"]),
+                    "-r", requirements,
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
             )
+            outs, errs = proc.communicate()
+        if proc.returncode != 0:
+            raise SystemError('resolving requirements "%s" failed' % requirements, outs, errs)
+
+        items = []
+        for entry in json.loads(outs.decode("utf-8"))["install"]:
+            info = entry["download_info"]
+            items.append({
+                "filename": unquote(urlsplit(info["url"]).path.rsplit("/", 1)[-1]),
+                "url": info["url"],
+                "digests": info.get("archive_info", {}).get("hashes", {}),
+            })
+
+        return items
+
+    def _get_package_file(self, item: Dict[str, Any]) -> str:
+
+        path = self.store.fetch(
+            item["url"],
+            sha256=item.get("digests", {}).get("sha256"),
+            size=item.get("size"),
+            segments=self._p["download_segments"],
         )
 
-        for item in meta["urls"]:
-            with open(os.path.join(self._p["packages"], item["filename"]), "wb") as f:
-                f.write(download(item["url"], mode="binary"))
+        target = os.path.join(self._p["packages"], item["filename"])
+        self.store.materialize(path, target)
+
+        return target
 
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # Fetch installer data
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-    def _get_python(self, offline: bool = False) -> bytes:
+    def _get_installer_urls(self, pythonversion: Optional[PythonVersion] = None) -> Dict[str, str]:
+        "file names and URLs of installation files, for this environment's or another Python version"
 
-        if offline:
-            with open(os.path.join(self._p["cache"], self._p["pythonversion"].as_zipname()), "rb") as f:
-                return f.read()
-        else:
-            return download(self._p["pythonversion"].as_url(), mode="binary")
+        if pythonversion is None:
+            pythonversion = self._p["pythonversion"]
+
+        return {
+            pythonversion.as_zipname(): pythonversion.as_url(SOURCES["python"]),
+            "get-pip.py": SOURCES["getpip"] + "get-pip.py",
+            self._get_sitepy_name(pythonversion): (
+                SOURCES["cpython"] + f"{pythonversion.as_githubtag():s}/Lib/site.py"
+            ),
+        }
 
-    def _get_pip(self, offline: bool = False) -> bytes:
+    def _get_installer_file(
+        self, fn: str, offline: bool, directory: Optional[str], pythonversion: Optional[PythonVersion] = None
+    ) -> str:
+        """
+        Path to an installation file, taken from the cache if offline. Otherwise, it is fetched through the store and, if ``directory`` is given, made available there as ``fn``.
+        """
 
         if offline:
-            with open(os.path.join(self._p["cache"], "get-pip.py"), "rb") as f:
-                return f.read()
-        else:
-            return download("https://bootstrap.pypa.io/get-pip.py", mode="text").encode(
-                "utf-8"
-            )
+            return os.path.join(self._p["cache"], fn)
 
-    def _get_sitepy(self, offline: bool = False) -> bytes:
+        url = self._get_installer_urls(pythonversion)[fn]
+        path = self._get_mirrors_for(url).fetch(
+            url,
+            lambda candidate: self.store.fetch(candidate, segments=self._p["download_segments"], key=url),
+        )
+
+        if directory is None:
+            return path
+
+        target = os.path.join(directory, fn)
+        self.store.materialize(path, target)
+
+        return target
+
+    @contextmanager
+    def _use_installer_file(self, fn: str, offline: bool) -> Generator:
+        """
+        Path to an installation file for reading, taken from the cache if offline. Otherwise, the store object is pinned while in use, so other processes can not evict it meanwhile.
+        """
 
         if offline:
-            with open(os.path.join(self._p["cache"], "site.py"), "rb") as f:
-                return f.read()
-        else:
-            return download(
-                (
-                    "https://raw.githubusercontent.com/python/cpython/"
-                    f"{self._p['pythonversion'].as_githubtag():s}/Lib/site.py"
-                ),
-                mode="text"
-            ).encode("utf-8")
+            yield self._get_installer_file(fn, True, None)
+            return
+
+        url = self._get_installer_urls()[fn]
+        for _ in range(3):
+            with self._tagged():
+                self._get_installer_file(fn, False, None)
+            with self.store.pin(url) as path:
+                if path is not None:
+                    yield path
+                    return
+            # evicted by another process right after fetching, fetch again
+
+        raise FileNotFoundError("installation file evicted repeatedly", fn)
+
+    @contextmanager
+    def _use_python(self, offline: bool = False) -> Generator:
+
+        with self._use_installer_file(self._p["pythonversion"].as_zipname(), offline) as path:
+            yield path
+
+    @contextmanager
+    def _use_pip(self, offline: bool = False) -> Generator:
+
+        with self._use_installer_file("get-pip.py", offline) as path:
+            yield path
+
+    @contextmanager
+    def _use_sitepy(self, offline: bool = False) -> Generator:
+
+        fn = self._get_sitepy_name(self._p["pythonversion"])
+        if offline and not os.path.isfile(os.path.join(self._p["cache"], fn)):
+            fn = "site.py"  # cached by wenv 0.5 or earlier, one version per cache
+
+        with self._use_installer_file(fn, offline) as path:
+            yield path
+
+    @staticmethod
+    def _get_sitepy_name(pythonversion: PythonVersion) -> str:
+        "site.py differs per Python version, so does its name in the cache"
+
+        return "site-%s.py" % pythonversion.as_githubtag()
 
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # SETUP
@@ -391,8 +925,9 @@ class Env:
         # Start wine server into prepared environment
         envvar_dict = self._envvar_dict.copy()
         envvar_dict["DISPLAY"] = ""
-        proc = subprocess.Popen(["wine", "wineboot", "-i"], env=envvar_dict)
-        proc.wait()
+        with self._trace("wineboot"):
+            proc = subprocess.Popen(["wine", "wineboot", "-i"], env=envvar_dict)
+            proc.wait()
         if proc.returncode != 0:
             sys.exit(1)
 
@@ -425,23 +960,17 @@ class Env:
         # Only do if Python is not there OR if should be overwritten
         if overwrite or not preexisting:
 
-            # Generate in-memory file-like-object
-            archive_zip = BytesIO()
-            # Fetch Python zip file
-            archive_zip.write(self._get_python(self._p["offline"]))
-            # Unpack from memory to disk
-            with zipfile.ZipFile(archive_zip) as f:
-                f.extractall(
-                    path=self._p["pythonprefix"]
-                )  # Directory created if required
-
-            # Unpack Python library from embedded zip on disk
-            with zipfile.ZipFile(self._path_dict["libzip"], "r") as f:
-                f.extractall(
-                    path=self._path_dict["lib"]
-                )  # Directory created if required
-            # Remove Python library zip from disk
-            os.remove(self._path_dict["libzip"])
+            from .archive import extract_zip  # zipfile is expensive to import
+
+            # Fetch Python zip file, i.e. path in cache or pinned in store, never loaded into memory
+            with self._use_python(self._p["offline"]) as archive_zip, self._trace("extract", archive="python") as phase:
+                # Unpack Python zip file and, straight from within it, the embedded Python library
+                written = extract_zip(
+                    archive_zip,
+                    self._p["pythonprefix"],
+                    nested={os.path.basename(self._path_dict["libzip"]): self._path_dict["lib"]},
+                )  # Directories created if required
+                phase.tags.update(bytes=written)
 
             # HACK: Fix library path in pth-file (CPython >= 3.6)
             with open(self._path_dict["pth"], "w") as f:
@@ -455,7 +984,8 @@ class Env:
             # For details, see https://bugs.python.org/issue34841
             if os.path.exists(self._path_dict['sitepy'] + 'c'):
                 os.remove(self._path_dict['sitepy'] + 'c')
-            sitepy = self._get_sitepy(self._p["offline"]).decode('utf-8').split('\n')
+            with self._use_sitepy(self._p["offline"]) as path, open(path, mode = 'r', encoding = 'utf-8') as f:
+                sitepy = f.read().split('\n')
             idx = sitepy.index('    main()')
             sitepy.insert(idx + 1, '    sys.path.insert(0, "")')
             sitepy = '\n'.join(sitepy)
@@ -480,29 +1010,30 @@ class Env:
         if os.path.isfile(self._path_dict["pip"]):
             return
 
-        envvar_dict = {k: os.environ[k] for k in os.environ.keys()}
-        envvar_dict.update(self._p.export_envvar_dict())
+        envvar_dict = self._get_subprocess_envvar_dict()
 
         if self._p["offline"]:
-            proc = subprocess.Popen(
-                [
-                    "wenv",
-                    "python",
-                    os.path.join(self._p["cache"], "get-pip.py"),
-                    "--no-index",
-                    "--find-links=%s" % self._p["packages"],
-                ],
-                env=envvar_dict,
-            )
-            proc.wait()
+            with self._trace("get_pip", offline=True):
+                proc = subprocess.Popen(
+                    [
+                        "wenv",
+                        "python",
+                        os.path.join(self._p["cache"], "get-pip.py"),
+                        "--no-index",
+                        "--find-links=%s" % self._p["packages"],
+                    ],
+                    env=envvar_dict,
+                )
+                proc.wait()
         else:
-            getpip = self._get_pip(self._p["offline"])
-            proc = subprocess.Popen(
-                ["wenv", "python"], stdin=subprocess.PIPE, env=envvar_dict
-            )
-            proc.communicate(input=getpip)
+            with self._use_pip(self._p["offline"]) as getpip, self._trace("get_pip", offline=False), open(getpip, "rb") as f:
+                proc = subprocess.Popen(
+                    ["wenv", "python"], stdin=f, env=envvar_dict
+                )
+                proc.wait()
 
         self._init_dicts()
+        self._refresh_shims()
 
     def setup_coverage_activate(self):
         """
@@ -519,6 +1050,78 @@ class Env:
         with open(self._path_dict["sitecustomize"], "w") as f:
             f.write(siteconfig_cnt + "\n" + COVERAGE_STARTUP)
 
+    def setup_shims(self):
+        """
+        Equivalent to ``wenv shims``. Writes one POSIX shell script per command of the environment into the ``shims`` folder, e.g. ``python``, ``pip`` or ``pytest``. Each of them directly replaces itself with *Wine* running the command, without starting a *Unix* *Python* interpreter or constructing an :class:`wenv.Env`. The additional ``_wenv_python`` script behaves like its namesake and can be used as a shebang: ``#!/path/to/shims/_wenv_python``. Shims are regenerated by :meth:`wenv.Env.setup_pip`, :meth:`wenv.Env.install_package` and :meth:`wenv.Env.uninstall_package` once they exist.
+        """
+
+        self.wine_47766_workaround()  # shims must point to the symlink if there is one
+        self.cpython_31542_pth_workaround()
+
+        wine = self._wine_dict[self._p["arch"]]
+        wine = shutil.which(wine, path=self._envvar_dict.get("PATH")) or wine
+
+        exports = [
+            "export {NAME:s}={VALUE:s}".format(NAME=name, VALUE=shlex.quote(value))
+            for name, value in self._get_envvar_overrides().items()
+        ]
+        if self._p["wineinstallprefix"] not in (None, ""):
+            for name, subdirs in (("PATH", ("bin",)), ("LD_LIBRARY_PATH", ("lib", "lib64"))):
+                exports.append(
+                    'export {NAME:s}={PREFIX:s}:"${NAME:s}"'.format(
+                        NAME=name,
+                        PREFIX=":".join(
+                            shlex.quote(os.path.join(self._p["wineinstallprefix"], subdir))
+                            for subdir in subdirs
+                        ),
+                    )
+                )
+
+        link = ""
+        if os.path.islink(self._p["pythonprefix"]):  # e.g. /tmp was cleaned since
+            link = "[ -e {LINK:s} ] || ln -s {TARGET:s} {LINK:s}\n".format(
+                LINK=shlex.quote(self._p["pythonprefix"]),
+                TARGET=shlex.quote(os.readlink(self._p["pythonprefix"])),
+            )
+
+        shims = {
+            name: (path, '"$@"')
+            for name, path in self._cmd_dict.items()
+        }
+        if "python" in self._cmd_dict.keys():
+            shims["_wenv_python"] = (self._cmd_dict["python"], '"$1"')
+
+        os.makedirs(self._p["shims"], exist_ok=True)
+
+        for name in os.listdir(self._p["shims"]):  # remove shims of uninstalled commands
+            path = os.path.join(self._p["shims"], name)
+            if name in shims.keys() or not os.path.isfile(path):
+                continue
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                if SHIM_MARKER in f.read(256):
+                    os.remove(path)
+
+        for name, (exe, args) in shims.items():
+            path = os.path.join(self._p["shims"], name)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(
+                    SHIM_STR.format(
+                        MARKER=SHIM_MARKER,
+                        EXPORTS="\n".join(exports),
+                        LINK=link,
+                        WINE=shlex.quote(wine),
+                        EXE=shlex.quote(exe),
+                        ARGS=args,
+                    )
+                )
+            os.chmod(path + ".tmp", 0o755)
+            os.replace(path + ".tmp", path)
+
+    def _refresh_shims(self):
+
+        if os.path.isdir(self._p["shims"]):
+            self.setup_shims()
+
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # PACKAGE MANAGEMENT
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -544,17 +1147,18 @@ class Env:
             cmd.append("-U")
         cmd.append(name)
 
-        envvar_dict = {k: os.environ[k] for k in os.environ.keys()}
-        envvar_dict.update(self._p.export_envvar_dict())
+        envvar_dict = self._get_subprocess_envvar_dict()
 
-        proc = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=envvar_dict
-        )
-        outs, errs = proc.communicate()
+        with self._trace("pip_install", package=name):
+            proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=envvar_dict
+            )
+            outs, errs = proc.communicate()
         if proc.returncode != 0:
             raise SystemError('installing package "%s" failed' % name, outs, errs)
 
         self._init_dicts()
+        self._refresh_shims()
 
     def uninstall_package(self, name: str):
         """
@@ -569,20 +1173,21 @@ class Env:
         if len(name) == 0:
             raise ValueError("name must not be empty")
 
-        envvar_dict = {k: os.environ[k] for k in os.environ.keys()}
-        envvar_dict.update(self._p.export_envvar_dict())
+        envvar_dict = self._get_subprocess_envvar_dict()
 
-        proc = subprocess.Popen(
-            ["wenv", "pip", "uninstall", "-y", name],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=envvar_dict,
-        )
-        outs, errs = proc.communicate()
+        with self._trace("pip_uninstall", package=name):
+            proc = subprocess.Popen(
+                ["wenv", "pip", "uninstall", "-y", name],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=envvar_dict,
+            )
+            outs, errs = proc.communicate()
         if proc.returncode != 0:
             raise SystemError('uninstalling package "%s" failed' % name, outs, errs)
 
         self._init_dicts()
+        self._refresh_shims()
 
     def list_packages(self) -> List[Dict[str, str]]:
         """
@@ -592,21 +1197,57 @@ class Env:
             A list of dictionaries of format ``{"name": "Name of PyPI package ", "version": "package version"}``.
         """
 
-        envvar_dict = {k: os.environ[k] for k in os.environ.keys()}
-        envvar_dict.update(self._p.export_envvar_dict())
+        envvar_dict = self._get_subprocess_envvar_dict()
 
-        proc = subprocess.Popen(
-            ["wenv", "pip", "list", "--format", "json"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=envvar_dict,
-        )
-        outs, errs = proc.communicate()
+        with self._trace("pip_list"):
+            proc = subprocess.Popen(
+                ["wenv", "pip", "list", "--format", "json"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=envvar_dict,
+            )
+            outs, errs = proc.communicate()
         if proc.returncode != 0:
             raise SystemError("listing packages failed", outs, errs)
 
         return json.loads(outs.decode("utf-8"))
 
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+    # LAUNCH MANIFEST
+    # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+    def _save_launch_manifest(self, wine: str):
+        """
+        Persists the resolved launch state so subsequent launches can skip constructing an ``Env``. Run after ``wine_47766_workaround``.
+        """
+
+        if not self._p["launch_manifest"]:
+            return
+
+        wine = shutil.which(wine, path=self._envvar_dict.get("PATH")) or wine
+
+        tracked = EnvConfig.get_config_files() + [
+            self._path_dict["pythonprefix"],
+            self._path_dict["scripts"],
+            wine,
+        ]
+
+        try:
+            LaunchManifest(
+                wine=wine,
+                cmd_dict={
+                    key: value
+                    for key, value in self._cmd_dict.items()
+                    if key not in self._cli_dict.keys()
+                },
+                envvar_overrides=self._get_envvar_overrides(),
+                wineinstallprefix=self._p["wineinstallprefix"],
+                stamps={path: stat_stamp(path) for path in tracked},
+                trace_tags=self._get_trace_tags(),
+            ).save()
+        except OSError:
+            pass  # launching must not depend on a writable cache
+
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # CLI
     # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -622,9 +1263,103 @@ class Env:
         self.setup_coverage_activate()
 
     def _cli_cache(self):
-        "fetches installation files and caches them for offline usage (Python interpreter, pip, setuptools, wheel)"
+        "fetches installation files and caches them for offline usage (Python interpreter, pip, setuptools, wheel), `-r requirements.txt` caches a requirements file with all dependencies instead, `--matrix win32,win64 3.9,3.10` caches installation files for all combinations of architectures and versions"
 
-        self.cache()
+        def report(item):
+            sys.stdout.write(
+                "{NAME:<60s} {SIZE:>10.1f} KiB {SECONDS:>7.2f} s\n".format(
+                    NAME=item["name"], SIZE=item["bytes"] / 1024, SECONDS=item["seconds"]
+                )
+            )
+            sys.stdout.flush()
+
+        args = sys.argv[2:]
+        if len(args) == 0:
+            summary = self.cache(progress=report)
+        elif len(args) == 2 and args[0] in ("-r", "--requirement"):
+            summary = self.cache_requirements(args[1], progress=report)
+        elif len(args) == 3 and args[0] == "--matrix":
+            summary = self.cache_matrix(args[1].split(","), args[2].split(","), progress=report)
+        else:
+            sys.stderr.write('Unknown cache arguments: "{ARGS:s}"\n'.format(ARGS=" ".join(args)))
+            sys.stderr.flush()
+            sys.exit(1)
+
+        sys.stdout.write(
+            "cached {FILES:d} files, {SIZE:0.1f} MiB in {SECONDS:0.2f} s\n".format(
+                FILES=summary["files"], SIZE=summary["bytes"] / 1024 ** 2, SECONDS=summary["seconds"]
+            )
+        )
+        sys.stdout.flush()
+
+    def _cli_mirror(self):
+        "builds or updates a PEP 503 simple index of cached packages, `serve [port]` also serves it via HTTP"
+
+        action = sys.argv[2] if len(sys.argv) > 2 else None
+        if action not in (None, "serve"):
+            sys.stderr.write('Unknown mirror action: "{ACTION:s}"\n'.format(ACTION=action))
+            sys.stderr.flush()
+            sys.exit(1)
+
+        mirror = self.mirror
+        summary = mirror.update(self._p["packages"])
+
+        sys.stdout.write(
+            "indexed {FILES:d} files of {PROJECTS:d} projects, {UPDATED:d} new or changed\n".format(
+                FILES=summary["files"], PROJECTS=summary["projects"], UPDATED=summary["updated"]
+            )
+        )
+
+        if action is None:
+            sys.stdout.write(mirror.index_url + "\n")
+            sys.stdout.flush()
+            return
+
+        server = mirror.make_server(port=int(sys.argv[3]) if len(sys.argv) > 3 else MIRROR_PORT)
+        sys.stdout.write("http://{HOST:s}:{PORT:d}/simple/\n".format(
+            HOST=server.server_address[0], PORT=server.server_address[1]
+        ))
+        sys.stdout.flush()
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    def _cli_shims(self):
+        "writes shell scripts for all installed commands into the `shims` folder, e.g. for adding it to `PATH`"
+
+        self.setup_shims()
+
+        sys.stdout.write(self._p["shims"] + "\n")
+        sys.stdout.flush()
+
+    def _cli_server(self):
+        "manages a persistent wineserver for the environment (`start`, `stop` or `status`)"
+
+        action = sys.argv[2] if len(sys.argv) > 2 else "status"
+
+        if action == "start":
+            self.server.start()
+        elif action == "stop":
+            self.server.stop()
+        elif action == "status":
+            status = self.server.status()
+            sys.stdout.write(
+                "running: {RUNNING:s}\npid: {PID:s}\nuptime: {UPTIME:s}\nprocesses: {PROCESSES:s}\n".format(
+                    RUNNING="yes" if status["running"] else "no",
+                    PID="-" if status["pid"] is None else str(status["pid"]),
+                    UPTIME="-" if status["uptime"] is None else "%0.1f s" % status["uptime"],
+                    PROCESSES=" ".join(str(pid) for pid in status["processes"]) if len(status["processes"]) > 0 else "-",
+                )
+            )
+            sys.stdout.flush()
+        else:
+            sys.stderr.write('Unknown server action: "{ACTION:s}"\n'.format(ACTION=action))
+            sys.stderr.flush()
+            sys.exit(1)
 
     def _cli_clean(self):
         "removes current environment (Python interpreter, pip, setuptools, wheel, all installed packages)"
@@ -718,8 +1453,11 @@ class Env:
         wine = self._wine_dict[self._p["arch"]]
 
         self.wine_47766_workaround()
+        self.cpython_31542_pth_workaround()
+        self._save_launch_manifest(wine)
 
         # Replace this process with Wine
+        mark("exec", command=cmd, manifest=False, **self._get_trace_tags())
         os.execvpe(
             wine,
             (wine, self._cmd_dict[cmd])
@@ -747,23 +1485,11 @@ class Env:
         wine = self._wine_dict[self._p["arch"]]
 
         self.wine_47766_workaround()
+        self.cpython_31542_pth_workaround()
+        self._save_launch_manifest(wine)
 
         # Replace this process with Wine
+        mark("exec", command="python", manifest=False, **self._get_trace_tags())
         os.execvpe(
             wine, (wine, self._cmd_dict["python"], sys.argv[1]), self._envvar_dict
         )
-
-
-# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-# CLI EXPORT
-# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-
-
-def cli():
-
-    Env().cli()
-
-
-def shebang():
-
-    Env().shebang()
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/launch.py: Launch environment and cached launch manifest
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import os
+import sys
+from typing import Dict, List, Mapping, Optional
+import zlib
+
+from .trace import mark
+from .typeguard import typechecked
+from .usercache import get_user_cache_dir, prune_json, read_json, stat_stamp, write_json
+
+import wenv # HACK für version
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+MANIFEST_LIMIT = 64  # manifests kept per user, the least recently written ones are removed first
+MANIFEST_VERSION = 2
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+def get_envvar_dict(
+    environ: Mapping[str, str],
+    overrides: Dict[str, str],
+    wineinstallprefix: Optional[str],
+) -> Dict[str, str]:
+    """
+    Combines a base environment with the environment variables of a Wine Python environment. ``WENV_SPEC`` is meant for ``wenv``'s own child processes and is not passed on to programs running on Wine.
+
+    Args:
+        environ : Base environment, usually ``os.environ``.
+        overrides : Variables set by ``wenv``, e.g. ``WINEPREFIX``.
+        wineinstallprefix : Custom installation of Wine outside of ``PATH`` or ``None``.
+    Returns:
+        Environment for launching Wine.
+    """
+
+    envvar_dict = dict(environ)
+    envvar_dict.pop("WENV_SPEC", None)
+    envvar_dict.update(overrides)
+
+    if wineinstallprefix not in (
+        None,
+        "",
+    ):  # allow custom installations of Wine outside of PATH
+        path = envvar_dict.get("PATH", "")
+        envvar_dict["PATH"] = (
+            os.path.join(wineinstallprefix, "bin") + ":" + path
+        )
+        ld_library_path = envvar_dict.get("LD_LIBRARY_PATH", "")
+        envvar_dict["LD_LIBRARY_PATH"] = ":".join(
+            (
+                os.path.join(wineinstallprefix, "lib"),
+                os.path.join(wineinstallprefix, "lib64"),
+                ld_library_path,
+            )
+        )  # https://wiki.winehq.org/FAQ#Can_I_install_more_than_one_Wine_version_on_my_system.3F
+
+    return envvar_dict
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+class LaunchManifest:
+    """
+    Persisted outcome of everything :meth:`wenv.Env.cli` resolves before it replaces itself with Wine: Wine binary, commands, environment variables and the target of the `Wine bug #47766`_ symlink. Manifests are stored per user and invocation context, i.e. working directory, ``WENV*`` environment variables and ``wenv`` installation. They are invalidated by changes to configuration files, the Python prefix, its ``Scripts`` folder or the Wine binary.
+
+    Args:
+        wine : Wine binary, ideally an absolute path.
+        cmd_dict : Names of commands and paths of their executables.
+        envvar_overrides : Variables set by ``wenv`` on top of the current environment.
+        wineinstallprefix : Custom installation of Wine outside of ``PATH`` or ``None``.
+        stamps : Paths and their fingerprints at the time of creation, see ``stat_stamp``.
+        trace_tags : Identify the environment in trace records, see ``WENV_TRACE``.
+    """
+
+    def __init__(
+        self,
+        wine: str,
+        cmd_dict: Dict[str, str],
+        envvar_overrides: Dict[str, str],
+        wineinstallprefix: Optional[str],
+        stamps: Dict[str, Optional[List[int]]],
+        trace_tags: Optional[Dict[str, str]] = None,
+    ):
+
+        self._wine = wine
+        self._cmd_dict = cmd_dict
+        self._envvar_overrides = envvar_overrides
+        self._wineinstallprefix = wineinstallprefix
+        self._stamps = stamps
+        self._trace_tags = {} if trace_tags is None else trace_tags
+
+    def exec(self, cmd: str, param: List[str]):
+        """
+        Replaces this process with Wine running a command. Returns without action if the command is unknown.
+
+        Args:
+            cmd : Name of command, e.g. ``python``.
+            param : Command line arguments passed on to the command.
+        """
+
+        if cmd not in self._cmd_dict.keys():
+            return
+
+        mark("exec", command=cmd, manifest=True, **self._trace_tags)
+        os.execvpe(
+            self._wine,
+            [self._wine, self._cmd_dict[cmd]] + param,
+            get_envvar_dict(os.environ, self._envvar_overrides, self._wineinstallprefix),
+        )
+
+    def save(self):
+        """
+        Stores the manifest for the current invocation context.
+        """
+
+        key = self._get_key()
+        path = self._get_path(key)
+
+        write_json(
+            path,
+            {
+                "version": MANIFEST_VERSION,
+                "key": key,
+                "wine": self._wine,
+                "cmd": self._cmd_dict,
+                "envvar": self._envvar_overrides,
+                "wineinstallprefix": self._wineinstallprefix,
+                "stamps": self._stamps,
+                "trace": self._trace_tags,
+            },
+        )
+        prune_json(os.path.dirname(path), MANIFEST_LIMIT)
+
+    @classmethod
+    def load(cls):
+        """
+        Loads the manifest for the current invocation context, costing one ``stat`` per tracked path.
+
+        Returns:
+            A :class:`LaunchManifest` object or ``None`` if there is no valid manifest or manifests are disabled via ``WENV_LAUNCH_MANIFEST``.
+        """
+
+        if os.environ.get("WENV_LAUNCH_MANIFEST", "").strip().lower() == "false":
+            return None
+        if not os.environ.get("WENV_SPEC", "{").lstrip().startswith("{"):
+            return None  # specification behind file descriptor or path can not be part of the key
+
+        key = cls._get_key()
+        data = read_json(cls._get_path(key))
+
+        if not isinstance(data, dict):
+            return None
+        if data.get("version") != MANIFEST_VERSION or data.get("key") != key:
+            return None
+        if any(stat_stamp(path) != stamp for path, stamp in data["stamps"].items()):
+            return None
+
+        return cls(
+            wine=data["wine"],
+            cmd_dict=data["cmd"],
+            envvar_overrides=data["envvar"],
+            wineinstallprefix=data["wineinstallprefix"],
+            stamps=data["stamps"],
+            trace_tags=data["trace"],
+        )
+
+    @staticmethod
+    def _get_key() -> str:
+
+        return json.dumps(
+            [
+                wenv.__version__,
+                sys.prefix,
+                __file__,  # default prefix depends on installation
+                os.getcwd(),
+                os.path.expanduser("~"),
+                os.environ.get("WENV"),
+                os.environ.get("PATH"),  # decides which Wine binary is used
+                sorted(
+                    [name, value]
+                    for name, value in os.environ.items()
+                    if name.startswith("WENV_")
+                ),
+            ]
+        )
+
+    @staticmethod
+    def _get_path(key: str) -> str:
+
+        return get_user_cache_dir(
+            "manifests", "%08x.json" % zlib.crc32(key.encode("utf-8"))
+        )  # collisions are harmless, the full key is compared on load
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLI EXPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def cli():
+
+    if len(sys.argv) > 1:  # fast path, does not return if successful
+        manifest = LaunchManifest.load()
+        if manifest is not None:
+            manifest.exec(sys.argv[1], sys.argv[2:])
+
+    from .env import Env  # slow path only
+
+    Env.from_environ().cli()
+
+
+def shebang():
+
+    if len(sys.argv) > 1:  # fast path, does not return if successful
+        manifest = LaunchManifest.load()
+        if manifest is not None:
+            manifest.exec("python", sys.argv[1:2])
+
+    from .env import Env  # slow path only
+
+    Env.from_environ().shebang()
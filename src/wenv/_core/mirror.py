@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/mirror.py: Local PEP 503 simple index of cached packages
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from functools import partial
+import hashlib
+from html import escape
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import os
+import re
+import shutil
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from .const import DOWNLOAD_CHUNK_SIZE, MIRROR_HOST, MIRROR_PORT
+from .store import link_file
+from .trace import trace
+from .typeguard import typechecked
+from .usercache import read_json, stat_stamp, write_json
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+_EXTENSIONS = (".whl", ".tar.gz", ".tar.bz2", ".tgz", ".zip")
+
+_PAGE = """<!DOCTYPE html>
+<html>
+  <head>
+    <meta name="pypi:repository-version" content="1.0">
+    <title>{TITLE:s}</title>
+  </head>
+  <body>
+    <h1>{TITLE:s}</h1>
+{LINKS:s}
+  </body>
+</html>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+class Mirror:
+    """
+    Static `PEP 503`_ simple index of cached packages, e.g. for pointing ``pip`` on air-gapped machines at it. Package files are hard links, where possible, into ``{root}/files``. The index itself is written to ``{root}/simple``. It can be used from disk or served via HTTP.
+
+    .. _PEP 503: https://peps.python.org/pep-0503/
+
+    Args:
+        root : Directory of the mirror, created if required.
+    """
+
+    def __init__(self, root: str):
+
+        self._root = root
+
+    @property
+    def root(self) -> str:
+        """
+        Directory of the mirror.
+        """
+
+        return self._root
+
+    @property
+    def index_url(self) -> str:
+        """
+        ``file://`` URL of the simple index on disk.
+        """
+
+        return "file://" + quote(os.path.join(os.path.abspath(self._root), "simple")) + "/"
+
+    def update(self, packages: str) -> Dict[str, int]:
+        """
+        Brings the index up to date with a folder of package files, i.e. wheels and source distributions. Only files which are new or changed since the last update are hashed and linked, and only pages which changed are rewritten. Projects without files are removed from the index.
+
+        Args:
+            packages : Folder of package files, typically the ``packages`` folder of the configuration.
+        Returns:
+            A dictionary of format ``{"projects": int, "files": int, "updated": int}``. ``updated`` counts new or changed files.
+        """
+
+        with trace("mirror", root=self._root) as phase:
+
+            os.makedirs(os.path.join(self._root, "files"), exist_ok=True)
+            os.makedirs(os.path.join(self._root, "simple"), exist_ok=True)
+
+            state_path = os.path.join(self._root, "state.json")
+            state = read_json(state_path)
+            if not isinstance(state, dict):
+                state = {}
+
+            files, projects, updated = {}, {}, 0
+            for fn in sorted(os.listdir(packages)) if os.path.isdir(packages) else []:
+                project = self.get_project_name(fn)
+                if project is None:
+                    continue
+                path = os.path.join(packages, fn)
+                stamp = stat_stamp(path)
+                if stamp is None or not os.path.isfile(path):
+                    continue
+                entry = state.get(fn)
+                if entry is None or entry["stamp"] != stamp or not os.path.isfile(self._get_file_path(fn)):
+                    entry = {"stamp": stamp, "sha256": self._link(path, self._get_file_path(fn))}
+                    updated += 1
+                files[fn] = entry
+                projects.setdefault(project, []).append(fn)
+
+            for fn in state.keys() - files.keys():
+                self._remove(self._get_file_path(fn))
+
+            existing = set(os.listdir(os.path.join(self._root, "simple")))
+            for project in existing - projects.keys() - {"index.html"}:
+                shutil.rmtree(os.path.join(self._root, "simple", project), ignore_errors=True)
+
+            for project, fns in projects.items():
+                self._write_page(
+                    os.path.join(self._root, "simple", project, "index.html"),
+                    "Links for %s" % project,
+                    [
+                        ("../../files/%s#sha256=%s" % (quote(fn), files[fn]["sha256"]), fn)
+                        for fn in fns
+                    ],
+                )
+            self._write_page(
+                os.path.join(self._root, "simple", "index.html"),
+                "Simple index",
+                [("%s/" % quote(project), project) for project in sorted(projects.keys())],
+            )
+
+            write_json(state_path, files)
+
+            phase.tags.update(projects=len(projects), files=len(files), updated=updated)
+
+        return {"projects": len(projects), "files": len(files), "updated": updated}
+
+    def make_server(self, host: str = MIRROR_HOST, port: int = MIRROR_PORT) -> ThreadingHTTPServer:
+        """
+        Creates a small HTTP server for the mirror. The simple index is available under ``/simple/``. Run it with ``serve_forever``, stop it with ``shutdown``.
+
+        Args:
+            host : Address to listen on.
+            port : Port to listen on. ``0`` picks a free port.
+        Returns:
+            The server.
+        """
+
+        return ThreadingHTTPServer((host, port), partial(_Handler, directory=self._root))
+
+    @staticmethod
+    def get_project_name(fn: str) -> Optional[str]:
+        """
+        Normalized project name of a package file name as per PEP 503, e.g. ``zope-interface`` for ``zope.interface-5.5.2.tar.gz``. ``None`` if ``fn`` is neither a wheel nor a source distribution.
+        """
+
+        for extension in _EXTENSIONS:
+            if fn.endswith(extension):
+                break
+        else:
+            return None
+
+        stem = fn[: -len(extension)]
+        name = stem.split("-")[0] if extension == ".whl" else stem.rsplit("-", 1)[0]
+        if len(name) == 0 or name == stem:
+            return None
+
+        return re.sub(r"[-_.]+", "-", name).lower()
+
+    def _get_file_path(self, fn: str) -> str:
+
+        return os.path.join(self._root, "files", fn)
+
+    @staticmethod
+    def _link(path: str, target: str) -> str:
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(partial(f.read, DOWNLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        link_file(path, target)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _remove(path: str):
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write_page(path: str, title: str, links: List[Any]):
+
+        page = _PAGE.format(
+            TITLE=escape(title),
+            LINKS="\n".join(
+                '    <a href="%s">%s</a><br/>' % (escape(href), escape(text)) for href, text in links
+            ),
+        )
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == page:
+                    return  # unchanged, keeps caches of HTTP clients valid
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(page)
+        os.replace(tmp, path)
+
+
+class _Handler(SimpleHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"  # keep-alive for pip
+
+    def log_message(self, format: str, *args: Any):
+
+        pass  # quiet, pip reports failures itself
@@ -44,37 +44,30 @@ class Paths:
 
     def __init__(self, pythonprefix: str, pythonversion: PythonVersion):
 
-        self._pythonprefix = pythonprefix
-        self._pythonversion_block = pythonversion.as_block()
+        block = pythonversion.as_block()
+        lib = os.path.join(pythonprefix, "Lib")
+        sitepackages = os.path.join(lib, "site-packages")
+        scripts = os.path.join(pythonprefix, "Scripts")
+
+        self._paths = {
+            "pythonprefix": pythonprefix,
+            "lib": lib,
+            "sitepy": os.path.join(lib, "site.py"),
+            "sitepackages": sitepackages,
+            "sitecustomize": os.path.join(sitepackages, "sitecustomize.py"),
+            "scripts": scripts,
+            "interpreter": os.path.join(pythonprefix, "python.exe"),
+            "pip": os.path.join(scripts, "pip.exe"),
+            "libzip": os.path.join(pythonprefix, "python%s.zip" % block),
+            "pth": os.path.join(pythonprefix, "python%s._pth" % block),
+        }  # computed once, paths are looked up frequently
 
     def __getitem__(self, key: str) -> str:
 
-        if key == "pythonprefix":
-            return self._pythonprefix
-        if key == "lib":
-            return os.path.join(self["pythonprefix"], "Lib")
-        if key == 'sitepy':
-            return os.path.join(self["lib"], "site.py")
-        if key == "sitepackages":
-            return os.path.join(self["lib"], "site-packages")
-        if key == "sitecustomize":
-            return os.path.join(self["sitepackages"], "sitecustomize.py")
-        if key == "scripts":
-            return os.path.join(self["pythonprefix"], "Scripts")
-        if key == "interpreter":
-            return os.path.join(self["pythonprefix"], "python.exe")
-        if key == "pip":
-            return os.path.join(self["scripts"], "pip.exe")
-        if key == "libzip":
-            return os.path.join(
-                self["pythonprefix"], "python%s.zip" % self._pythonversion_block
-            )
-        if key == "pth":
-            return os.path.join(
-                self["pythonprefix"], "python%s._pth" % self._pythonversion_block
-            )
-
-        raise KeyError("not a valid path key")
+        if key not in self._paths.keys():
+            raise KeyError("not a valid path key")
+
+        return self._paths[key]
 
     @staticmethod
     def symlink(src, dest: str):
@@ -26,17 +26,34 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-from typing import Any, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 try:
     from typing import NotImplementedType # re-introduced in Python 3.10
 except ImportError:
     NotImplementedType = type(NotImplemented)
 
+from .const import PYTHON_FTP_URL
 from .typeguard import typechecked
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-# CLASS
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Order of types of builds, unknown types sort before alphas
+_BUILD_RANKS = {
+    "a": 1,
+    "alpha": 1,
+    "b": 2,
+    "beta": 2,
+    "c": 3,
+    "rc": 3,
+    "stable": 4,
+    "post": 5,
+}
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
@@ -51,8 +68,12 @@ class PythonVersion:
         minor : Python minor version, i.e. ``X`` from ``0.X.0``.
         maintenance : Python maintenance version, i.e. ``X`` from ``0.0.X``.
         build : Type of build, e.g. ``aX``, ``bX``, ``rcX``, etc. If left empty or set to ``stable``, the build is considered stable.
+
+    Versions are ordered by release and type of build, i.e. ``a`` < ``b`` < ``rc`` < ``stable`` < ``post``. Comparison and hashing ignore the architecture.
     """
 
+    __slots__ = ("_arch", "_major", "_minor", "_maintenance", "_build", "_key")
+
     def __init__(self, arch: str, major: int, minor: int, maintenance: int, build: str = "stable"):
 
         if arch not in ("win32", "win64", "arm64"):
@@ -63,6 +84,7 @@ class PythonVersion:
         self._arch = arch
         self._major, self._minor, self._maintenance = major, minor, maintenance
         self._build = "stable" if build == "" else build
+        self._key = (major, minor, maintenance) + self._get_build_key(self._build)
 
     def __str__(self) -> str:
         """
@@ -89,6 +111,13 @@ class PythonVersion:
             self._arch,
         )
 
+    def __hash__(self) -> int:
+        """
+        Hash, consistent with equality.
+        """
+
+        return hash(self._key)
+
     def __eq__(self, other: Any) -> Union[bool, NotImplementedType]:
         """
         Equality operator.
@@ -97,7 +126,7 @@ class PythonVersion:
         if not isinstance(other, type(self)):
             return NotImplemented
 
-        return self._as_sort() == other._as_sort()
+        return self._key == other._key
 
     def __gt__(self, other: Any) -> Union[bool, NotImplementedType]:
         """
@@ -107,7 +136,17 @@ class PythonVersion:
         if not isinstance(other, type(self)):
             return NotImplemented
 
-        return self._as_sort() > other._as_sort()
+        return self._key > other._key
+
+    def __ge__(self, other: Any) -> Union[bool, NotImplementedType]:
+        """
+        Greater than or equal operator.
+        """
+
+        if not isinstance(other, type(self)):
+            return NotImplemented
+
+        return self._key >= other._key
 
     def __lt__(self, other: Any) -> Union[bool, NotImplementedType]:
         """
@@ -117,15 +156,35 @@ class PythonVersion:
         if not isinstance(other, type(self)):
             return NotImplemented
 
-        return self._as_sort() < other._as_sort()
+        return self._key < other._key
 
-    def _as_sort(self) -> str:
+    def __le__(self, other: Any) -> Union[bool, NotImplementedType]:
+        """
+        Lesser than or equal operator.
+        """
 
-        return "%04d-%04d-%04d-%s" % (
-            self._major,
-            self._minor,
-            self._maintenance,
-            self._build,
+        if not isinstance(other, type(self)):
+            return NotImplemented
+
+        return self._key <= other._key
+
+    def _as_sort(self) -> Tuple[Any, ...]:
+
+        return self._key
+
+    @staticmethod
+    def _get_build_key(build: str) -> Tuple[int, int, str]:
+        """
+        Sort key of a type of build, e.g. ``(3, 1, "rc")`` for ``rc1``.
+        """
+
+        name = build.rstrip("0123456789")
+        number = build[len(name):]
+
+        return (
+            _BUILD_RANKS.get(name, 0),
+            int(number) if len(number) > 0 else 0,
+            name,
         )
 
     @property
@@ -197,15 +256,18 @@ class PythonVersion:
 
         return tag + self._build
 
-    def as_url(self) -> str:
+    def as_url(self, base: str = PYTHON_FTP_URL) -> str:
         """
+        Args:
+            base : Base URL of ``python.org``'s download area or of a mirror.
         Returns:
             Download URL for Windows Embedded Build ZIP file.
         """
 
         return (
-            "https://www.python.org/ftp/python/%d.%d.%d/"
-            % (self._major, self._minor, self._maintenance)
+            base
+            + ("" if base.endswith("/") else "/")
+            + "%d.%d.%d/" % (self._major, self._minor, self._maintenance)
             + self.as_zipname()
         )
 
@@ -297,3 +359,82 @@ class PythonVersion:
             )
 
         return cls(arch, *release)
+
+
+@typechecked
+class PythonBuilds:
+    """
+    Registry of available builds, indexed by architecture, major and minor version. Immutable.
+
+    Args:
+        builds : :class:`wenv.PythonVersion` objects, e.g. from :func:`wenv.get_available_python_builds`. Duplicates are dropped.
+    """
+
+    __slots__ = ("_index", "_arches")
+
+    def __init__(self, builds: Iterable[PythonVersion]):
+
+        index = {}  # type: Dict[Tuple[str, int, int], Set[PythonVersion]]
+        for build in builds:
+            index.setdefault((build.arch, build.major, build.minor), set()).add(build)
+
+        self._index = {key: tuple(sorted(group)) for key, group in index.items()}
+        self._arches = {}  # type: Dict[str, Set[PythonVersion]]
+        for (arch, _, _), group in self._index.items():
+            self._arches.setdefault(arch, set()).update(group)
+
+    def __contains__(self, build: Any) -> bool:
+
+        if not isinstance(build, PythonVersion):
+            return False
+
+        return build in self._arches.get(build.arch, ())
+
+    def __iter__(self) -> Iterator[PythonVersion]:
+
+        for key in sorted(self._index.keys()):
+            yield from self._index[key]
+
+    def __len__(self) -> int:
+
+        return sum(len(group) for group in self._index.values())
+
+    def __repr__(self) -> str:
+
+        return "<PythonBuilds (%d builds)>" % len(self)
+
+    @property
+    def arches(self) -> List[str]:
+        """
+        Architectures with at least one build.
+        """
+
+        return sorted(self._arches.keys())
+
+    def get(self, arch: str, major: int, minor: int) -> List[PythonVersion]:
+        """
+        Returns:
+            All builds of a given Python major and minor version for a given architecture, oldest first.
+        """
+
+        return list(self._index.get((arch, major, minor), ()))
+
+    def latest(self, arch: str, major: int, minor: int) -> Optional[PythonVersion]:
+        """
+        Returns:
+            The latest build of a given Python major and minor version for a given architecture or ``None`` if there is none.
+        """
+
+        group = self._index.get((arch, major, minor))
+
+        return None if group is None else group[-1]
+
+    def versions(self, arch: str) -> Set[PythonVersion]:
+        """
+        Versions available for an architecture. As versions compare equal across architectures, the sets of different architectures can be intersected or subtracted, e.g. ``builds.versions("win32") - builds.versions("arm64")``.
+
+        Returns:
+            A new set.
+        """
+
+        return set(self._arches.get(arch, ()))
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/server.py: Managing a persistent wineserver
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import fcntl
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from .typeguard import typechecked
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+class Server:
+    """
+    Represents the wineserver of one Wine prefix. Wine clients started with the same ``WINEPREFIX`` attach to a running wineserver automatically, so keeping one alive removes the cost of cold-starting it for every ``wenv`` invocation.
+
+    Args:
+        wineprefix : Path to Wine prefix.
+        envvar_dict : Environment variables for launching the wineserver, i.e. the launch environment of :class:`wenv.Env`.
+        binary : Name of or path to the ``wineserver`` binary.
+        keepalive : Number of seconds the wineserver is kept alive after its last client exited. If ``None``, it runs until stopped.
+    """
+
+    def __init__(
+        self,
+        wineprefix: str,
+        envvar_dict: Dict[str, str],
+        binary: str = "wineserver",
+        keepalive: Optional[int] = None,
+    ):
+
+        self._wineprefix = wineprefix
+        self._envvar_dict = envvar_dict
+        self._binary = binary
+        self._keepalive = keepalive
+
+    @property
+    def socket_dir(self) -> Optional[str]:
+        """
+        Directory holding the wineserver's socket and lock file, derived from the Wine prefix' device and inode exactly like Wine does. ``None`` if the Wine prefix does not exist.
+        """
+
+        try:
+            stat = os.stat(self._wineprefix)
+        except FileNotFoundError:
+            return None
+
+        return os.path.join(
+            "/tmp",
+            ".wine-%d" % os.getuid(),
+            "server-%x-%x" % (stat.st_dev, stat.st_ino),
+        )
+
+    @property
+    def pid(self) -> Optional[int]:
+        """
+        Process ID of the wineserver, taken from the owner of its lock file. ``None`` if it is not running, ``0`` if it is running but the owner can not be identified on this platform.
+        """
+
+        socket_dir = self.socket_dir
+        if socket_dir is None:
+            return None
+
+        try:
+            fd = os.open(os.path.join(socket_dir, "lock"), os.O_RDWR)
+        except OSError:
+            return None
+
+        try:
+            return self._get_lock_owner(fd)
+        finally:
+            os.close(fd)
+
+    @property
+    def running(self) -> bool:
+        """
+        Is the wineserver running and ready to accept clients?
+        """
+
+        socket_dir = self.socket_dir
+        if socket_dir is None:
+            return False
+
+        return self.pid is not None and os.path.exists(os.path.join(socket_dir, "socket"))
+
+    def start(self, timeout: float = 10.0):
+        """
+        Starts a persistent wineserver unless one is already running and waits until it accepts clients.
+
+        Args:
+            timeout : Seconds to wait for the wineserver to become ready.
+        """
+
+        if not os.path.isdir(self._wineprefix):
+            raise OSError('Wine prefix does not exist, run "wenv init" first: "%s"' % self._wineprefix)
+
+        if self.running:
+            return
+
+        persistent = "-p" if self._keepalive is None else "-p%d" % self._keepalive
+
+        proc = subprocess.Popen([self._get_binary(), persistent], env=self._envvar_dict)
+        proc.wait()  # wineserver forks into the background
+        if proc.returncode != 0:
+            raise SystemError("wineserver could not be started", proc.returncode)
+
+        if not self._wait(True, timeout):
+            raise TimeoutError("wineserver did not become ready within %0.1f seconds" % timeout)
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Stops the wineserver, killing all attached Wine processes.
+
+        Args:
+            timeout : Seconds to wait for the wineserver to exit.
+        """
+
+        if not self.running:
+            return
+
+        proc = subprocess.Popen([self._get_binary(), "-k"], env=self._envvar_dict)
+        proc.wait()
+
+        if not self._wait(False, timeout):
+            raise TimeoutError("wineserver did not exit within %0.1f seconds" % timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Returns:
+            A dictionary of format ``{"running": bool, "pid": int, "uptime": float, "processes": [int, ...], "socket_dir": str}``. ``pid`` and ``uptime`` are ``None`` if the wineserver is not running. ``uptime`` and ``processes`` are only available on Linux.
+        """
+
+        pid = self.pid
+        running = pid is not None and self.running
+
+        return {
+            "running": running,
+            "pid": pid if running else None,
+            "uptime": self._get_uptime(pid) if running else None,
+            "processes": self._get_processes(pid) if running else [],
+            "socket_dir": self.socket_dir,
+        }
+
+    def _get_binary(self) -> str:
+
+        binary = shutil.which(self._binary, path=self._envvar_dict.get("PATH"))
+        if binary is None:
+            raise OSError('wineserver binary not found: "%s"' % self._binary)
+
+        return binary
+
+    def _get_processes(self, pid: int) -> List[int]:
+
+        if not os.path.isdir("/proc"):
+            return []
+
+        marker = ("WINEPREFIX=%s" % self._wineprefix).encode("utf-8")
+
+        processes = []
+        for item in os.listdir("/proc"):
+            if not item.isdigit() or int(item) == pid:
+                continue
+            try:
+                with open(os.path.join("/proc", item, "environ"), "rb") as f:
+                    environ = f.read().split(b"\0")
+            except OSError:  # foreign or vanished process
+                continue
+            if marker in environ:
+                processes.append(int(item))
+
+        return sorted(processes)
+
+    def _wait(self, running: bool, timeout: float) -> bool:
+
+        deadline = time.monotonic() + timeout
+
+        while self.running is not running:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+
+        return True
+
+    @staticmethod
+    def _get_lock_owner(fd: int) -> Optional[int]:
+        """
+        Queries the owner of the wineserver's POSIX lock via ``F_GETLK`` like ``wineserver -k`` does.
+        """
+
+        if sys.platform.startswith("linux"):
+            # struct flock: short l_type, short l_whence, off_t l_start, off_t l_len, pid_t l_pid
+            layout = "hhqqi"
+            query = struct.pack(layout, fcntl.F_WRLCK, os.SEEK_SET, 0, 1, 0)
+            l_type, _, _, _, l_pid = struct.unpack(layout, fcntl.fcntl(fd, fcntl.F_GETLK, query))
+            return None if l_type == fcntl.F_UNLCK else l_pid
+
+        try:  # no portable F_GETLK layout elsewhere, probe the lock instead
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, 0, os.SEEK_SET)
+        except OSError:
+            return 0  # held by a process we can not identify
+        fcntl.lockf(fd, fcntl.LOCK_UN, 1, 0, os.SEEK_SET)
+        return None
+
+    @staticmethod
+    def _get_uptime(pid: int) -> Optional[float]:
+
+        try:
+            with open("/proc/%d/stat" % pid, "r") as f:
+                stat = f.read()
+            with open("/proc/uptime", "r") as f:
+                uptime = float(f.read().split()[0])
+        except OSError:
+            return None
+
+        starttime = int(stat.rsplit(")", 1)[1].split()[19])  # field 22, counted after comm
+
+        return uptime - starttime / os.sysconf("SC_CLK_TCK")
@@ -26,12 +26,370 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional, Union
-from urllib.request import urlopen, Request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+import fcntl
+import hashlib
+import itertools
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPSConnection,
+    RemoteDisconnected,
+)
+import os
+import socket
+import ssl
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass, urlopen, Request
+import zlib
 
-from .pythonversion import PythonVersion
+from .const import (
+    BUILD_INDEX_TTL,
+    BUILD_INDEX_VERSION,
+    PYTHON_FTP_URL,
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_HOST_CONNECTIONS,
+    DOWNLOAD_MAX_REDIRECTS,
+    DOWNLOAD_RETRIES,
+    DOWNLOAD_RETRY_DELAY,
+    DOWNLOAD_SEGMENT_MIN_SIZE,
+    DOWNLOAD_TIMEOUT,
+    MIRROR_PROBE_TIMEOUT,
+)
+from .pythonversion import PythonBuilds, PythonVersion
+from .trace import trace
 from .typeguard import typechecked
+from .usercache import get_user_cache_dir, read_json, write_json
+
+import wenv # HACK für version
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class PooledResponse:
+    """
+    Response of :class:`wenv._core.source.ConnectionPool`, mimicking the parts of ``urlopen``'s responses ``wenv`` uses. Closing it returns its connection to the pool if the body was read entirely. Short remainders of known length are drained first, any other connection is closed.
+    """
+
+    def __init__(self, pool: Any, key: Tuple[str, str, int], connection: HTTPConnection, response: Any, url: str):
+
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+
+        return self._response.read(amt)
+
+    def close(self):
+
+        if self._connection is None:
+            return
+
+        remaining = self._response.length  # None if chunked or unknown
+        if not self._response.isclosed() and remaining is not None and remaining <= DOWNLOAD_CHUNK_SIZE:
+            try:
+                self._response.read()  # drain short bodies, e.g. of errors, to keep the connection
+            except (HTTPException, OSError):
+                pass
+
+        reusable = self._response.isclosed() and not self._response.will_close  # body consumed
+        if not reusable:
+            self._response.close()
+            self._connection.close()
+
+        self._pool._release(self._key, self._connection if reusable else None)
+        self._connection = None
+
+
+class ConnectionPool:
+    """
+    Minimal HTTP/1.1 client keeping connections alive across requests, thread-safe. Every host gets at most ``limit`` concurrent connections, further requests wait for one to be released. Redirects are followed. A request on an idle connection which was closed by the server in the meantime is retried once on a fresh connection. If a proxy is configured for a URL, the request is handed to ``urlopen`` instead.
+
+    Args:
+        limit : Maximum number of concurrent connections per host.
+        timeout : Socket timeout in seconds.
+    """
+
+    def __init__(self, limit: int = DOWNLOAD_HOST_CONNECTIONS, timeout: float = DOWNLOAD_TIMEOUT):
+
+        self._limit = limit
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._context = None
+
+    def open(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Sends a ``GET`` request. Responses other than ``2xx`` are raised as ``urllib.error.HTTPError``, like ``urlopen`` does.
+
+        Args:
+            url : HTTP or HTTPS URL.
+            headers : Additional request headers.
+        Returns:
+            A response object which must be closed, ideally used as a context manager.
+        """
+
+        headers = {} if headers is None else headers
+
+        for _ in range(DOWNLOAD_MAX_REDIRECTS + 1):
+
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError('unsupported URL scheme: "%s"' % url)
+            if parts.scheme in getproxies().keys() and not proxy_bypass(parts.hostname):
+                return urlopen(Request(url, headers=headers), timeout=self._timeout)
+
+            key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+            response = self._request(key, path, headers, url)
+
+            location = response.headers.get("Location")
+            if response.status in (301, 302, 303, 307, 308) and location is not None:
+                response.close()
+                url = urljoin(url, location)
+                continue
+
+            if not 200 <= response.status < 300:  # like urlopen, e.g. 304 or 416
+                response.close()
+                raise HTTPError(url, response.status, response.reason, response.headers, None)
+
+            return response
+
+        raise URLError('too many redirects: "%s"' % url)
+
+    def clear(self):
+        """
+        Closes all idle connections.
+        """
+
+        with self._lock:
+            idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _request(self, key: Tuple[str, str, int], path: str, headers: Dict[str, str], url: str) -> PooledResponse:
+
+        with self._lock:
+            slot = self._slots.setdefault(key, threading.BoundedSemaphore(self._limit))
+        slot.acquire()  # released with the connection
+
+        try:
+            connection = self._get_idle(key)
+            reused = connection is not None
+            while True:
+                if connection is None:
+                    connection = self._connect(key)
+                try:
+                    connection.request("GET", path, headers=self._get_headers(key, headers))
+                    response = connection.getresponse()
+                except (RemoteDisconnected, ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                    connection.close()
+                    if not reused:
+                        raise
+                    connection, reused = None, False  # stale keep-alive connection, retry once
+                    continue
+                except BaseException:
+                    connection.close()
+                    raise
+                return PooledResponse(self, key, connection, response, url)
+        except BaseException:
+            slot.release()
+            raise
+
+    def _release(self, key: Tuple[str, str, int], connection: Optional[HTTPConnection]):
+
+        with self._lock:
+            if connection is not None:
+                self._idle.setdefault(key, []).append(connection)
+            slot = self._slots[key]
+
+        slot.release()
+
+    def _get_idle(self, key: Tuple[str, str, int]) -> Optional[HTTPConnection]:
+
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop()
+
+        return None
+
+    def _connect(self, key: Tuple[str, str, int]) -> HTTPConnection:
+
+        scheme, host, port = key
+
+        if scheme == "http":
+            return HTTPConnection(host, port, timeout=self._timeout)
+
+        with self._lock:
+            if self._context is None:
+                self._context = ssl.create_default_context()
+
+        return HTTPSConnection(host, port, timeout=self._timeout, context=self._context)
+
+    @staticmethod
+    def _get_headers(key: Tuple[str, str, int], headers: Dict[str, str]) -> Dict[str, str]:
+
+        merged = {"User-Agent": "wenv/%s" % wenv.__version__, "Connection": "keep-alive"}
+        merged.update(headers)
+
+        return merged
+
+
+POOL = ConnectionPool()  # shared by all downloads of this process
+
+
+@typechecked
+class Mirrors:
+    """
+    Alternative base URLs for one source of downloads, e.g. ``python.org``'s download area. URLs below ``origin`` are fetched from the fastest healthy mirror first, failing over to the next one, with ``origin`` as the last resort. Mirrors are probed for latency once, on first use, and only if there are any. Mirrors failing mid-run are moved to the end of the order.
+
+    Args:
+        origin : Canonical base URL, e.g. :data:`PYTHON_FTP_URL`.
+        urls : Base URLs of mirrors. ``origin`` is appended unless listed.
+        timeout : Seconds to wait for probes to complete. Slower mirrors are used after faster ones.
+    """
+
+    def __init__(self, origin: str, urls: List[str], timeout: float = MIRROR_PROBE_TIMEOUT):
+
+        self._origin = origin
+        self._urls = [url if url.endswith("/") else url + "/" for url in urls]
+        if origin not in self._urls:
+            self._urls.append(origin)
+        self._timeout = timeout
+
+        self._lock = threading.Lock()
+        self._order = None  # type: Optional[List[str]]
+        self._latencies = {}  # type: Dict[str, Optional[float]]
+
+    @property
+    def origin(self) -> str:
+        """
+        Canonical base URL.
+        """
+
+        return self._origin
+
+    @property
+    def urls(self) -> List[str]:
+        """
+        Base URLs in order of preference, probing them first if required.
+        """
+
+        with self._lock:
+            if self._order is None:
+                self._order = self._get_order() if len(self._urls) > 1 else list(self._urls)
+            return list(self._order)
+
+    @property
+    def latencies(self) -> Dict[str, Optional[float]]:
+        """
+        Latencies in seconds measured by probing, ``None`` for unhealthy or timed out mirrors. Empty if not probed.
+        """
+
+        return dict(self._latencies)
+
+    def demote(self, url: str):
+        """
+        Moves a base URL to the end of the order, e.g. after it failed.
+        """
+
+        with self._lock:
+            if self._order is not None and url in self._order:
+                self._order.remove(url)
+                self._order.append(url)
+
+    def fetch(self, url: str, fetch: Callable) -> Any:
+        """
+        Calls ``fetch`` with the URL of ``url`` on each mirror in order of preference until it succeeds. URLs not below ``origin`` are passed through unchanged. Mirrors which fail with a connection problem or a server error are demoted. Missing files, i.e. other HTTP errors, only cause the next mirror to be tried.
+
+        Args:
+            url : URL below ``origin``.
+            fetch : Callable accepting one URL.
+        Returns:
+            Return value of ``fetch``.
+        """
+
+        if not url.startswith(self._origin):
+            return fetch(url)
+
+        path = url[len(self._origin):]
+        error = None
+
+        for base in self.urls:
+            try:
+                return fetch(base + path)
+            except HTTPError as e:  # subclass of URLError, check first
+                if e.code >= 500:
+                    self.demote(base)
+                error = e
+            except (HTTPException, OSError) as e:  # includes URLError
+                self.demote(base)
+                error = e
+
+        raise error
+
+    def _get_order(self) -> List[str]:
+
+        p = ThreadPoolExecutor(max_workers = len(self._urls))
+        futures = {p.submit(self._probe, url): url for url in self._urls}
+        done, _ = wait(futures.keys(), timeout = self._timeout)
+        for future, url in futures.items():
+            self._latencies[url] = future.result() if future in done else None
+        p.shutdown(wait = False)  # slow probes complete in the background
+
+        return sorted(
+            self._urls,
+            key = lambda url: (self._latencies[url] is None, self._latencies[url] or 0.0),
+        )  # stable, keeps configured order among unhealthy mirrors
+
+    @staticmethod
+    def _probe(url: str) -> Optional[float]:
+
+        start = time.monotonic()
+
+        try:
+            with POOL.open(url, {}):
+                pass
+        except HTTPError as e:
+            if e.code >= 500:
+                return None  # reachable but unhealthy
+        except (HTTPException, OSError):
+            return None
+
+        return time.monotonic() - start
+
+
+_MIRRORS = {}  # type: Dict[Tuple[str, Tuple[str, ...]], Mirrors]
+_MIRRORS_LOCK = threading.Lock()
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # ROUTINES
@@ -39,21 +397,444 @@ from .typeguard import typechecked
 
 
 @typechecked
-def download(down_url: str, mode: str = "binary") -> Union[str, bytes]:
+def get_mirrors(origin: str, urls: List[str]) -> Mirrors:
+    """
+    Mirrors of a source of downloads, shared by all users within this process, so probes run once and failures are remembered.
+
+    Args:
+        origin : Canonical base URL.
+        urls : Base URLs of mirrors.
+    Returns:
+        A :class:`wenv._core.source.Mirrors` object.
+    """
+
+    key = (origin, tuple(urls))
+
+    with _MIRRORS_LOCK:
+        if key not in _MIRRORS.keys():
+            _MIRRORS[key] = Mirrors(origin, urls)
+        return _MIRRORS[key]
+
+
+@typechecked
+def download_cached(down_url: str, path: str, key: Optional[str] = None, stale: bool = True) -> str:
+    """
+    Downloads a text document, e.g. package metadata, and keeps a copy at ``path``. Subsequent calls revalidate the copy with the server via ``ETag`` or ``Last-Modified``, so unchanged documents are not transferred again. If the server can not be reached and ``stale`` is set, the copy is used.
+
+    Args:
+        down_url : URL to download.
+        path : Path of the copy, typically within :func:`wenv._core.usercache.get_user_cache_dir`.
+        key : Identity of the document, e.g. its URL at the origin if ``down_url`` points to a mirror. Defaults to ``down_url``. The copy is kept across mirrors, validators are only sent to the URL they came from.
+        stale : Fall back to the copy on network errors. Disable it for failing over to other mirrors first, see :func:`read_cached`.
+    Returns:
+        The document.
+    """
+
+    key = down_url if key is None else key
 
-    assert mode in ("text", "binary")
-    assert isinstance(down_url, str)
+    cached = read_json(path)
+    if not isinstance(cached, dict) or cached.get("key", cached.get("url")) != key:
+        cached = {"key": key, "url": down_url, "etag": None, "last_modified": None, "data": None}
+    if cached.get("url") != down_url:  # other mirror, its validators do not apply
+        cached.update(etag=None, last_modified=None)
 
-    httprequest = Request(down_url)
+    try:
+        result = _download_conditional(down_url, cached["etag"], cached.get("last_modified"))
+    except URLError:
+        if stale and cached["data"] is not None:  # offline, stale is better than nothing
+            return cached["data"]
+        raise
+
+    if result is None:
+        return cached["data"]
+
+    data, etag, last_modified = result
+
+    if etag is not None or last_modified is not None:
+        try:
+            write_json(path, {"key": key, "url": down_url, "etag": etag, "last_modified": last_modified, "data": data})
+        except OSError:
+            pass  # downloading must not depend on a writable cache
+
+    return data
+
+
+@typechecked
+def read_cached(path: str, key: str) -> Optional[str]:
+    """
+    Reads the copy of a text document kept by :func:`download_cached`, e.g. once all mirrors failed.
+
+    Args:
+        path : Path of the copy.
+        key : Identity of the document, see :func:`download_cached`.
+    Returns:
+        The document or ``None`` if there is no copy.
+    """
+
+    cached = read_json(path)
+    if not isinstance(cached, dict) or cached.get("key", cached.get("url")) != key:
+        return None
+
+    return cached.get("data")
+
+
+def _download_conditional(
+    down_url: str, etag: Optional[str], last_modified: Optional[str]
+) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Downloads a text document unless it is unchanged since it carried ``etag`` or ``last_modified``. Returns ``None`` if unchanged, else the document, its new ``ETag`` and ``Last-Modified``.
+    """
+
+    headers = {}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if last_modified is not None:
+        headers["If-Modified-Since"] = last_modified
+
+    with trace("download", url=down_url) as phase:
+        try:
+            with POOL.open(down_url, headers) as response:
+                data = response.read().decode("utf-8")
+                result = data, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except HTTPError as e:
+            if e.code == 304 and len(headers) > 0:
+                phase.tags["revalidated"] = True
+                return None
+            raise
+        phase.tags["bytes"] = len(data)
+
+    return result
+
+
+@typechecked
+def download_file(
+    down_url: str,
+    path: str,
+    sha256: Optional[str] = None,
+    size: Optional[int] = None,
+    segments: int = 1,
+    retries: int = DOWNLOAD_RETRIES,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    validators: Optional[Dict[str, Optional[str]]] = None,
+) -> str:
+    """
+    Streams a download to disk in chunks of fixed size. Data goes to a temporary file next to ``path`` which is atomically renamed to ``path`` once complete and verified, i.e. ``path`` never holds a partial download. Memory usage is bounded by ``chunk_size`` per segment.
+
+    Dropped connections are resumed via HTTP range requests. A partial file left behind by an interrupted single-stream download, ``{path}.part``, is resumed by the next call for the same URL. The validator of the partial download, i.e. its ``ETag`` or ``Last-Modified``, is kept next to it and sent as ``If-Range``, so a file changed upstream meanwhile is downloaded from scratch. Partial files which can not be validated are discarded unless ``sha256`` is given. If ``segments`` is larger than one and the server supports range requests, large files are split into ``segments`` ranges fetched in parallel.
+
+    Args:
+        down_url : URL to download.
+        path : Target file path. Its directory must exist.
+        sha256 : Expected SHA-256 hex digest. If given, a mismatch raises an ``OSError`` and ``path`` remains untouched.
+        size : Expected size in bytes. If given, a mismatch raises an ``OSError`` and ``path`` remains untouched.
+        segments : Maximum number of parallel range requests.
+        retries : Number of retries after transient network errors.
+        chunk_size : Number of bytes read and written at once.
+        validators : If given, updated with the ``etag`` and ``last_modified`` of the downloaded file, for later use with :func:`is_modified`.
+    Returns:
+        SHA-256 hex digest of the downloaded file.
+    """
+
+    if segments < 1:
+        raise ValueError("segments must be at least 1")
+
+    validators = {} if validators is None else validators
+
+    with trace("download", url=down_url) as phase:
+
+        total = _get_range_size(down_url, retries, validators) if segments > 1 else None
+
+        if total is not None and total >= segments * DOWNLOAD_SEGMENT_MIN_SIZE:
+            part = "%s.%d.part" % (path, os.getpid())  # preallocated, can not be resumed by size
+            phase.tags["segments"] = segments
+            try:
+                _download_segments(down_url, part, total, segments, retries, chunk_size)
+                digest = _hash_file(part, chunk_size).hexdigest()
+            except BaseException:
+                _remove_part(part)
+                raise
+        else:
+            part = "%s.part" % path
+            digest, total = _download_stream(
+                down_url, part, sha256 is not None, retries, chunk_size, phase.tags, validators
+            )
 
-    with urlopen(httprequest) as response:
-        assert response.status == 200
-        data = response.read()
+        error = None
+        if size is not None and total != size:
+            error = "size mismatch for \"%s\": expected %d, got %d" % (down_url, size, total)
+        elif sha256 is not None and digest != sha256.lower():
+            error = "checksum mismatch for \"%s\": expected %s, got %s" % (down_url, sha256.lower(), digest)
+        if error is not None:
+            _remove_part(part)
+            raise OSError(error)
 
-    if mode == 'text':
-        return data.decode('utf-8')
+        os.replace(part, path)
+        _remove_part(part)  # validator
+        phase.tags["bytes"] = total
 
-    return data # mode == 'binary'
+    return digest
+
+
+@typechecked
+def is_modified(down_url: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """
+    Checks whether a download changed since it carried ``etag`` or ``last_modified``, via a conditional request for its first byte. Without validators, it is considered modified.
+
+    Args:
+        down_url : URL to check.
+        etag : Former ``ETag``.
+        last_modified : Former ``Last-Modified``.
+    Returns:
+        ``False`` if the server confirmed the download to be unchanged.
+    """
+
+    headers = {}
+    if etag is not None:
+        headers["If-None-Match"] = etag
+    if last_modified is not None:
+        headers["If-Modified-Since"] = last_modified
+    if len(headers) == 0:
+        return True
+    headers["Range"] = "bytes=0-0"  # cheap if changed
+
+    with trace("revalidate", url=down_url) as phase:
+        try:
+            with POOL.open(down_url, headers) as response:
+                response.read()
+        except HTTPError as e:
+            if e.code == 304:
+                phase.tags["modified"] = False
+                return False
+            raise
+        phase.tags["modified"] = True
+
+    return True
+
+
+def _download_stream(
+    down_url: str, part: str, verified: bool, retries: int, chunk_size: int, tags: Dict, validators: Dict
+) -> Tuple[str, int]:
+
+    with open(part, "ab") as f:
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # one writer per partial file
+
+        validator = _read_part_validator(part, down_url)
+        if validator is None and not verified and os.fstat(f.fileno()).st_size > 0:
+            f.truncate(0)  # other URL or unknown version, would end up as old prefix plus new suffix
+
+        digest = _hash_file(part, chunk_size)  # whatever an earlier attempt left behind
+        state = {"offset": os.fstat(f.fileno()).st_size, "digest": digest, "validator": validator}
+        tags["resumed"] = state["offset"]
+
+        def fetch():
+
+            try:
+                response = _open(down_url, state["offset"], if_range=state["validator"])
+            except HTTPError as e:
+                if e.code == 416 and _get_total(e.headers) == state["offset"]:
+                    return  # partial file is complete already
+                raise
+
+            with response:
+                if response.status == 200 and state["offset"] > 0:  # range ignored or changed, start over
+                    f.truncate(0)
+                    state["offset"] = 0
+                    state["digest"] = hashlib.sha256()
+                validators.update(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+                validator = _get_validator(response.headers)
+                if validator != state["validator"]:
+                    state["validator"] = validator
+                    _write_part_validator(part, down_url, validator)
+                total = _get_total(response.headers, state["offset"] if response.status == 200 else None)
+                while True:
+                    chunk = response.read(chunk_size)
+                    if len(chunk) == 0:
+                        break
+                    f.write(chunk)
+                    state["digest"].update(chunk)
+                    state["offset"] += len(chunk)
+
+            if total is not None and state["offset"] < total:
+                raise ConnectionError("connection closed after %d of %d bytes" % (state["offset"], total))
+
+        try:
+            _retry(fetch, retries)
+        finally:
+            f.flush()
+
+    return state["digest"].hexdigest(), state["offset"]
+
+
+def _download_segments(down_url: str, part: str, total: int, segments: int, retries: int, chunk_size: int):
+
+    fd = os.open(part, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    try:
+        os.ftruncate(fd, total)
+        with ThreadPoolExecutor(max_workers=segments) as p:
+            futures = [
+                p.submit(
+                    _download_segment,
+                    down_url,
+                    fd,
+                    index * total // segments,
+                    (index + 1) * total // segments - 1,
+                    retries,
+                    chunk_size,
+                )
+                for index in range(segments)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        os.close(fd)
+
+
+def _download_segment(down_url: str, fd: int, start: int, end: int, retries: int, chunk_size: int):
+
+    state = {"offset": start}
+
+    def fetch():
+
+        with _open(down_url, state["offset"], end) as response:
+            if response.status != 206:
+                raise OSError("server ignored range request: \"%s\"" % down_url)
+            while state["offset"] <= end:
+                chunk = response.read(min(chunk_size, end + 1 - state["offset"]))
+                if len(chunk) == 0:
+                    break
+                os.pwrite(fd, chunk, state["offset"])
+                state["offset"] += len(chunk)
+
+        if state["offset"] <= end:
+            raise ConnectionError("connection closed at byte %d of range %d-%d" % (state["offset"], start, end))
+
+    _retry(fetch, retries)
+
+
+def _get_range_size(down_url: str, retries: int, validators: Dict) -> Optional[int]:
+    """
+    Total size of a download if the server supports range requests, else ``None``.
+    """
+
+    result = {}
+
+    def fetch():
+        with _open(down_url, 0, 0) as response:
+            response.read()
+            validators.update(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+            if response.status == 206:
+                result["total"] = _get_total(response.headers)
+
+    _retry(fetch, retries)
+
+    return result.get("total")
+
+
+def _get_total(headers: Any, offset: Optional[int] = None) -> Optional[int]:
+    """
+    Total size of a download from ``Content-Range``, or from ``Content-Length`` plus ``offset`` for full responses.
+    """
+
+    content_range = headers.get("Content-Range")
+    if content_range is not None:
+        total = content_range.rsplit("/", 1)[-1].strip()
+        return int(total) if total.isdigit() else None
+
+    content_length = headers.get("Content-Length")
+    if offset is not None and content_length is not None and content_length.isdigit():
+        return offset + int(content_length)
+
+    return None
+
+
+def _get_validator(headers: Any) -> Optional[str]:
+    """
+    Validator suitable for ``If-Range``, i.e. a strong ``ETag`` or else ``Last-Modified``.
+    """
+
+    etag = headers.get("ETag")
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+
+    return headers.get("Last-Modified")
+
+
+def _read_part_validator(part: str, down_url: str) -> Optional[str]:
+
+    data = read_json(part + ".json")
+    if not isinstance(data, dict) or data.get("url") != down_url:
+        return None
+
+    return data.get("validator")
+
+
+def _write_part_validator(part: str, down_url: str, validator: Optional[str]):
+
+    if validator is None:
+        _remove_file(part + ".json")
+        return
+
+    try:
+        write_json(part + ".json", {"url": down_url, "validator": validator})
+    except OSError:
+        pass  # the partial file is discarded by the next attempt
+
+
+def _remove_part(part: str):
+
+    _remove_file(part)
+    _remove_file(part + ".json")
+
+
+def _remove_file(path: str):
+
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _hash_file(path: str, chunk_size: int) -> Any:
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if len(chunk) == 0:
+                break
+            digest.update(chunk)
+
+    return digest
+
+
+def _open(down_url: str, start: int = 0, end: Optional[int] = None, if_range: Optional[str] = None) -> Any:
+
+    headers = {}
+    if start > 0 or end is not None:
+        headers["Range"] = "bytes=%d-%s" % (start, "" if end is None else "%d" % end)
+        if if_range is not None:
+            headers["If-Range"] = if_range
+
+    return POOL.open(down_url, headers)
+
+
+def _retry(fetch: Callable, retries: int):
+    """
+    Calls ``fetch`` until it succeeds, at most ``retries`` additional times after transient network errors. ``fetch`` must resume where the previous attempt stopped.
+    """
+
+    for attempt in range(retries + 1):
+        try:
+            return fetch()
+        except (ConnectionError, HTTPException, socket.timeout, URLError) as e:
+            if isinstance(e, HTTPError) and e.code < 500:
+                raise
+            if attempt == retries:
+                raise
+        time.sleep(min(DOWNLOAD_RETRY_DELAY * 2 ** attempt, 5.0))
 
 
 @typechecked
@@ -61,7 +842,7 @@ def get_latest_python_build(
     arch: str,
     major: int,
     minor: int,
-    builds: Optional[List[PythonVersion]] = None,
+    builds: Union[None, List[PythonVersion], PythonBuilds] = None,
 ) -> Optional[PythonVersion]:
     """
     Find the latest build of a given Python major and minor version for a given architecture.
@@ -71,80 +852,234 @@ def get_latest_python_build(
         arch : Build architecture.
         major : Python major version.
         minor : Python minor version.
-        builds : A list of :class:`wenv.PythonVersion` objects. If left empty, ``python.org`` will be queried.
+        builds : A :class:`wenv.PythonBuilds` registry or a list of :class:`wenv.PythonVersion` objects. If left empty, ``python.org`` will be queried. For repeated lookups, pass a registry.
     Returns:
         A :class:`wenv.PythonVersion` object or ``None``.
     """
 
     if builds is None:
         builds = get_available_python_builds()
+    if not isinstance(builds, PythonBuilds):
+        builds = PythonBuilds(builds)
 
-    filtered_build = [
-        build
-        for build in builds
-        if all((
-            build.arch == arch,
-            build.major == major,
-            build.minor == minor,
-        ))
-    ]
-
-    if len(filtered_build) == 0:
-        return None
-
-    filtered_build.sort()
-    return filtered_build[-1]
+    return builds.latest(arch, major, minor)
 
 
 @typechecked
-def get_available_python_builds(parallel: int = 8) -> List[PythonVersion]:
+def get_available_python_builds(
+    parallel: int = 8,
+    url: str = PYTHON_FTP_URL,
+    ttl: float = BUILD_INDEX_TTL,
+) -> List[PythonVersion]:
     """
     Queries ``python.org`` for Windows Embedded Builds.
 
+    Results are kept in a persistent index in the user cache. Within ``ttl`` seconds after it was last refreshed, the index is used as is. Afterwards, it is revalidated with conditional requests and only version directories which are new or changed since are crawled again. If ``python.org`` can not be reached, the last index is used.
+
     Args:
         parallel : Number of parallel queries to ``python.org``.
+        url : Base URL of the download area, e.g. of a mirror.
+        ttl : Seconds for which the index is used without revalidation. ``0`` always revalidates.
     Returns:
         All available Windows Embedded Builds of CPython 3.
     """
 
-    versions = [
-        tuple(int(nr) for nr in line.split('"')[1][:-1].split("."))
-        for line in download("https://www.python.org/ftp/python/", mode="text").split(
-            "\n"
-        )
-        if all(
-            (
-                line.startswith('<a href="'),
-                line[9:10].isdigit(),
-                not line.startswith('<a href="2.'),
+    return list(iter_available_python_builds(parallel = parallel, url = url, ttl = ttl))
+
+
+@typechecked
+def iter_available_python_builds(
+    parallel: int = 8,
+    url: str = PYTHON_FTP_URL,
+    ttl: float = BUILD_INDEX_TTL,
+) -> Iterator[PythonVersion]:
+    """
+    Queries ``python.org`` for Windows Embedded Builds, yielding each build as soon as its version directory has been parsed.
+
+    Like :func:`wenv.get_available_python_builds`, this generator uses and refreshes the persistent index. Builds from unchanged version directories are yielded first, followed by builds from refreshed directories, newest version first. At most ``parallel`` directories are requested at once. Closing the generator early, e.g. after finding a build, stops crawling. Directories crawled up to that point are kept in the index. If ``python.org`` can not be reached, the remaining builds of the last index are yielded instead.
+
+    Args:
+        parallel : Maximum number of parallel queries to ``python.org``.
+        url : Base URL of the download area, e.g. of a mirror.
+        ttl : Seconds for which the index is used without revalidation. ``0`` always revalidates.
+    Yields:
+        Windows Embedded Builds of CPython 3 as :class:`wenv.PythonVersion` objects.
+    """
+
+    index = _read_build_index(url)
+
+    if time.time() - index["updated"] < ttl:
+        yield from _iter_builds(index["dirs"])
+        return
+
+    snapshot = dict(index["dirs"])
+    yielded = set()  # names of directories
+
+    try:
+        yield from _refresh_builds(url, index, parallel, yielded)
+    except (HTTPException, OSError):  # includes URLError
+        if len(snapshot) == 0:
+            raise  # no snapshot to fall back to
+        yield from _iter_builds({name: entry for name, entry in snapshot.items() if name not in yielded})
+
+
+def _refresh_builds(url: str, index: Dict[str, Any], parallel: int, yielded: Set[str]) -> Iterator[PythonVersion]:
+    """
+    Revalidates and updates the persistent index, yielding builds as directories are confirmed or crawled. Names of directories are added to ``yielded`` once their builds were yielded.
+    """
+
+    with trace("build_index", url=url) as phase:
+        result = _download_conditional(url, index["etag"], index["last_modified"])
+        phase.tags["changed"] = result is not None
+
+    if result is None:  # top-level listing unchanged, so are all directories
+        index["updated"] = time.time()
+        _write_build_index(index)
+        yield from _iter_builds(index["dirs"])
+        yielded.update(index["dirs"].keys())
+        return
+
+    listing, etag, last_modified = result
+    dates = _parse_build_dirs(listing)
+    previous = index["dirs"]  # updated in place, keeps progress of interrupted crawls
+
+    dirs = {
+        name: previous[name]
+        for name in dates.keys()
+        if name in previous.keys() and previous[name]["date"] == dates[name]
+    }
+    yield from _iter_builds(dirs)
+    yielded.update(dirs.keys())
+
+    stale = sorted(
+        (name for name in dates.keys() if name not in dirs.keys()),
+        key = lambda name: tuple(int(nr) for nr in name[:-1].split(".")),
+        reverse = True,
+    )
+
+    complete = False
+    try:
+        for name, result in _crawl_build_dirs(url, stale, previous, parallel):
+            if result is None:  # directory unchanged after all
+                entry = dict(previous[name], date=dates[name])
+            else:
+                entry = {
+                    "date": dates[name],
+                    "etag": result[1],
+                    "last_modified": result[2],
+                    "builds": _parse_builds(result[0]),
+                }
+            dirs[name] = previous[name] = entry
+            yield from _iter_builds({name: entry})
+            yielded.add(name)
+        complete = True
+    finally:
+        if complete:
+            index.update(dirs=dirs, etag=etag, last_modified=last_modified, updated=time.time())
+        _write_build_index(index)
+
+
+def _crawl_build_dirs(
+    url: str, names: List[str], previous: Dict[str, Any], parallel: int
+) -> Iterator[Tuple[str, Optional[Tuple[str, Optional[str], Optional[str]]]]]:
+    """
+    Conditionally requests version directories with at most ``parallel`` requests in flight, yielding names and results in order of completion. Closing the generator cancels outstanding requests.
+    """
+
+    pending = iter(names)
+    futures = {}
+    p = ThreadPoolExecutor(max_workers = parallel)
+
+    def submit():
+        for name in itertools.islice(pending, 1):
+            entry = previous.get(name, {})
+            future = p.submit(  # keeps trace tags of caller
+                copy_context().run, _download_conditional, url + name, entry.get("etag"), entry.get("last_modified")
             )
-        )
-    ] # get URLs of all verions, dump Python 2
-
-    version_urls = [
-        "https://www.python.org/ftp/python/%d.%d.%d/" % version
-        if len(version) == 3
-        else "https://www.python.org/ftp/python/%d.%d/" % version
-        for version in versions
-    ] # some URLs in early Python 3.X releases are following  `major.minor` pattern
-
-    with ThreadPoolExecutor(max_workers = parallel) as p:
-        version_futures = [
-            p.submit(
-                lambda x: download(x, mode="text"), version_url
-            ) for version_url in version_urls
-        ] # get inventory of all maintenance version downloads
-        version_downloads = [
-            future.result()
-            for future in as_completed(version_futures)
-        ]
+            futures[future] = name
+
+    try:
+        for _ in range(parallel):
+            submit()
+        while len(futures) > 0:
+            done, _ = wait(futures.keys(), return_when = FIRST_COMPLETED)
+            for future in done:
+                name = futures.pop(future)
+                submit()
+                yield name, future.result()
+    finally:
+        for future in futures.keys():
+            future.cancel()
+        p.shutdown(wait = False)  # requests in flight complete in the background
+
+
+def _iter_builds(dirs: Dict[str, Any]) -> Iterator[PythonVersion]:
+
+    for entry in dirs.values():
+        for fn in entry["builds"]:
+            yield PythonVersion.from_zipname(fn)
+
+
+def _read_build_index(url: str) -> Dict[str, Any]:
+
+    index = read_json(_get_build_index_path(url))
+
+    if not isinstance(index, dict) or index.get("version") != BUILD_INDEX_VERSION or index.get("url") != url:
+        index = {
+            "version": BUILD_INDEX_VERSION,
+            "url": url,
+            "updated": 0.0,
+            "etag": None,
+            "last_modified": None,
+            "dirs": {},
+        }
+
+    return index
+
+
+def _write_build_index(index: Dict[str, Any]):
+
+    try:
+        write_json(_get_build_index_path(index["url"]), index)
+    except OSError:
+        pass  # querying must not depend on a writable cache
+
+
+def _get_build_index_path(url: str) -> str:
+
+    return get_user_cache_dir("builds", "%08x.json" % zlib.crc32(url.encode("utf-8")))
+
+
+def _parse_build_dirs(listing: str) -> Dict[str, str]:
+    """
+    Version directories of Python 3 and their modification dates from a download area listing.
+    """
+
+    dirs = {}
+
+    for line in listing.split("\n"):
+        if not all((
+            line.startswith('<a href="'),
+            line[9:10].isdigit(),
+            not line.startswith('<a href="2.'),
+        )):
+            continue
+        name = line.split('"')[1]
+        if not name.endswith("/") or not name[:-1].replace(".", "").isdigit():
+            continue
+        dirs[name] = " ".join(line.split("</a>", 1)[-1].split()[:2])  # date and time
+
+    return dirs
+
+
+def _parse_builds(listing: str) -> List[str]:
+    """
+    Names of Windows Embedded Build zip files from a version directory listing.
+    """
 
     return [
-        PythonVersion.from_zipname(line.split('"')[1])
-        for version, version_url, version_download in zip(
-            versions, version_urls, version_downloads
-        )
-        for line in version_download.split("\n")
+        line.split('"')[1]
+        for line in listing.split("\n")
         if all(
             (
                 line.startswith('<a href="'),
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/store.py: Content-addressed artifact store
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from contextlib import closing, contextmanager
+import errno
+import fcntl
+import hashlib
+import itertools
+import os
+import shutil
+import sqlite3
+import time
+from http.client import HTTPException
+import socket
+from typing import Generator, Optional
+from urllib.error import URLError
+
+from .source import download_file, is_modified
+from .typeguard import typechecked
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS objects (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, last_used REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY, digest TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS keys_digest ON keys (digest)",
+    "CREATE TABLE IF NOT EXISTS validators (key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT)",
+)
+
+_PINS = itertools.count()  # unique names of pins within a process
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+class Store:
+    """
+    Content-addressed store for downloaded artifacts. Objects are named by their SHA-256 digest. A small sqlite index maps keys, typically URLs, to digests and tracks sizes and last use. Fetching a key is single-flight across processes: while one process downloads an artifact, others fetching the same key wait for it and then use its result. If the objects only held by the store grow beyond ``size_limit``, least recently used ones are evicted.
+
+    Args:
+        root : Directory of the store, created if required.
+        size_limit : Maximum total size in bytes of all objects without further hard links, see :meth:`evict`. If ``None``, the store is not limited.
+    """
+
+    def __init__(self, root: str, size_limit: Optional[int] = None):
+
+        self._root = root
+        self._size_limit = size_limit
+
+    @property
+    def root(self) -> str:
+        """
+        Directory of the store.
+        """
+
+        return self._root
+
+    def fetch(
+        self,
+        url: str,
+        sha256: Optional[str] = None,
+        size: Optional[int] = None,
+        segments: int = 1,
+        key: Optional[str] = None,
+    ) -> str:
+        """
+        Returns the path of the object stored for ``key``, downloading it from ``url`` first if required. Downloads are verified against ``sha256`` and ``size`` if given. If an object with the expected digest is already present under another key, it is reused without downloading. Without ``sha256``, the content behind ``url`` may change, e.g. ``get-pip.py``, so a stored object is revalidated with a conditional request against the ``ETag`` or ``Last-Modified`` it was downloaded with. It is downloaded again if it changed or can not be revalidated. If the server can not be reached, the stored object is used.
+
+        Args:
+            url : URL to download from.
+            sha256 : Expected SHA-256 hex digest.
+            size : Expected size in bytes.
+            segments : Maximum number of parallel range requests, see :func:`wenv._core.source.download_file`.
+            key : Index key, defaults to ``url``.
+        Returns:
+            Path to the object. It must not be modified.
+        """
+
+        key = url if key is None else key
+
+        if sha256 is not None:
+            path = self.get(key)
+            if path is not None and os.path.basename(path) == sha256.lower():
+                return path
+
+        with self._lock(key):  # single-flight, others wait here
+
+            path = self.get(key)  # finished by another process while waiting?
+            if path is not None and (
+                os.path.basename(path) == sha256.lower() if sha256 is not None else self._is_valid(key, url)
+            ):
+                return path
+
+            validators = {}
+            if sha256 is not None and os.path.isfile(self._get_object_path(sha256.lower())):
+                digest = sha256.lower()  # known content, stored under another key
+            else:
+                tmp = os.path.join(self._root, "tmp", self._get_key_hash(key))
+                digest = download_file(
+                    url, tmp, sha256=sha256, size=size, segments=segments, validators=validators
+                )
+                os.makedirs(os.path.dirname(self._get_object_path(digest)), exist_ok=True)
+                os.replace(tmp, self._get_object_path(digest))
+
+            path = self._get_object_path(digest)
+            with self._connect() as db:
+                previous = db.execute("SELECT digest FROM keys WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO objects (digest, size, last_used) VALUES (?, ?, ?)",
+                    (digest, os.path.getsize(path), time.time()),
+                )
+                db.execute("INSERT OR REPLACE INTO keys (key, digest) VALUES (?, ?)", (key, digest))
+                db.execute(
+                    "INSERT OR REPLACE INTO validators (key, etag, last_modified) VALUES (?, ?, ?)",
+                    (key, validators.get("etag"), validators.get("last_modified")),
+                )
+                if (
+                    previous is not None
+                    and previous[0] != digest
+                    and db.execute("SELECT 1 FROM keys WHERE digest = ?", (previous[0],)).fetchone() is None
+                ):
+                    self._remove(db, previous[0])  # outdated by revalidation, no key left
+
+        self.evict(keep=digest)
+
+        return path
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the path of the object stored for ``key`` and marks it as used. ``None`` if there is none.
+
+        Args:
+            key : Index key.
+        """
+
+        if not os.path.isfile(self._get_index_path()):
+            return None
+
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT objects.digest, objects.size FROM keys JOIN objects ON keys.digest = objects.digest WHERE keys.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            digest, size = row
+            path = self._get_object_path(digest)
+            try:
+                intact = os.path.getsize(path) == size
+            except OSError:
+                intact = False
+            if not intact:  # removed or damaged behind the store's back
+                self._remove(db, digest)
+                return None
+            db.execute("UPDATE objects SET last_used = ? WHERE digest = ?", (time.time(), digest))
+
+        return path
+
+    @contextmanager
+    def pin(self, key: str) -> Generator:
+        """
+        Keeps the object stored for ``key`` readable while in use, e.g. while extracting it, even if another process evicts it meanwhile. Yields the path of a hard link to the object, removed on exit, or ``None`` if there is no object for ``key``, e.g. because it was evicted right after :meth:`fetch`.
+
+        Args:
+            key : Index key.
+        """
+
+        pinned = None
+
+        if os.path.isfile(self._get_index_path()):
+            with self._connect() as db:
+                row = db.execute("SELECT digest FROM keys WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE objects SET last_used = ? WHERE digest = ?", (time.time(), row[0]))
+                    os.makedirs(os.path.join(self._root, "tmp"), exist_ok=True)
+                    pinned = os.path.join(self._root, "tmp", "%s.%d.%d.pin" % (row[0], os.getpid(), next(_PINS)))
+                    try:
+                        self.materialize(self._get_object_path(row[0]), pinned)
+                    except FileNotFoundError:  # removed by another process
+                        pinned = None
+
+        try:
+            yield pinned
+        finally:
+            if pinned is not None:
+                os.remove(pinned)
+
+    def materialize(self, path: str, target: str):
+        """
+        Makes an object available under another path, e.g. a file name in the flat ``cache`` or ``packages`` folders, see :func:`wenv._core.store.link_file`.
+
+        Args:
+            path : Path of object as returned by :meth:`fetch` or :meth:`get`.
+            target : Target path. Its directory must exist.
+        """
+
+        link_file(path, target)
+
+    def usage(self) -> int:
+        """
+        Total size of all objects in bytes.
+        """
+
+        if not os.path.isfile(self._get_index_path()):
+            return 0
+
+        with self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Removes least recently used objects until the store fits into its size limit. Only objects without further hard links count towards the limit and are removed. Removing an object which is still linked, e.g. by :meth:`materialize` into the ``cache`` or ``packages`` folders or by :meth:`pin`, would not free any disk space.
+
+        Args:
+            keep : Digest of an object which must not be removed, e.g. the one just fetched.
+        """
+
+        if self._size_limit is None or not os.path.isfile(self._get_index_path()):
+            return
+
+        with self._connect() as db:
+            unlinked = []
+            for digest, size in db.execute(
+                "SELECT digest, size FROM objects ORDER BY last_used ASC"
+            ).fetchall():
+                try:
+                    links = os.stat(self._get_object_path(digest)).st_nlink
+                except FileNotFoundError:  # removed behind the store's back
+                    self._remove(db, digest)
+                    continue
+                if links == 1:
+                    unlinked.append((digest, size))
+            total = sum(size for _, size in unlinked)
+            for digest, size in unlinked:
+                if total <= self._size_limit:
+                    break
+                if digest == keep:
+                    continue
+                self._remove(db, digest)
+                total -= size
+
+    def _is_valid(self, key: str, url: str) -> bool:
+        """
+        Is the object stored for ``key`` still what ``url`` serves?
+        """
+
+        with self._connect() as db:
+            row = db.execute("SELECT etag, last_modified FROM validators WHERE key = ?", (key,)).fetchone()
+        if row is None:  # stored by an earlier version of wenv or without validators
+            return False
+
+        try:
+            return not is_modified(url, *row)
+        except (ConnectionError, HTTPException, socket.timeout, URLError):
+            return True  # unreachable, use what is there
+
+    def _remove(self, db: sqlite3.Connection, digest: str):
+
+        db.execute("DELETE FROM validators WHERE key IN (SELECT key FROM keys WHERE digest = ?)", (digest,))
+        db.execute("DELETE FROM keys WHERE digest = ?", (digest,))
+        db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+
+        try:
+            os.remove(self._get_object_path(digest))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _connect(self) -> Generator:
+        """
+        Short-lived connection to the index, committed on success.
+        """
+
+        os.makedirs(self._root, exist_ok=True)
+
+        with closing(sqlite3.connect(self._get_index_path(), timeout=60.0)) as db:
+            for statement in _SCHEMA:
+                db.execute(statement)
+            with db:  # transaction
+                yield db
+
+    @contextmanager
+    def _lock(self, key: str) -> Generator:
+
+        lock_dir = os.path.join(self._root, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        os.makedirs(os.path.join(self._root, "tmp"), exist_ok=True)
+
+        with open(os.path.join(lock_dir, self._get_key_hash(key)), "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _get_index_path(self) -> str:
+
+        return os.path.join(self._root, "index.sqlite")
+
+    def _get_object_path(self, digest: str) -> str:
+
+        return os.path.join(self._root, "objects", digest[:2], digest)
+
+    @staticmethod
+    def _get_key_hash(key: str) -> str:
+
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+def link_file(path: str, target: str):
+    """
+    Makes a file available under another path. Hard links are used where possible, copies otherwise, e.g. across file systems. Existing targets are atomically replaced.
+
+    Args:
+        path : Existing file.
+        target : Target path. Its directory must exist.
+    """
+
+    tmp = "%s.%d.tmp" % (target, os.getpid())
+
+    try:
+        os.link(path, tmp)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            raise
+        shutil.copyfile(path, tmp)
+
+    os.replace(tmp, target)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/tags.py: Wheel compatibility tags of Wine Python environments
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .pythonversion import PythonVersion
+from .typeguard import typechecked
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+PLATFORMS = {
+    "win32": "win32",
+    "win64": "win_amd64",
+    "arm64": "win_arm64",
+}
+
+MACHINES = {  # platform.machine() of Windows builds
+    "win32": "x86",
+    "win64": "AMD64",
+    "arm64": "ARM64",
+}
+
+# Runs pip with environment markers evaluated for the target, patched where pip's vendored packaging looks them up
+_PIP_MARKERS_SCRIPT = """
+import json, sys
+from pip._vendor.packaging import markers
+environment = json.loads(sys.argv[1])
+markers.default_environment = lambda: dict(environment)
+from pip._internal.cli.main import main
+sys.exit(main(sys.argv[2:]))
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+def get_compatible_tags(pythonversion: PythonVersion) -> List[Tuple[str, str, str]]:
+    """
+    Wheel tags supported by a Windows build of CPython, most preferred first, following the order ``pip`` uses.
+
+    Args:
+        pythonversion : Python version and build architecture.
+    Returns:
+        A list of ``(interpreter, abi, platform)`` tuples.
+    """
+
+    major, minor = pythonversion.major, pythonversion.minor
+    platform = PLATFORMS[pythonversion.arch]
+    interpreter = "cp%d%d" % (major, minor)
+    abi = interpreter + ("m" if (major, minor) < (3, 8) else "")  # pymalloc flag dropped in 3.8
+
+    tags = [
+        (interpreter, abi, platform),
+        (interpreter, "abi3", platform),
+        (interpreter, "none", platform),
+    ]
+    tags.extend(("cp%d%d" % (major, older), "abi3", platform) for older in range(minor - 1, 1, -1))
+
+    pys = ["py%d%d" % (major, older) for older in range(minor, -1, -1)]
+    pys.insert(1, "py%d" % major)  # pip's order: pyXY, pyX, pyX(Y-1), ...
+
+    tags.extend((py, "none", platform) for py in pys)
+    tags.append((interpreter, "none", "any"))
+    tags.extend((py, "none", "any") for py in pys)
+
+    return tags
+
+
+@typechecked
+def get_pip_target_args(pythonversion: PythonVersion) -> List[str]:
+    """
+    Arguments for ``pip`` on the host which make it select wheels for a Windows build of CPython instead of the host.
+
+    Args:
+        pythonversion : Python version and build architecture.
+    Returns:
+        A list of command line arguments.
+    """
+
+    _, abi, platform = get_compatible_tags(pythonversion)[0]
+
+    return [
+        "--only-binary=:all:",
+        "--platform", platform,
+        "--python-version", "%d.%d" % (pythonversion.major, pythonversion.minor),
+        "--implementation", "cp",
+        "--abi", abi,
+        "--abi", "abi3",
+        "--abi", "none",
+    ]
+
+
+@typechecked
+def get_marker_environment(pythonversion: PythonVersion) -> Dict[str, str]:
+    """
+    `Environment markers`_ of a Windows build of CPython, as seen by ``pip`` inside Wine.
+
+    .. _Environment markers: https://peps.python.org/pep-0508/#environment-markers
+
+    Args:
+        pythonversion : Python version and build architecture.
+    Returns:
+        A dictionary of marker names and values.
+    """
+
+    version = "%d.%d.%d" % (pythonversion.major, pythonversion.minor, pythonversion.maintenance)
+
+    return {
+        "implementation_name": "cpython",
+        "implementation_version": version,
+        "os_name": "nt",
+        "platform_machine": MACHINES[pythonversion.arch],
+        "platform_python_implementation": "CPython",
+        "platform_release": "10",
+        "platform_system": "Windows",
+        "platform_version": "10.0.19041",
+        "python_full_version": version,
+        "python_version": "%d.%d" % (pythonversion.major, pythonversion.minor),
+        "sys_platform": "win32",
+    }
+
+
+@typechecked
+def get_pip_target_command(pythonversion: PythonVersion) -> List[str]:
+    """
+    Command running ``pip`` on the host with environment markers of a Windows build of CPython, see :func:`get_marker_environment`. Options like ``--platform`` only affect which wheels are selected, not which dependencies apply. Arguments for ``pip`` are appended, e.g. ``install`` and :func:`get_pip_target_args`.
+
+    Args:
+        pythonversion : Python version and build architecture.
+    Returns:
+        A list of command line arguments.
+    """
+
+    return [sys.executable, "-c", _PIP_MARKERS_SCRIPT, json.dumps(get_marker_environment(pythonversion))]
+
+
+@typechecked
+def parse_wheel_filename(fn: str) -> Optional[Set[Tuple[str, str, str]]]:
+    """
+    Expands the compressed tag set of a wheel file name, e.g. ``py2.py3-none-any``.
+
+    Args:
+        fn : File name.
+    Returns:
+        A set of ``(interpreter, abi, platform)`` tuples or ``None`` if ``fn`` is not a wheel.
+    """
+
+    if not fn.endswith(".whl"):
+        return None
+
+    parts = fn[:-4].split("-")
+    if len(parts) not in (5, 6):  # name, version, [build,] interpreter, abi, platform
+        return None
+
+    return {
+        (interpreter, abi, platform)
+        for interpreter in parts[-3].split(".")
+        for abi in parts[-2].split(".")
+        for platform in parts[-1].split(".")
+    }
+
+
+@typechecked
+def select_files(items: List[Dict[str, Any]], pythonversion: PythonVersion) -> List[Dict[str, Any]]:
+    """
+    Picks the files of a release which are useful for a Wine Python environment from a list of PyPI file descriptions (``urls`` in PyPI's JSON API). This is the most compatible wheel or, if there is no compatible wheel, the source distributions.
+
+    Args:
+        items : PyPI file descriptions, each with at least a ``filename``.
+        pythonversion : Python version and build architecture of the environment.
+    Returns:
+        A possibly empty list of file descriptions.
+    """
+
+    ranks = {tag: rank for rank, tag in enumerate(get_compatible_tags(pythonversion))}
+
+    best, best_rank = None, len(ranks)
+    for item in items:
+        tags = parse_wheel_filename(item["filename"])
+        if tags is None:
+            continue
+        rank = min((ranks[tag] for tag in tags if tag in ranks.keys()), default=len(ranks))
+        if rank < best_rank:
+            best, best_rank = item, rank
+
+    if best is not None:
+        return [best]
+
+    return [
+        item for item in items
+        if item.get("packagetype") == "sdist" or item["filename"].endswith((".tar.gz", ".zip"))
+    ]
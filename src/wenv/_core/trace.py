@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/trace.py: Opt-in per-phase timing records
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from contextvars import ContextVar
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from .typeguard import typechecked
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+_START = time.monotonic()  # i.e. when wenv's own code started running in this process
+
+_TAGS = ContextVar("wenv_trace_tags", default={})  # see tagged
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class _Phase:
+    """
+    Times one phase and appends its record to the trace file on exit. Tags can be added while the phase is running through ``tags``.
+    """
+
+    def __init__(self, path: str, phase: str, tags: Dict[str, Any]):
+
+        self._path = path
+        self._phase = phase
+        self.tags = tags
+
+    def __enter__(self):
+
+        self._time = time.time()
+        self._start = time.monotonic()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        record = {
+            "phase": self._phase,
+            "duration": time.monotonic() - self._start,
+            "t": self._time,
+            "pid": os.getpid(),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(_TAGS.get())
+        record.update(self.tags)
+
+        _write(self._path, record)
+
+        return False
+
+
+class _NoPhase:
+    """
+    Stand-in for ``_Phase`` if tracing is disabled.
+    """
+
+    def __init__(self):
+
+        self.tags = {}
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.tags.clear()
+
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Tagged:
+    """
+    Adds tags to all records of the current context while active, see ``tagged``.
+    """
+
+    def __init__(self, tags: Dict[str, Any]):
+
+        self._tags = tags
+
+    def __enter__(self):
+
+        self._token = _TAGS.set(dict(_TAGS.get(), **self._tags))
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        _TAGS.reset(self._token)
+
+        return False
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+def get_trace_path() -> Optional[str]:
+    """
+    Path of the trace file set in ``WENV_TRACE``. ``None`` if tracing is disabled.
+    """
+
+    path = os.environ.get("WENV_TRACE", "")
+
+    return path if len(path) > 0 else None
+
+
+def trace(phase: str, **tags: Any):
+    """
+    Context manager timing one phase, e.g. ``with trace("wineboot", arch="win32"): ...``. If ``WENV_TRACE`` is set, one JSON line per phase is appended to the file it points to. Otherwise, it does nothing.
+
+    Args:
+        phase : Name of phase.
+        tags : Additional JSON-serializable fields of the record.
+    """
+
+    path = get_trace_path()
+    if path is None:
+        return _NO_PHASE
+
+    return _Phase(path, phase, tags)
+
+
+def mark(phase: str, **tags: Any):
+    """
+    Records a phase which ends right now and started when ``wenv`` was imported, e.g. right before the process is replaced by *Wine*.
+
+    Args:
+        phase : Name of phase.
+        tags : Additional JSON-serializable fields of the record.
+    """
+
+    path = get_trace_path()
+    if path is None:
+        return
+
+    record = {
+        "phase": phase,
+        "duration": time.monotonic() - _START,
+        "t": time.time() - (time.monotonic() - _START),
+        "pid": os.getpid(),
+    }
+    record.update(_TAGS.get())
+    record.update(tags)
+
+    _write(path, record)
+
+
+def tagged(**tags: Any):
+    """
+    Context manager adding tags to every record within it, including records of code which does not know them, e.g. ``download`` records of an environment's downloads. Tags apply to the current thread or ``contextvars`` context, i.e. pass them on to worker threads via ``contextvars.copy_context``.
+
+    Args:
+        tags : Additional JSON-serializable fields of records.
+    """
+
+    return _Tagged(tags)
+
+
+def _write(path: str, record: Dict[str, Any]):
+
+    line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)  # one write per record, concurrent processes do not interleave
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # tracing must never break wenv, e.g. if the disk is full
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    src/wenv/_core/usercache.py: Per-user state outside of environments
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import os
+from typing import Any, List, Optional
+
+from .typeguard import typechecked
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@typechecked
+def get_user_cache_dir(*segments: str) -> str:
+    """
+    Per-user cache directory of ``wenv``, i.e. ``$XDG_CACHE_HOME/wenv`` or ``~/.cache/wenv``. It holds derived state which can always be rebuilt and must not depend on ``wenv``'s own configuration.
+    """
+
+    base = os.environ.get("XDG_CACHE_HOME", "")
+    if len(base) == 0:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(base, "wenv", *segments)
+
+
+@typechecked
+def read_json(path: str) -> Optional[Any]:
+    """
+    Reads a JSON file. Returns ``None`` if it is missing, unreadable or broken.
+    """
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@typechecked
+def write_json(path: str, data: Any):
+    """
+    Writes a JSON file atomically, creating parent directories accessible to the current user only.
+    """
+
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@typechecked
+def prune_json(directory: str, keep: int):
+    """
+    Removes all but the ``keep`` most recently written JSON files of a directory, e.g. entries keyed by hashes of invocation contexts which may never be looked up again. Files removed concurrently by other processes are skipped.
+    """
+
+    entries = []
+    try:
+        for entry in os.scandir(directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except OSError:
+                continue
+    except OSError:
+        return
+
+    for _, path in sorted(entries, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@typechecked
+def stat_stamp(path: str) -> Optional[List[int]]:
+    """
+    Cheap fingerprint of a file or directory, i.e. inode, modification time and size. ``None`` if it does not exist.
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/httpserver.py: Local stand-in HTTP server
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from contextlib import contextmanager
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socket
+import threading
+import time
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+
+        super().setup()
+
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+
+        requested = self.headers.get("Range")
+        self.server.requests.append((self.path, requested))
+        self.server.headers.append(self.headers)
+
+        if self.path in self.server.redirects.keys():
+            self.send_response(302)
+            self.send_header("Location", self.server.redirects[self.path])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        etag = '"%s"' % hashlib.sha256(data).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("If-Range") not in (None, etag):  # changed, full response
+            requested = None
+
+        start, end = 0, len(data) - 1
+        if requested is not None and self.server.ranges:
+            first, last = requested.split("=", 1)[1].split("-", 1)
+            start = int(first)
+            end = min(int(last), end) if len(last) > 0 else end
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", "bytes */%d" % len(data))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes %d-%d/%d" % (start, end, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes" if self.server.ranges else "none")
+        self.send_header("Content-Type", "text/html" if self.path.endswith("/") else "application/octet-stream")
+        self.send_header("ETag", etag)
+        if self.server.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+
+        time.sleep(self.server.delay)
+
+        body = data[start : end + 1]
+        with self.server.lock:
+            drop = self.server.drops.pop(0) if len(self.server.drops) > 0 else None
+        if drop is not None and drop < len(body):  # inject disconnect
+            self.wfile.write(body[:drop])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+
+        if self.server.chunked:
+            for offset in range(0, len(body), 4096):
+                piece = body[offset : offset + 4096]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+
+        pass
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@contextmanager
+def serve(files, ranges=True, drops=None, delay=0.0, redirects=None, chunked=False):
+    """
+    Serves ``files``, a dictionary of format ``{"/path": b"content"}``, on a free local port. Yields the server, its base URL is ``server.url``, requested paths and ``Range`` headers are collected in ``server.requests``, all request headers in ``server.headers``. Responses carry an ``ETag`` and honor ``If-None-Match`` and ``If-Range``.
+
+    Range requests are answered unless ``ranges`` is ``False``. ``drops`` is a list of byte counts: the n-th response with a body is cut off after the n-th count of bytes, simulating dropped connections. ``None`` entries let responses through. ``delay`` is the latency in seconds before each response body. ``redirects`` maps paths to redirect targets. Bodies are sent with chunked transfer encoding, i.e. without known length, if ``chunked`` is ``True``. The number of accepted connections is counted in ``server.connections``.
+    """
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.files = files
+    server.ranges = ranges
+    server.delay = delay
+    server.redirects = {} if redirects is None else redirects
+    server.chunked = chunked
+    server.connections = 0
+    server.drops = [] if drops is None else list(drops)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.headers = []
+    server.url = "http://127.0.0.1:%d" % server.server_address[1]
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_archive.py: Testing streaming extraction of zip archives
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import io
+import os
+import zipfile
+
+import pytest
+
+from wenv._core.archive import extract_zip
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+LIB = {"os.py": b"os" * 1000, "encodings/__init__.py": b"encodings", "../escape.py": b"escape"}
+
+
+def _make_embed(path, compression):
+
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as f:
+        for name, data in LIB.items():
+            f.writestr(name, data)
+
+    with zipfile.ZipFile(str(path), "w", zipfile.ZIP_DEFLATED) as f:
+        f.writestr("python.exe", b"exe" * 1000)
+        f.writestr("DLLs/", b"")
+        f.writestr("python310.zip", stream.getvalue(), compress_type=compression)
+        f.writestr("python310._pth", b"python310.zip\n.\n")
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_extract_nested(tmp_path, compression):
+
+    archive = tmp_path / "python-3.10.4-embed-amd64.zip"
+    _make_embed(archive, compression)
+    prefix = tmp_path / "prefix"
+
+    written = extract_zip(str(archive), str(prefix), nested={"python310.zip": str(prefix / "Lib")})
+
+    assert sorted(os.listdir(str(prefix))) == ["DLLs", "Lib", "python.exe", "python310._pth"]
+    assert (prefix / "python.exe").read_bytes() == b"exe" * 1000
+    assert (prefix / "Lib" / "os.py").read_bytes() == LIB["os.py"]
+    assert (prefix / "Lib" / "encodings" / "__init__.py").read_bytes() == LIB["encodings/__init__.py"]
+    assert (prefix / "Lib" / "escape.py").read_bytes() == LIB["../escape.py"]  # sanitized
+    assert not (tmp_path / "escape.py").exists()
+    assert written == 3000 + 16 + sum(len(data) for data in LIB.values())
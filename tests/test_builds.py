@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_builds.py: Testing the persistent Python build index
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from collections import Counter
+
+from wenv._core.source import get_available_python_builds, iter_available_python_builds
+
+from .httpserver import serve
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# HELPER
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _make_listing(dates):
+
+    lines = ['<a href="../">../</a>']
+    for name, date in dates.items():
+        lines.append('<a href="%s">%s</a>    %s  -' % (name, name, date))
+
+    return "\n".join(lines).encode("utf-8")
+
+
+def _make_files(dates, builds):
+
+    files = {"/ftp/python/": _make_listing(dates)}
+    for name, fns in builds.items():
+        files["/ftp/python/" + name] = "\n".join(
+            '<a href="%s">%s</a>' % (fn, fn) for fn in fns
+        ).encode("utf-8")
+
+    return files
+
+
+def _get_requested(server):
+
+    return [path for path, _ in server.requests]
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def test_build_index(monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    dates = {"3.9.0/": "05-Oct-2020 19:26", "3.10.0/": "04-Oct-2021 20:56"}
+    builds = {
+        "3.9.0/": ["python-3.9.0-embed-amd64.zip", "python-3.9.0-embed-amd64.zip.asc"],
+        "3.10.0/": ["python-3.10.0-embed-win32.zip", "python-3.10.0-embed-amd64.zip"],
+    }
+    files = _make_files(dates, builds)
+
+    with serve(files) as server:
+
+        url = server.url + "/ftp/python/"
+
+        first = get_available_python_builds(url=url)
+        assert sorted(_get_requested(server)) == sorted(files.keys())
+        assert sorted((build.arch, str(build)) for build in first) == [
+            ("win32", "3.10.0.stable"), ("win64", "3.10.0.stable"), ("win64", "3.9.0.stable"),
+        ]
+
+        server.requests.clear()
+        assert get_available_python_builds(url=url) == first
+        assert _get_requested(server) == []  # within TTL
+
+        assert get_available_python_builds(url=url, ttl=0) == first
+        assert _get_requested(server) == ["/ftp/python/"]  # revalidated, unchanged
+
+        server.requests.clear()
+        dates["3.9.0/"] = "06-Oct-2020 10:00"
+        dates["3.11.0/"] = "24-Oct-2022 13:18"
+        builds["3.9.0/"].append("python-3.9.0-embed-win32.zip")
+        builds["3.11.0/"] = ["python-3.11.0-embed-arm64.zip"]
+        files.update(_make_files(dates, builds))
+
+        second = get_available_python_builds(url=url, ttl=0)
+        assert sorted(_get_requested(server)) == ["/ftp/python/", "/ftp/python/3.11.0/", "/ftp/python/3.9.0/"]
+        assert len(second) == len(first) + 2
+
+    assert get_available_python_builds(url=url, ttl=0) == second  # server gone, snapshot
+
+
+def test_build_discovery_stops_early(monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    dates = {"3.%d.0/" % minor: "01-Oct-20%02d 12:00" % minor for minor in range(5, 13)}
+    builds = {name: ["python-%sembed-amd64.zip" % name.replace("/", "-")] for name in dates.keys()}
+
+    with serve(_make_files(dates, builds)) as server:
+
+        url = server.url + "/ftp/python/"
+
+        for build in iter_available_python_builds(parallel=1, url=url):
+            break  # newest first in order of completion, i.e. one request at a time, stops the crawl
+        assert (build.major, build.minor) == (3, 12)
+
+        found = sorted(iter_available_python_builds(parallel=2, url=url, ttl=0))
+        assert [build.minor for build in found] == list(range(5, 13))
+
+        assert sorted(iter_available_python_builds(parallel=2, url=url)) == found  # within TTL
+
+    counts = Counter(_get_requested(server))  # requests in flight when stopped may complete any time
+    assert counts.pop("/ftp/python/") == 2  # listing, twice
+    assert counts.pop("/ftp/python/3.12.0/") == 1  # directory crawled before is kept
+    assert counts.pop("/ftp/python/3.11.0/") in (1, 2)  # submitted when stopped
+    assert set(counts.values()) == {1}  # never requested by stopped crawl
+    assert len(counts) == len(dates) - 2
+
+
+def test_build_discovery_offline(monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    dates = {"3.9.0/": "05-Oct-2020 19:26", "3.10.0/": "04-Oct-2021 20:56"}
+    builds = {name: ["python-%sembed-amd64.zip" % name.replace("/", "-")] for name in dates.keys()}
+
+    with serve(_make_files(dates, builds)) as server:
+        url = server.url + "/ftp/python/"
+        found = sorted(iter_available_python_builds(url=url))
+
+    assert sorted(iter_available_python_builds(url=url, ttl=0)) == found  # server gone, snapshot
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_cache.py: Testing concurrent caching of installation files
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import hashlib
+import io
+import json
+import os
+import socket
+import zipfile
+
+import pytest
+
+from wenv import Env
+from wenv._core.const import SOURCES
+
+from .httpserver import serve
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+FILES = {"/%d.bin" % index: os.urandom(10000 * (index + 1)) for index in range(6)}
+
+
+def _make_wheel(fn, requires=()):
+
+    name, version = fn.split("-")[:2]
+    dist_info = "%s-%s.dist-info/" % (name, version)
+
+    stream = io.BytesIO()
+    with zipfile.ZipFile(stream, "w") as f:
+        f.writestr(dist_info + "METADATA", "".join(
+            ["Metadata-Version: 2.1\nName: %s\nVersion: %s\n" % (name, version)]
+            + ["Requires-Dist: %s\n" % requirement for requirement in requires]
+        ))
+        f.writestr(dist_info + "WHEEL", "Wheel-Version: 1.0\nRoot-Is-Purelib: true\n")
+        f.writestr(dist_info + "RECORD", "")
+
+    return stream.getvalue()
+
+
+def _make_index(wheels):
+
+    files = {}
+    for fn, data in wheels.items():
+        files["/files/" + fn] = data
+        project = "/simple/%s/" % fn.split("-")[0]
+        files[project] = files.get(project, b"") + b'<a href="../../files/%s#sha256=%s">%s</a>\n' % (
+            fn.encode("utf-8"), hashlib.sha256(data).hexdigest().encode("utf-8"), fn.encode("utf-8")
+        )
+
+    return files
+
+
+def test_cache_concurrent(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+
+    with serve(FILES, delay=0.5) as server:
+
+        monkeypatch.setattr(Env, "_get_installer_urls", lambda self, pythonversion=None: {
+            "%d.bin" % index: server.url + "/%d.bin" % index for index in range(3)
+        })
+        monkeypatch.setattr(Env, "_get_package_files", lambda self, name, pythonversions=None: [
+            {"filename": "%s-%d.bin" % (name, index), "url": server.url + "/%d.bin" % index}
+            for index in range(3, 6)
+        ] if name == "pip" else [])
+
+        reported = []
+        summary = Env(cache=str(tmp_path / "cache"), download_workers=8).cache(progress=reported.append)
+
+    assert summary["files"] == 6
+    assert summary["bytes"] == sum(len(data) for data in FILES.values())
+    assert summary["seconds"] < 1.5  # sequentially at least 3 seconds
+    assert sorted(item["name"] for item in reported) == ["0.bin", "1.bin", "2.bin", "pip-3.bin", "pip-4.bin", "pip-5.bin"]
+    assert (tmp_path / "cache" / "packages" / "pip-5.bin").read_bytes() == FILES["/5.bin"]
+
+
+def test_cache_requirements(monkeypatch, tmp_path):
+
+    wheels = {
+        "app-1.0-py3-none-any.whl": _make_wheel("app-1.0-py3-none-any.whl", ["lib>=2"]),
+        "lib-1.0-py3-none-any.whl": _make_wheel("lib-1.0-py3-none-any.whl"),
+        "lib-2.0-cp310-cp310-win_amd64.whl": _make_wheel("lib-2.0-cp310-cp310-win_amd64.whl"),
+        "lib-2.0-cp310-cp310-manylinux1_x86_64.whl": _make_wheel("lib-2.0-cp310-cp310-manylinux1_x86_64.whl"),
+    }
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("app\n")
+
+    with serve(_make_index(wheels)) as server:
+        monkeypatch.setenv("PIP_INDEX_URL", server.url + "/simple/")
+        monkeypatch.delenv("PIP_EXTRA_INDEX_URL", raising=False)
+        monkeypatch.setenv("PIP_DISABLE_PIP_VERSION_CHECK", "1")
+        env = Env(arch="win64", pythonversion="3.10.4", cache=str(tmp_path / "cache"))
+        summary = env.cache_requirements(str(requirements))
+
+    assert summary["files"] == 2
+    assert sorted(os.listdir(str(tmp_path / "cache" / "packages"))) == [
+        "app-1.0-py3-none-any.whl",
+        "lib-2.0-cp310-cp310-win_amd64.whl",
+    ]
+    assert (tmp_path / "cache" / "packages" / "lib-2.0-cp310-cp310-win_amd64.whl").read_bytes() == wheels[
+        "lib-2.0-cp310-cp310-win_amd64.whl"
+    ]
+
+
+def test_cache_requirements_markers(monkeypatch, tmp_path):
+
+    wheels = {
+        "app-1.0-py3-none-any.whl": _make_wheel("app-1.0-py3-none-any.whl", [
+            'winonly; sys_platform == "win32"',
+            'linonly; sys_platform == "linux"',
+            'colorama; platform_system == "Windows"',
+            'amdonly; platform_machine == "AMD64"',
+        ]),
+        "winonly-1.0-py3-none-any.whl": _make_wheel("winonly-1.0-py3-none-any.whl"),
+        "linonly-1.0-py3-none-any.whl": _make_wheel("linonly-1.0-py3-none-any.whl"),
+        "colorama-1.0-py3-none-any.whl": _make_wheel("colorama-1.0-py3-none-any.whl"),
+        "amdonly-1.0-py3-none-any.whl": _make_wheel("amdonly-1.0-py3-none-any.whl"),
+    }
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("app\n")
+
+    with serve(_make_index(wheels)) as server:
+        monkeypatch.setenv("PIP_INDEX_URL", server.url + "/simple/")
+        monkeypatch.delenv("PIP_EXTRA_INDEX_URL", raising=False)
+        monkeypatch.setenv("PIP_DISABLE_PIP_VERSION_CHECK", "1")
+        env = Env(arch="win32", pythonversion="3.10.4", cache=str(tmp_path / "cache"))
+        env.cache_requirements(str(requirements))
+
+    assert sorted(os.listdir(str(tmp_path / "cache" / "packages"))) == [
+        "app-1.0-py3-none-any.whl",
+        "colorama-1.0-py3-none-any.whl",
+        "winonly-1.0-py3-none-any.whl",
+    ]
+
+
+def test_cache_matrix(monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+
+    wheels = [
+        "pip-22.3-py3-none-any.whl",
+        "setuptools-65.5.0-py3-none-any.whl",
+        "wheel-0.38.0-cp39-cp39-win32.whl",  # one per combination
+        "wheel-0.38.0-cp39-cp39-win_amd64.whl",
+        "wheel-0.38.0-cp310-cp310-win32.whl",
+        "wheel-0.38.0-cp310-cp310-win_amd64.whl",
+    ]
+    files = {"/files/" + fn: fn.encode("utf-8") for fn in wheels}
+    files["/getpip/get-pip.py"] = b"get-pip"
+    for version, tag in (("3.9.13", "v3.9.13"), ("3.10.4", "v3.10.4")):
+        files["/cpython/%s/Lib/site.py" % tag] = tag.encode("utf-8")
+        for arch, suffix in (("win32", "win32"), ("win64", "amd64")):
+            files["/ftp/python/%s/python-%s-embed-%s.zip" % (version, version, suffix)] = suffix.encode("utf-8")
+
+    with serve(files) as server:
+        for name in ("pip", "setuptools", "wheel"):
+            files["/pypi/%s/json" % name] = json.dumps({"urls": [
+                {"filename": fn, "url": server.url + "/files/" + fn} for fn in wheels if fn.startswith(name + "-")
+            ]}).encode("utf-8")
+        monkeypatch.setitem(SOURCES, "python", server.url + "/ftp/python/")
+        monkeypatch.setitem(SOURCES, "getpip", server.url + "/getpip/")
+        monkeypatch.setitem(SOURCES, "cpython", server.url + "/cpython/")
+        monkeypatch.setitem(SOURCES, "pypi", server.url + "/")
+
+        env = Env(cache=str(tmp_path / "cache"))
+        summary = env.cache_matrix(["win32", "win64", "win32"], ["3.9.13", "3.10.4"])
+        paths = [path for path, _ in server.requests]
+
+    assert summary["files"] == 4 + 1 + 2 + len(wheels)
+    assert paths.count("/getpip/get-pip.py") == 1
+    assert paths.count("/files/pip-22.3-py3-none-any.whl") == 1
+    assert paths.count("/pypi/wheel/json") == 1
+    assert sorted(os.listdir(str(tmp_path / "cache" / "packages"))) == sorted(wheels)
+    assert (tmp_path / "cache" / "site-v3.9.13.py").read_bytes() == b"v3.9.13"
+    assert (tmp_path / "cache" / "site-v3.10.4.py").read_bytes() == b"v3.10.4"
+    assert (tmp_path / "cache" / "python-3.10.4-embed-amd64.zip").read_bytes() == b"amd64"
+
+
+def test_cache_matrix_latest(monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+
+    with socket.socket() as sock:  # python.org is out of reach, only the mirror is
+        sock.bind(("127.0.0.1", 0))
+        origin = "http://127.0.0.1:%d/" % sock.getsockname()[1]
+
+    dirs = {
+        "3.10.3/": ["python-3.10.3-embed-amd64.zip"],
+        "3.10.4/": ["python-3.10.4-embed-amd64.zip"],
+        "3.10.5/": ["python-3.10.5rc1-embed-amd64.zip"],  # not stable
+        "3.11.0/": ["python-3.11.0-embed-amd64.zip"],
+    }
+    files = {"/ftp/python/": "\n".join(
+        '<a href="%s">%s</a>    01-Jan-2022 00:00  -' % (name, name) for name in dirs.keys()
+    ).encode("utf-8")}
+    for name, fns in dirs.items():
+        files["/ftp/python/" + name] = "\n".join('<a href="%s">%s</a>' % (fn, fn) for fn in fns).encode("utf-8")
+        for fn in fns:
+            files["/ftp/python/" + name + fn] = fn.encode("utf-8")
+    files["/getpip/get-pip.py"] = b"get-pip"
+    files["/cpython/v3.10.4/Lib/site.py"] = b"v3.10.4"
+
+    with serve(files) as server:
+        monkeypatch.setitem(SOURCES, "python", origin)
+        monkeypatch.setitem(SOURCES, "getpip", server.url + "/getpip/")
+        monkeypatch.setitem(SOURCES, "cpython", server.url + "/cpython/")
+        monkeypatch.setattr(Env, "_get_package_files", lambda self, name, pythonversions=None: [])
+
+        env = Env(cache=str(tmp_path / "cache"), mirrors={"python": [server.url + "/ftp/python/"]})
+        env.cache_matrix(["win64"], ["3.10"])
+
+        with pytest.raises(ValueError):
+            env.cache_matrix(["win32"], ["3.10"])
+
+    assert (tmp_path / "cache" / "python-3.10.4-embed-amd64.zip").read_bytes() == b"python-3.10.4-embed-amd64.zip"
+    assert not (tmp_path / "cache" / "python-3.10.5rc1-embed-amd64.zip").exists()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_config.py: Testing configuration
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import os
+
+from wenv import EnvConfig, PythonVersion
+from wenv._core.const import CONFIG_CACHE_LIMIT
+from wenv._core.usercache import get_user_cache_dir
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def test_snapshot(monkeypatch):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    config = EnvConfig(wineprefix="/tmp/wenv-test", pythonversion="3.10.4")
+
+    snapshot = config.snapshot()
+    assert snapshot is config.snapshot()
+    assert snapshot["pythonversion"] == PythonVersion("win32", 3, 10, 4)
+    assert snapshot["pythonprefix"] == "/tmp/wenv-test/drive_c/python-3.10.4.stable"
+    assert config["pythonprefix"] == snapshot["pythonprefix"]
+    assert config.export_envvar_dict()["WENV_WINEINSTALLPREFIX"] == ""
+
+    config["wineprefix"] = "/tmp/wenv-other"
+    assert config.snapshot() is not snapshot
+    assert config["pythonprefix"] == "/tmp/wenv-other/drive_c/python-3.10.4.stable"
+
+
+def test_snapshot_environment(monkeypatch):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    config = EnvConfig()
+    assert config["arch"] == "win32"
+
+    monkeypatch.setenv("WENV_ARCH", "win64")
+    assert config["arch"] == "win32"
+    config.invalidate()
+    assert config["arch"] == "win64"
+    assert config["wineprefix"].endswith("win64")
+
+
+def test_unknown_keys(monkeypatch):
+
+    config = EnvConfig(some_key="some_value")
+    assert config["some_key"] == "some_value"
+    assert config.export_dict()["some_key"] == "some_value"
+
+    monkeypatch.setenv("WENV_OTHER_KEY", "other_value")
+    assert config["other_key"] == "other_value"
+
+
+def test_config_file_cache(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+
+    config_file = tmp_path / ".wenv.json"
+    config_file.write_text('{"arch": "win64"}')
+    assert EnvConfig()["arch"] == "win64"
+    assert len(list((tmp_path / "cache" / "wenv" / "config").iterdir())) == 1
+
+    config_file.write_text('{"arch": "arm64", "offline": true}')
+    config = EnvConfig()
+    assert config["arch"] == "arm64"
+    assert config["offline"] is True
+
+    config_file.unlink()
+    assert EnvConfig()["arch"] == "win32"
+
+
+def test_config_file_cache_limit(monkeypatch, tmp_path):
+
+    for index in range(CONFIG_CACHE_LIMIT + 8):  # one entry per working directory
+        (tmp_path / str(index)).mkdir()
+        monkeypatch.chdir(tmp_path / str(index))
+        EnvConfig()
+
+    assert len(os.listdir(get_user_cache_dir("config"))) == CONFIG_CACHE_LIMIT
+
+
+def test_mirrors(monkeypatch):
+
+    mirrors = {"python": ["http://mirror.local/python/"]}
+    config = EnvConfig(mirrors=mirrors)
+    assert EnvConfig()["mirrors"] == {}
+
+    envvar = config.export_envvar_dict()["WENV_MIRRORS"]
+    monkeypatch.setenv("WENV_MIRRORS", envvar)
+    assert EnvConfig()["mirrors"] == mirrors
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_download.py: Testing downloads
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import socket
+from urllib.error import HTTPError
+
+import pytest
+
+from wenv import PythonVersion
+from wenv._core.source import POOL, ConnectionPool, Mirrors, download_cached, download_file, read_cached
+
+from .httpserver import serve
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+DATA = os.urandom(1 << 20)
+DIGEST = hashlib.sha256(DATA).hexdigest()
+ZIPNAME = "python-3.10.4-embed-amd64.zip"
+
+
+def test_download_file(tmp_path):
+
+    path = str(tmp_path / "data.bin")
+
+    with serve({"/data.bin": DATA}) as server:
+        digest = download_file(server.url + "/data.bin", path, sha256=DIGEST, chunk_size=4096)
+
+    assert digest == DIGEST
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    assert os.listdir(str(tmp_path)) == ["data.bin"]
+
+
+def test_download_file_checksum(tmp_path):
+
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"previous")
+
+    with serve({"/data.bin": DATA}) as server:
+        with pytest.raises(OSError):
+            download_file(server.url + "/data.bin", str(path), sha256="0" * 64)
+
+    assert path.read_bytes() == b"previous"
+    assert os.listdir(str(tmp_path)) == ["data.bin"]
+
+
+def test_download_file_resume(tmp_path):
+
+    path = str(tmp_path / "data.bin")
+
+    with serve({"/data.bin": DATA}, drops=[100000, 300000]) as server:
+        digest = download_file(server.url + "/data.bin", path, size=len(DATA), retries=2)
+
+    assert digest == DIGEST
+    assert [requested for _, requested in server.requests] == [
+        None,
+        "bytes=100000-",
+        "bytes=400000-",
+    ]
+
+
+def test_download_file_resume_partial(tmp_path):
+
+    path = tmp_path / "data.bin"
+    (tmp_path / "data.bin.part").write_bytes(DATA[:5000])
+
+    with serve({"/data.bin": DATA}) as server:
+        assert download_file(server.url + "/data.bin", str(path), sha256=DIGEST) == DIGEST
+
+    assert server.requests == [("/data.bin", "bytes=5000-")]
+    assert path.read_bytes() == DATA
+
+
+def test_download_file_resume_validated(tmp_path):
+
+    path = tmp_path / "data.bin"
+    stale = os.urandom(5000)
+
+    with serve({"/data.bin": stale}, drops=[3000]) as server:  # interrupted, leaves part with validator
+        with pytest.raises(ConnectionError):
+            download_file(server.url + "/data.bin", str(path), retries=0)
+        assert (tmp_path / "data.bin.part").read_bytes() == stale[:3000]
+
+        server.files["/data.bin"] = DATA[:5000]  # changed upstream meanwhile
+        assert download_file(server.url + "/data.bin", str(path)) == hashlib.sha256(DATA[:5000]).hexdigest()
+
+    assert server.requests[-1] == ("/data.bin", "bytes=3000-")  # with If-Range, answered in full
+    assert path.read_bytes() == DATA[:5000]
+    assert os.listdir(str(tmp_path)) == ["data.bin"]
+
+
+@pytest.mark.parametrize("validator", [None, "other"])
+def test_download_file_resume_discarded(tmp_path, validator):
+
+    path = tmp_path / "data.bin"
+    (tmp_path / "data.bin.part").write_bytes(os.urandom(5000))  # without validator or from another URL
+
+    with serve({"/data.bin": DATA}) as server:
+        if validator is not None:
+            (tmp_path / "data.bin.part.json").write_text(json.dumps({"url": server.url + "/other.bin", "validator": '"x"'}))
+        assert download_file(server.url + "/data.bin", str(path)) == DIGEST
+
+    assert server.requests == [("/data.bin", None)]
+    assert path.read_bytes() == DATA
+
+
+def test_download_file_resume_unsupported(tmp_path):
+
+    path = str(tmp_path / "data.bin")
+
+    with serve({"/data.bin": DATA}, ranges=False, drops=[100000]) as server:
+        assert download_file(server.url + "/data.bin", path, sha256=DIGEST) == DIGEST
+
+
+def test_download_file_retries_exhausted(tmp_path):
+
+    path = tmp_path / "data.bin"
+
+    with serve({"/data.bin": DATA}, drops=[1000, 1000, 1000]) as server:
+        with pytest.raises(ConnectionError):
+            download_file(server.url + "/data.bin", str(path), retries=2)
+
+    assert not path.exists()
+    assert (tmp_path / "data.bin.part").stat().st_size == 3000  # resumed later
+
+
+def test_download_file_segments(tmp_path):
+
+    data = os.urandom(4 << 20)
+    path = tmp_path / "data.bin"
+
+    with serve({"/data.bin": data}, drops=[None, 200000]) as server:
+        digest = download_file(
+            server.url + "/data.bin", str(path), sha256=hashlib.sha256(data).hexdigest(), segments=4
+        )
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert path.read_bytes() == data
+    assert len(server.requests) == 1 + 4 + 1  # probe, segments, one resumed segment
+    assert os.listdir(str(tmp_path)) == ["data.bin"]
+
+
+def test_download_file_size(tmp_path):
+
+    path = tmp_path / "data.bin"
+
+    with serve({"/data.bin": DATA}) as server:
+        with pytest.raises(OSError):
+            download_file(server.url + "/data.bin", str(path), size=len(DATA) + 1)
+
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_download_cached(tmp_path):
+
+    path = str(tmp_path / "meta.json")
+    files = {"/meta": b'{"info": 1}'}
+
+    with serve(files) as server:
+        assert download_cached(server.url + "/meta", path) == '{"info": 1}'
+        assert download_cached(server.url + "/meta", path) == '{"info": 1}'
+        files["/meta"] = b'{"info": 2}'
+        assert download_cached(server.url + "/meta", path) == '{"info": 2}'
+        url = server.url
+
+    assert [headers.get("If-None-Match") is not None for headers in server.headers] == [False, True, True]
+    assert download_cached(url + "/meta", path) == '{"info": 2}'  # server gone
+
+
+def test_download_cached_mirrors(tmp_path):
+
+    with socket.socket() as sock:  # port nobody listens on
+        sock.bind(("127.0.0.1", 0))
+        origin = "http://127.0.0.1:%d/" % sock.getsockname()[1]
+
+    path = str(tmp_path / "meta.json")
+    url = origin + "meta"
+
+    def fetch(mirrors):
+        return mirrors.fetch(url, lambda candidate: download_cached(candidate, path, key=url, stale=False))
+
+    with serve({"/": b"slow", "/meta": b'{"info": 2}'}, delay=0.3) as slow:
+        with serve({"/": b"fast", "/meta": b'{"info": 1}'}) as fast:
+            mirrors = Mirrors(origin, [slow.url + "/", fast.url + "/"])
+            assert fetch(mirrors) == '{"info": 1}'
+
+        POOL.clear()
+        assert fetch(mirrors) == '{"info": 2}'  # failed over instead of returning the copy
+        assert mirrors.urls[0] == slow.url + "/"  # fast mirror demoted
+        assert all(headers.get("If-None-Match") is None for headers in slow.headers)  # validators of other mirror
+
+    POOL.clear()
+    with pytest.raises(OSError):
+        fetch(mirrors)
+    assert read_cached(path, url) == '{"info": 2}'  # all mirrors failed, copy is kept
+    assert read_cached(path, origin + "other") is None
+
+
+def test_connection_pool():
+
+    pool = ConnectionPool(limit=2)
+
+    with serve({"/data.bin": DATA}, redirects={"/old.bin": "/data.bin"}) as server:
+        with ThreadPoolExecutor(max_workers=4) as p:
+            contents = list(p.map(lambda _: _read(pool, server.url + "/old.bin"), range(8)))
+        with pytest.raises(HTTPError):
+            pool.open(server.url + "/missing.bin")
+        assert _read(pool, server.url + "/data.bin") == DATA
+        pool.clear()
+
+    assert all(content == DATA for content in contents)
+    assert server.connections <= 2
+    assert len(server.requests) == 8 * 2 + 2
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_connection_pool_close(chunked):
+
+    pool = ConnectionPool(limit=1)
+
+    with serve({"/short.bin": DATA[:1024], "/long.bin": DATA}, chunked=chunked) as server:
+        for name in ("/short.bin", "/long.bin"):
+            with pool.open(server.url + name) as response:
+                assert response.read(16) == DATA[:16]  # e.g. aborted by write error
+        assert _read(pool, server.url + "/short.bin") == DATA[:1024]
+        pool.clear()
+
+    # short remainders of known length are drained, anything else closes the connection
+    assert server.connections == (3 if chunked else 2)
+
+
+def test_mirrors():
+
+    with socket.socket() as sock:  # port nobody listens on
+        sock.bind(("127.0.0.1", 0))
+        origin = "http://127.0.0.1:%d/" % sock.getsockname()[1]
+
+    with serve({"/": b"slow", "/3.10.4/" + ZIPNAME: DATA}, delay=0.3) as slow:
+        with serve({"/": b"fast"}) as fast:
+
+            mirrors = Mirrors(origin, [slow.url, fast.url + "/"])
+            assert mirrors.urls == [fast.url + "/", slow.url + "/", origin]
+            assert mirrors.latencies[origin] is None
+
+            url = PythonVersion("win64", 3, 10, 4).as_url(origin)
+            assert mirrors.fetch(url, lambda url: _read(POOL, url)) == DATA  # missing on fast mirror
+            assert mirrors.urls[0] == fast.url + "/"
+
+        POOL.clear()
+        assert mirrors.fetch(url, lambda url: _read(POOL, url)) == DATA  # fast mirror gone
+        assert mirrors.urls == [slow.url + "/", origin, fast.url + "/"]
+
+    POOL.clear()
+    with pytest.raises(OSError):
+        mirrors.fetch(url, lambda url: _read(POOL, url))
+    assert mirrors.fetch("foreign", lambda url: url) == "foreign"
+
+
+def _read(pool, url):
+
+    with pool.open(url) as response:
+        return response.read()
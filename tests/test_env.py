@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_env.py: Testing construction of environments
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import builtins
+import os
+
+import pytest
+
+from wenv import Env, EnvConfig
+from wenv._core.const import SHARED_ENVS
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _forbidden(*args, **kwargs):
+
+    raise AssertionError("file system access", args)
+
+
+def test_env_lazy(monkeypatch, tmp_path):
+
+    prefix = tmp_path / "prefix"
+    config = EnvConfig(prefix=str(prefix), wineprefix=str(tmp_path / "wine"))
+    config.snapshot()  # resolving the configuration itself may look at files
+
+    with monkeypatch.context() as m:
+        for module, name in (
+            (builtins, "open"),
+            (os, "listdir"),
+            (os, "scandir"),
+            (os, "stat"),
+            (os, "lstat"),
+            (os, "mkdir"),
+            (os, "makedirs"),
+            (os, "symlink"),
+            (os, "remove"),
+        ):
+            m.setattr(module, name, _forbidden)
+        env = Env(parameter=config)
+        with pytest.raises(AssertionError):
+            env._cmd_dict  # first use
+
+    assert env._cmd_dict == {}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_env_shared(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    monkeypatch.setattr(Env, "_shared", type(Env._shared)())
+
+    env = Env.shared(arch="win32", prefix=str(tmp_path))
+    assert Env.shared(arch="win32", prefix=str(tmp_path)) is env
+    assert Env.shared(arch="win64", prefix=str(tmp_path)) is not env
+    assert Env(arch="win32", prefix=str(tmp_path)) is not env
+
+    for index in range(SHARED_ENVS):  # recently used environments are kept
+        Env.shared(arch="win32", prefix=str(tmp_path / "a{:d}".format(index)))
+        assert Env.shared(arch="win32", prefix=str(tmp_path)) is env
+    assert len(Env._shared) == SHARED_ENVS
+
+    for index in range(SHARED_ENVS):  # least recently used ones are dropped
+        Env.shared(arch="win32", prefix=str(tmp_path / "b{:d}".format(index)))
+    assert len(Env._shared) == SHARED_ENVS
+    assert Env.shared(arch="win32", prefix=str(tmp_path)) is not env
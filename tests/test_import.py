@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_import.py: Testing import budget of entry points
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import subprocess
+import sys
+
+import wenv
+
+import pytest
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+ENTRY_POINT_MODULES = {
+    "wenv",
+    "wenv._core",
+    "wenv._core.launch",
+    "wenv._core.trace",
+    "wenv._core.typeguard",
+    "wenv._core.usercache",
+}
+
+EXPENSIVE_MODULES = (
+    "concurrent.futures",
+    "http.client",
+    "ssl",
+    "subprocess",
+    "urllib.request",
+    "zipfile",
+)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# HELPER
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _get_imports(code):
+    """
+    Modules imported by a snippet of code in a fresh interpreter, on top of the interpreter's own start-up.
+    """
+
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; before = set(sys.modules); %s; print('\\n'.join(sorted(set(sys.modules) - before)))" % code,
+        ],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    return set(proc.stdout.decode("utf-8").split())
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@pytest.mark.parametrize("entry_point", ["cli", "shebang"])
+def test_entry_point_imports(entry_point):
+
+    imports = _get_imports("from wenv import %s" % entry_point)
+
+    assert {name for name in imports if name.startswith("wenv")} == ENTRY_POINT_MODULES
+    for name in EXPENSIVE_MODULES:
+        assert name not in imports
+
+
+def test_lazy_api():
+
+    for name in wenv.__all__:
+        assert getattr(wenv, name) is not None
+    assert wenv.env is wenv.Env
+
+    with pytest.raises(AttributeError):
+        wenv.does_not_exist
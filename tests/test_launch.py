@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_launch.py: Testing launch manifests
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import os
+
+import pytest
+
+from wenv import Env
+from wenv._core.launch import MANIFEST_LIMIT, LaunchManifest
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@pytest.fixture
+def context(monkeypatch, tmp_path):
+    "clean invocation context with two stand-in Wine binaries, ``a/wine`` being on ``PATH``"
+
+    for name in list(os.environ.keys()):
+        if name.startswith("WENV"):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    for name in ("a", "b"):
+        wine = tmp_path / name / "wine"
+        wine.parent.mkdir()
+        wine.write_text("#!/bin/sh\necho wine-%s\n" % name)
+        wine.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path / "a") + os.pathsep + os.environ.get("PATH", ""))
+
+    pythonprefix = tmp_path / "python"
+    (pythonprefix / "Scripts").mkdir(parents=True)
+    (pythonprefix / "python.exe").touch()
+    (pythonprefix / "Scripts" / "pip.exe").touch()
+
+    (tmp_path / "work").mkdir()
+    monkeypatch.chdir(tmp_path / "work")
+
+    return tmp_path
+
+
+def _save(tmp_path):
+
+    env = Env(
+        arch="win32",
+        pythonversion="3.10.4",
+        pythonprefix=str(tmp_path / "python"),
+        wineprefix=str(tmp_path / "wine"),
+        wine_bin_win32="wine",
+        wineinstallprefix=None,
+    )
+    env._save_launch_manifest(env._wine_dict["win32"])
+
+    return env
+
+
+def test_launch_manifest_roundtrip(context):
+
+    env = _save(context)
+
+    manifest = LaunchManifest.load()
+    assert manifest is not None
+    assert manifest._wine == str(context / "a" / "wine")
+    assert manifest._cmd_dict == {
+        "python": str(context / "python" / "python.exe"),
+        "pip": str(context / "python" / "Scripts" / "pip.exe"),
+    }
+    assert manifest._envvar_overrides == env._get_envvar_overrides()
+    assert manifest._trace_tags == env._get_trace_tags()
+
+
+def test_launch_manifest_disabled(context, monkeypatch):
+
+    _save(context)
+
+    monkeypatch.setenv("WENV_LAUNCH_MANIFEST", "false")
+    assert LaunchManifest.load() is None
+
+
+def test_launch_manifest_config_file(context):
+
+    _save(context)
+
+    (context / "work" / ".wenv.json").write_text("{}")
+    assert LaunchManifest.load() is None
+
+
+def test_launch_manifest_scripts(context):
+
+    _save(context)
+
+    (context / "python" / "Scripts" / "pytest.exe").touch()  # i.e. a package was installed
+    assert LaunchManifest.load() is None
+
+
+def test_launch_manifest_wine(context):
+
+    _save(context)
+
+    (context / "a" / "wine").write_text("#!/bin/sh\necho wine-a, updated\n")
+    assert LaunchManifest.load() is None
+
+
+@pytest.mark.parametrize("change", ["cwd", "envvar", "path"])
+def test_launch_manifest_key(context, monkeypatch, change):
+
+    _save(context)
+
+    if change == "cwd":
+        monkeypatch.chdir(context)
+    elif change == "envvar":
+        monkeypatch.setenv("WENV_WINEDEBUG", "-all")
+    else:  # switching Wine builds through PATH
+        monkeypatch.setenv("PATH", str(context / "b") + os.pathsep + os.environ["PATH"])
+    assert LaunchManifest.load() is None
+
+    _save(context)
+    manifest = LaunchManifest.load()
+    assert manifest is not None
+    assert manifest._wine == str(context / ("b" if change == "path" else "a") / "wine")
+
+
+def test_launch_manifest_limit(context, monkeypatch):
+
+    for index in range(MANIFEST_LIMIT + 8):
+        monkeypatch.setenv("WENV_SOME_KEY", str(index))
+        _save(context)
+
+    assert len(os.listdir(str(context / "cache" / "wenv" / "manifests"))) == MANIFEST_LIMIT
+    assert LaunchManifest.load() is not None  # the most recent one is kept
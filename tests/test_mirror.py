@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_mirror.py: Testing the local PEP 503 package mirror
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import hashlib
+import os
+import threading
+from urllib.request import urlopen
+
+from wenv import Env
+from wenv._core.mirror import Mirror
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def test_project_names():
+
+    assert Mirror.get_project_name("Zope.Interface-5.5.2.tar.gz") == "zope-interface"
+    assert Mirror.get_project_name("typing_extensions-4.4.0-py3-none-any.whl") == "typing-extensions"
+    assert Mirror.get_project_name("pip-22.3.1.zip") == "pip"
+    assert Mirror.get_project_name("pip-22.3.1-py3-none-any.whl.part") is None
+    assert Mirror.get_project_name("readme.txt") is None
+
+
+def test_mirror_update(tmp_path):
+
+    packages = tmp_path / "packages"
+    packages.mkdir()
+    (packages / "pip-22.3.1-py3-none-any.whl").write_bytes(b"pip")
+    (packages / "Zope.Interface-5.5.2.tar.gz").write_bytes(b"zope")
+
+    mirror = Mirror(str(tmp_path / "mirror"))
+    assert mirror.update(str(packages)) == {"projects": 2, "files": 2, "updated": 2}
+
+    page_path = tmp_path / "mirror" / "simple" / "pip" / "index.html"
+    page = page_path.read_text()
+    assert 'href="../../files/pip-22.3.1-py3-none-any.whl#sha256=%s"' % hashlib.sha256(b"pip").hexdigest() in page
+    assert 'href="zope-interface/"' in (tmp_path / "mirror" / "simple" / "index.html").read_text()
+    assert os.path.samefile(str(packages / "pip-22.3.1-py3-none-any.whl"), str(tmp_path / "mirror" / "files" / "pip-22.3.1-py3-none-any.whl"))
+
+    stamp = page_path.stat().st_mtime_ns
+    assert mirror.update(str(packages)) == {"projects": 2, "files": 2, "updated": 0}
+    assert page_path.stat().st_mtime_ns == stamp  # unchanged pages are not rewritten
+
+    (packages / "Zope.Interface-5.5.2.tar.gz").unlink()
+    (packages / "pip-23.0-py3-none-any.whl").write_bytes(b"pip 23")
+    assert mirror.update(str(packages)) == {"projects": 1, "files": 2, "updated": 1}
+    assert not (tmp_path / "mirror" / "simple" / "zope-interface").exists()
+    assert not (tmp_path / "mirror" / "files" / "Zope.Interface-5.5.2.tar.gz").exists()
+    assert "pip-23.0-py3-none-any.whl" in page_path.read_text()
+
+
+def test_mirror_serve(tmp_path):
+
+    packages = tmp_path / "packages"
+    packages.mkdir()
+    (packages / "pip-22.3.1-py3-none-any.whl").write_bytes(b"pip")
+
+    mirror = Mirror(str(tmp_path / "mirror"))
+    mirror.update(str(packages))
+
+    server = mirror.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = "http://%s:%d/simple/" % server.server_address
+        assert "pip-22.3.1-py3-none-any.whl" in urlopen(url + "pip/").read().decode("utf-8")
+        assert urlopen(url + "pip/../../files/pip-22.3.1-py3-none-any.whl").read() == b"pip"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pip_index_url(tmp_path):
+
+    env = Env(prefix=str(tmp_path), pip_index_url="http://127.0.0.1:8741/simple/")
+    assert env._get_envvar_overrides()["PIP_INDEX_URL"] == "http://127.0.0.1:8741/simple/"
+    assert env.mirror.root == os.path.join(str(tmp_path), "share", "wenv", "cache", "mirror")
+
+    assert "PIP_INDEX_URL" not in Env(prefix=str(tmp_path))._get_envvar_overrides().keys()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_server.py: Testing the managed wineserver
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from .lib import get_context, run_process, no_errors_in
+
+import pytest
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+@pytest.mark.parametrize("arch,build", get_context())
+def test_server(arch, build):
+
+    env = {"WENV_ARCH": arch, "WENV_PYTHONVERSION": str(build)}
+
+    out, err, code = run_process(["wenv", "server", "start"], env=env)
+    assert code == 0
+    assert no_errors_in(err)
+
+    out, err, code = run_process(["wenv", "server", "status"], env=env)
+    assert code == 0
+    assert no_errors_in(err)
+    assert "running: yes" in out
+
+    out, err, code = run_process(["wenv", "python", "-c", "print('hello')"], env=env)
+    assert code == 0
+    assert no_errors_in(err)
+    assert out.strip() == "hello"
+
+    out, err, code = run_process(["wenv", "server", "status"], env=env)
+    assert code == 0
+    assert "running: yes" in out
+
+    out, err, code = run_process(["wenv", "server", "stop"], env=env)
+    assert code == 0
+    assert no_errors_in(err)
+
+    out, err, code = run_process(["wenv", "server", "status"], env=env)
+    assert code == 0
+    assert "running: no" in out
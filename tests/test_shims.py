@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_shims.py: Testing shell shims of environments
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from wenv import Env
+from wenv._core.const import SHIM_MARKER
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONST
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+FAKE_WINE = """#!/bin/sh
+printf '%s\\n' "$WINEPREFIX" "$@"
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+class _FakePip:
+    "stands in for ``wenv pip`` sub-processes, adding or removing ``Scripts/{name}.exe``"
+
+    def __init__(self, cmd, **kwargs):
+
+        action, name = cmd[2], cmd[-1]
+        path = os.path.join(_FakePip.scripts, name + ".exe")
+        if action == "install":
+            open(path, "wb").close()
+        else:
+            os.remove(path)
+        self.returncode = 0
+
+    def communicate(self):
+
+        return b"", b""
+
+
+def _make_env(tmp_path):
+
+    wine = tmp_path / "bin" / "wine"
+    wine.parent.mkdir()
+    wine.write_text(FAKE_WINE)
+    wine.chmod(0o755)
+
+    pythonprefix = tmp_path / "python"
+    (pythonprefix / "Scripts").mkdir(parents=True)
+    (pythonprefix / "python.exe").touch()
+    (pythonprefix / "Scripts" / "pip.exe").touch()
+
+    return Env(
+        arch="win32",
+        pythonversion="3.10.4",
+        pythonprefix=str(pythonprefix),
+        wineprefix=str(tmp_path / "wine prefix's"),  # needs quoting
+        wine_bin_win32=str(wine),
+        wineinstallprefix=None,
+        shims=str(tmp_path / "shims"),
+    )
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="shims are POSIX shell scripts")
+def test_shims_content(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_SPEC", raising=False)
+    env = _make_env(tmp_path)
+    env.setup_shims()
+
+    shims = tmp_path / "shims"
+    assert sorted(os.listdir(str(shims))) == ["_wenv_python", "pip", "python"]
+    for name in ("_wenv_python", "pip", "python"):
+        assert SHIM_MARKER in (shims / name).read_text()
+        assert os.access(str(shims / name), os.X_OK)
+
+    out = subprocess.run(
+        [str(shims / "python"), "a b", "$HOME", "c'd"], stdout=subprocess.PIPE, check=True
+    ).stdout.decode("utf-8").splitlines()
+    assert out == [
+        str(tmp_path / "wine prefix's"),
+        str(tmp_path / "python" / "python.exe"),
+        "a b",
+        "$HOME",
+        "c'd",
+    ]
+
+    out = subprocess.run(
+        [str(shims / "_wenv_python"), "script.py", "ignored"], stdout=subprocess.PIPE, check=True
+    ).stdout.decode("utf-8").splitlines()
+    assert out[1:] == [str(tmp_path / "python" / "python.exe"), "script.py"]
+
+
+def test_shims_stale(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_SPEC", raising=False)
+    env = _make_env(tmp_path)
+
+    shims = tmp_path / "shims"
+    shims.mkdir()
+    (shims / "stale").write_text("#!/bin/sh\n%s\nexec wine stale.exe\n" % SHIM_MARKER)
+    (shims / "foreign").write_text("#!/bin/sh\nexec something\n")
+    (shims / "folder").mkdir()
+
+    env.setup_shims()
+
+    assert sorted(os.listdir(str(shims))) == ["_wenv_python", "folder", "foreign", "pip", "python"]
+    assert (shims / "foreign").read_text() == "#!/bin/sh\nexec something\n"
+
+
+def test_shims_refresh(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_SPEC", raising=False)
+    env = _make_env(tmp_path)
+
+    _FakePip.scripts = str(tmp_path / "python" / "Scripts")
+    monkeypatch.setattr(subprocess, "Popen", _FakePip)
+
+    env.install_package("pytest")
+    assert not (tmp_path / "shims").exists()  # not refreshed unless shims exist
+
+    env._cli_shims()
+    assert sorted(os.listdir(str(tmp_path / "shims"))) == ["_wenv_python", "pip", "pytest", "python"]
+
+    env.uninstall_package("pytest")
+    assert sorted(os.listdir(str(tmp_path / "shims"))) == ["_wenv_python", "pip", "python"]
+
+    env.install_package("wheel")
+    assert sorted(os.listdir(str(tmp_path / "shims"))) == ["_wenv_python", "pip", "python", "wheel"]
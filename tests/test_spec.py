@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_spec.py: Testing environment specifications
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import json
+import os
+
+import pytest
+
+from wenv import Env, PythonVersion
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def test_spec_roundtrip(monkeypatch):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    env = Env(wineprefix="/tmp/wenv-test", pythonversion="3.10.4", some_key="some_value")
+
+    spec = env.to_spec()
+    assert json.loads(spec)["version"] == 1
+
+    other = Env.from_spec(spec)
+    assert other._p["pythonversion"] == PythonVersion("win32", 3, 10, 4)
+    assert other._p["some_key"] == "some_value"
+    assert other._path_dict["interpreter"] == env._path_dict["interpreter"]
+    assert other._envvar_dict["WINEPREFIX"] == "/tmp/wenv-test"
+    assert other.to_spec() == spec
+
+
+def test_spec_roundtrip_paths(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    env = Env(pythonprefix=str(tmp_path / "python"), wineprefix=str(tmp_path / "wine"))
+
+    spec = env.to_spec()
+    assert json.loads(spec)["paths"] == {"pythonprefix": str(tmp_path / "python")}
+
+    other = Env.from_spec(spec)
+    for name in ("pythonprefix", "scripts", "interpreter", "pip", "sitepackages"):
+        assert other._path_dict[name] == env._path_dict[name]
+    assert other._path_dict["interpreter"] == str(tmp_path / "python" / "python.exe")
+    assert other._envvar_dict["PYTHONHOME"] == str(tmp_path / "python")
+    assert other.to_spec() == spec
+
+
+def test_spec_scope(monkeypatch):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    env = Env(wineprefix="/tmp/wenv-test")
+
+    spec = env._get_subprocess_envvar_dict()["WENV_SPEC"]  # for wenv's own children
+    assert spec == env.to_spec()
+
+    monkeypatch.setenv("WENV_SPEC", spec)
+    other = Env.from_environ()
+    assert "WENV_SPEC" not in other._envvar_dict.keys()  # not for programs running on Wine
+    assert "WENV_SPEC" not in Env(wineprefix="/tmp/wenv-test")._envvar_dict.keys()
+
+
+def test_spec_sources(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_ARCH", raising=False)
+    spec = Env(wineprefix="/tmp/wenv-test").to_spec()
+
+    path = tmp_path / "spec.json"
+    path.write_text(spec)
+    assert Env.from_spec(str(path)).to_spec() == spec
+
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, spec.encode("utf-8"))
+    os.close(write_fd)
+    monkeypatch.setenv("WENV_SPEC", "fd:%d" % read_fd)
+    assert Env.from_environ().to_spec() == spec
+
+
+def test_spec_version():
+
+    with pytest.raises(ValueError):
+        Env.from_spec(json.dumps({"version": 0}))
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_store.py: Testing the artifact store
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+
+from wenv._core.store import Store
+
+from .httpserver import serve
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+FILES = {"/%d.bin" % index: os.urandom(100000) for index in range(3)}
+
+
+def test_store_fetch(tmp_path):
+
+    store = Store(str(tmp_path / "store"))
+    data = FILES["/0.bin"]
+
+    with serve(FILES) as server:
+        path = store.fetch(server.url + "/0.bin")
+        assert store.fetch(server.url + "/0.bin") == path
+        assert store.fetch("mirror", sha256=hashlib.sha256(data).hexdigest(), key="other") == path
+
+    assert [requested for _, requested in server.requests] == [None, "bytes=0-0"]  # download, revalidation
+    assert os.path.basename(path) == hashlib.sha256(data).hexdigest()
+    assert store.get("other") == path
+    assert store.usage() == len(data)
+
+    target = tmp_path / "0.bin"
+    store.materialize(path, str(target))
+    assert target.read_bytes() == data
+    assert os.stat(str(target)).st_ino == os.stat(path).st_ino
+
+
+def test_store_single_flight(tmp_path):
+
+    store = Store(str(tmp_path / "store"))
+
+    with serve(FILES) as server:
+        with ThreadPoolExecutor(max_workers=4) as p:
+            paths = list(p.map(lambda _: store.fetch(server.url + "/1.bin"), range(4)))
+
+    assert len(set(paths)) == 1
+    assert [requested for _, requested in server.requests].count(None) == 1  # others revalidate
+
+
+def test_store_eviction(tmp_path):
+
+    store = Store(str(tmp_path / "store"), size_limit=250000)
+
+    with serve(FILES) as server:
+        first = store.fetch(server.url + "/0.bin")
+        store.fetch(server.url + "/1.bin")
+        store.get(server.url + "/0.bin")  # 1.bin is least recently used now
+        store.fetch(server.url + "/2.bin")
+
+    assert store.get(server.url + "/0.bin") == first
+    assert store.get(server.url + "/1.bin") is None
+    assert store.get(server.url + "/2.bin") is not None
+    assert store.usage() == 200000
+
+
+def test_store_eviction_linked(tmp_path):
+
+    store = Store(str(tmp_path / "store"), size_limit=150000)
+
+    with serve(FILES) as server:
+        first = store.fetch(server.url + "/0.bin")
+        store.materialize(first, str(tmp_path / "0.bin"))  # e.g. into cache
+        store.fetch(server.url + "/1.bin")
+        store.fetch(server.url + "/2.bin")  # evicts 1.bin, 0.bin would not free space
+
+    assert store.get(server.url + "/0.bin") == first
+    assert store.get(server.url + "/1.bin") is None
+    assert store.usage() == 200000
+
+    os.remove(str(tmp_path / "0.bin"))  # counts towards the limit again
+    store.evict()
+    assert store.usage() == 100000
+    assert store.get(server.url + "/2.bin") is None  # least recently used
+
+
+def test_store_damaged(tmp_path):
+
+    store = Store(str(tmp_path / "store"))
+
+    with serve(FILES) as server:
+        path = store.fetch(server.url + "/0.bin")
+        os.remove(path)
+        assert store.fetch(server.url + "/0.bin") == path
+
+    assert len(server.requests) == 2
+    assert os.path.isfile(path)
+
+
+def test_store_revalidate(tmp_path):
+
+    store = Store(str(tmp_path / "store"))
+
+    with serve(dict(FILES)) as server:
+        first = store.fetch(server.url + "/0.bin")
+        assert store.fetch(server.url + "/0.bin") == first  # unchanged
+        server.files["/0.bin"] = FILES["/1.bin"]  # e.g. new release of get-pip.py
+        second = store.fetch(server.url + "/0.bin")
+
+    assert second != first
+    assert os.path.basename(second) == hashlib.sha256(FILES["/1.bin"]).hexdigest()
+    assert store.get(server.url + "/0.bin") == second
+    assert not os.path.exists(first)  # outdated, no key left
+    assert store.usage() == len(FILES["/1.bin"])
+
+    assert store.fetch(server.url + "/0.bin") == second  # unreachable, kept
+
+
+def test_store_pin(tmp_path):
+
+    store = Store(str(tmp_path / "store"), size_limit=150000)
+
+    with serve(FILES) as server:
+        first = store.fetch(server.url + "/0.bin")
+        with store.pin(server.url + "/0.bin") as path:
+            store.fetch(server.url + "/1.bin")  # 0.bin is linked, so it is kept
+            assert store.get(server.url + "/0.bin") == first
+            with open(path, "rb") as f:
+                assert f.read() == FILES["/0.bin"]
+        store.fetch(server.url + "/2.bin")  # evicts 0.bin and 1.bin
+
+    assert not os.path.exists(path)
+    assert store.get(server.url + "/0.bin") is None
+    with store.pin("unknown") as path:
+        assert path is None
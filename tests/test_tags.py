@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_tags.py: Testing wheel compatibility tags
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from wenv import PythonVersion
+from wenv._core.tags import (
+    get_compatible_tags,
+    get_marker_environment,
+    get_pip_target_args,
+    parse_wheel_filename,
+    select_files,
+)
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+FILES = [
+    {"filename": "pkg-1.0.tar.gz", "packagetype": "sdist"},
+    {"filename": "pkg-1.0-cp311-cp311-manylinux_2_17_x86_64.manylinux2014_x86_64.whl"},
+    {"filename": "pkg-1.0-cp311-cp311-macosx_10_9_universal2.whl"},
+    {"filename": "pkg-1.0-cp311-cp311-win_amd64.whl"},
+    {"filename": "pkg-1.0-cp311-cp311-win32.whl"},
+    {"filename": "pkg-1.0-cp37-abi3-win_amd64.whl"},
+    {"filename": "pkg-1.0-cp37-cp37m-win_amd64.whl"},
+]
+
+
+def test_compatible_tags():
+
+    tags = get_compatible_tags(PythonVersion("win64", 3, 7, 4))
+
+    assert tags[0] == ("cp37", "cp37m", "win_amd64")
+    assert tags[-1] == ("py30", "none", "any")
+    assert tags.index(("cp37", "none", "any")) < tags.index(("py3", "none", "any"))
+    assert len(tags) == len(set(tags))
+
+
+def test_pip_target_args():
+
+    args = get_pip_target_args(PythonVersion("win32", 3, 7, 4))
+
+    assert args[args.index("--platform") + 1] == "win32"
+    assert args[args.index("--python-version") + 1] == "3.7"
+    assert args[args.index("--abi") + 1] == "cp37m"
+
+
+def test_marker_environment():
+
+    environment = get_marker_environment(PythonVersion("win64", 3, 10, 4))
+
+    assert environment["sys_platform"] == "win32"
+    assert environment["platform_system"] == "Windows"
+    assert environment["platform_machine"] == "AMD64"
+    assert environment["python_version"] == "3.10"
+    assert environment["python_full_version"] == "3.10.4"
+
+
+def test_parse_wheel_filename():
+
+    assert parse_wheel_filename("pkg-1.0-py2.py3-none-any.whl") == {
+        ("py2", "none", "any"),
+        ("py3", "none", "any"),
+    }
+    assert parse_wheel_filename("pkg-1.0-1build-cp311-abi3-win32.whl") == {("cp311", "abi3", "win32")}
+    assert parse_wheel_filename("pkg-1.0.tar.gz") is None
+
+
+def test_select_files():
+
+    def select(arch, minor):
+        return [item["filename"] for item in select_files(FILES, PythonVersion(arch, 3, minor, 0))]
+
+    assert select("win64", 11) == ["pkg-1.0-cp311-cp311-win_amd64.whl"]
+    assert select("win32", 11) == ["pkg-1.0-cp311-cp311-win32.whl"]
+    assert select("win64", 10) == ["pkg-1.0-cp37-abi3-win_amd64.whl"]
+    assert select("win64", 7) == ["pkg-1.0-cp37-cp37m-win_amd64.whl"]
+    assert select("arm64", 11) == ["pkg-1.0.tar.gz"]
+    assert select_files(FILES + [{"filename": "pkg-1.0-py3-none-any.whl"}], PythonVersion("arm64", 3, 11, 0)) == [
+        {"filename": "pkg-1.0-py3-none-any.whl"}
+    ]
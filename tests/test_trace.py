@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+WENV
+Running Python on Wine
+https://github.com/pleiszenburg/wenv
+
+    tests/test_trace.py: Testing per-phase timing records
+
+    Copyright (C) 2017-2022 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/wenv/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+"""
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+import errno
+import json
+import os
+
+import pytest
+
+from wenv import EnvConfig
+from wenv._core.source import download_file
+from wenv._core.trace import tagged, trace
+
+from .httpserver import serve
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+
+def _read_records(path):
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_trace_disabled(monkeypatch, tmp_path):
+
+    monkeypatch.delenv("WENV_TRACE", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    with trace("phase", some_tag="some_value") as phase:
+        phase.tags["other_tag"] = 1
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trace_records(monkeypatch, tmp_path):
+
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setenv("WENV_TRACE", str(path))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+
+    EnvConfig()
+    EnvConfig()
+
+    with pytest.raises(ValueError):
+        with trace("failing", some_tag="some_value"):
+            raise ValueError()
+
+    records = _read_records(path)
+    assert [(record["phase"], record.get("cached")) for record in records] == [
+        ("config_files", False),
+        ("config_files", True),
+        ("failing", None),
+    ]
+    assert records[-1]["error"] == "ValueError"
+    config = EnvConfig()
+    for record in records[:2]:
+        assert record["arch"] == config["arch"]
+        assert record["version"] == config["pythonversion"].as_config()
+        assert record["wineprefix"] == config["wineprefix"]
+    assert records[-1]["some_tag"] == "some_value"
+    assert all(record["duration"] >= 0.0 for record in records)
+
+
+def _trace_untagged():
+
+    with trace("untagged"):
+        pass
+
+
+def test_trace_tagged(monkeypatch, tmp_path):
+
+    path = tmp_path / "trace.jsonl"
+    monkeypatch.setenv("WENV_TRACE", str(path))
+
+    with serve({"/a.bin": b"a" * 64, "/b.bin": b"b" * 64}) as server:
+        with tagged(arch="win32", wineprefix="/prefix"):
+            download_file(server.url + "/a.bin", str(tmp_path / "a.bin"))
+            with ThreadPoolExecutor(max_workers=1) as pool:  # tags follow copies of the context only
+                pool.submit(
+                    copy_context().run, download_file, server.url + "/b.bin", str(tmp_path / "b.bin")
+                ).result()
+                pool.submit(_trace_untagged).result()
+        with trace("outside"):
+            pass
+
+    records = {
+        record["url"] if record["phase"] == "download" else record["phase"]: record
+        for record in _read_records(path)
+    }
+    for url in (server.url + "/a.bin", server.url + "/b.bin"):
+        assert records[url]["arch"] == "win32"
+        assert records[url]["wineprefix"] == "/prefix"
+    assert "arch" not in records["untagged"]
+    assert "arch" not in records["outside"]
+
+
+def test_trace_write_error(monkeypatch, tmp_path):
+
+    def write(fd, data):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setenv("WENV_TRACE", str(tmp_path / "trace.jsonl"))
+    monkeypatch.setattr(os, "write", write)
+
+    with trace("phase"):
+        pass
@@ -26,7 +26,7 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
-from wenv import PythonVersion, get_available_python_builds, get_latest_python_build
+from wenv import PythonBuilds, PythonVersion, get_available_python_builds, get_latest_python_build
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # TEST(s)
@@ -67,3 +67,48 @@ def test_unstable_versions():
     assert a != b
     assert a < b
     assert b > a
+
+
+def test_build_order():
+
+    builds = ['a1', 'a2', 'a10', 'b1', 'rc1', 'rc2', 'stable', 'post1']
+    versions = [PythonVersion('win64', 3, 9, 0, build) for build in builds]
+
+    assert sorted(reversed(versions)) == versions
+    assert PythonVersion('win64', 3, 9, 0, 'post1') < PythonVersion('win64', 3, 9, 1, 'a1')
+    assert sorted(versions[3:]) == sorted(versions[3:], key = lambda version: version._as_sort())
+
+
+def test_hashable_versions():
+
+    a = PythonVersion('win32', 3, 10, 4)
+    b = PythonVersion.from_config('win64', '3.10.4')
+
+    assert a == b
+    assert hash(a) == hash(b)
+    assert len({a, b, PythonVersion('win32', 3, 10, 4, 'rc1')}) == 2
+    assert not hasattr(a, '__dict__')
+
+
+def test_build_registry():
+
+    registry = PythonBuilds([
+        PythonVersion.from_zipname(fn) for fn in (
+            'python-3.10.0-embed-win32.zip',
+            'python-3.10.1-embed-win32.zip',
+            'python-3.10.1rc1-embed-win32.zip',
+            'python-3.10.1-embed-amd64.zip',
+            'python-3.10.1-embed-amd64.zip',
+            'python-3.11.0a1-embed-arm64.zip',
+        )
+    ])
+
+    assert len(registry) == 5
+    assert registry.arches == ['arm64', 'win32', 'win64']
+    assert registry.latest('win32', 3, 10) == PythonVersion('win32', 3, 10, 1)
+    assert registry.latest('arm64', 3, 10) is None
+    assert get_latest_python_build('arm64', 3, 11, builds = registry) == PythonVersion('arm64', 3, 11, 0, 'a1')
+    assert [str(build) for build in registry.get('win32', 3, 10)] == ['3.10.0.stable', '3.10.1.rc1', '3.10.1.stable']
+    assert registry.versions('win32') & registry.versions('win64') == {PythonVersion('win64', 3, 10, 1)}
+    assert PythonVersion('win32', 3, 10, 0) in registry
+    assert PythonVersion('win64', 3, 10, 0) not in registry